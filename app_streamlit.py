@@ -13,9 +13,10 @@ from datetime import datetime
 import pandas as pd
 import streamlit as st
 
-from spellchecker.pipeline import run_on_file, build_vocabs
-from spellchecker.engine.suggest_wrapper import build_engine
+from spellchecker.pipeline import run_pipeline_on_files, build_vocabs
 from spellchecker.settings import Settings
+from spellchecker.cache.result_cache import ResultCache
+from spellchecker.cache.paragraph_cache import ParagraphCache
 from spellchecker.vocab.loaders import load_kbbi_words, load_txt_set
 from spellchecker.vocab.load_storage import load_storage_version, load_resources_from_storage_versioned, load_suggest_models_from_storage
 
@@ -113,6 +114,15 @@ ver = load_storage_version(data_storage)
 resources = load_resources_from_storage_versioned(bucket=data_storage, version=ver)
 models = load_suggest_models_from_storage(data_storage, ver)
 
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    root = st.secrets.get("RESULT_CACHE_DIR", str(Path(tempfile.gettempdir()) / "statpub_result_cache"))
+    return ResultCache(root, max_bytes=int(st.secrets.get("RESULT_CACHE_MB", 256)) * 1024 * 1024)
+
+@st.cache_resource
+def get_paragraph_cache() -> ParagraphCache:
+    return ParagraphCache(max_entries=int(st.secrets.get("PARAGRAPH_CACHE_ENTRIES", 20000)))
+
 EDITOR_KEY = "tabel_seleksi"
 
 # =========================
@@ -183,54 +193,6 @@ def parse_user_vocab(text: str) -> set[str]:
 user_vocab = parse_user_vocab(user_vocab_text)
 st.session_state.user_vocab = sorted(list(user_vocab))
 
-def findings_to_dataframe(findings: List[Any]) -> pd.DataFrame:
-    rows: List[Dict[str, Any]] = []
-    for f in findings:
-        if isinstance(f, dict):
-            file = f.get("file", "")
-            page = f.get("page", "")
-            token = f.get("token", "")
-            status = f.get("status", "")
-            snippet = f.get("snippet", "")
-            suggs = f.get("suggestions", []) or []
-        else:
-            file = getattr(f, "file", "")
-            page = getattr(f, "page", "")
-            token = getattr(f, "token", "")
-            status = getattr(f, "status", "")
-            snippet = getattr(f, "snippet", "")
-            suggs = getattr(f, "suggestions", []) or []
-
-        row = {"file": file, "page": page, "token": token, "status": status}
-        for i in range(1, 4):
-            if len(suggs) >= i:
-                s = suggs[i - 1]
-                if isinstance(s, dict):
-                    sug = s.get("suggestion") or s.get("term") or s.get("word") or ""
-                    conf = s.get("confidence", "")
-                else:
-                    sug = getattr(s, "suggestion", "") or getattr(s, "term", "") or ""
-                    conf = getattr(s, "confidence", "")
-            else:
-                sug, conf = "", ""
-            row[f"suggestion_{i}"] = sug
-            row[f"confidence_{i}"] = conf
-        row["snippet"] = snippet
-        rows.append(row)
-
-    cols = [
-        "file", "page", "token", "status",
-        "suggestion_1", "confidence_1",
-        "suggestion_2", "confidence_2",
-        "suggestion_3", "confidence_3",
-        "snippet",
-    ]
-    df = pd.DataFrame(rows)
-    for c in cols:
-        if c not in df.columns:
-            df[c] = ""
-    return df[cols]
-
 def parse_id_ranges(text: str) -> set[int]:
     ids: set[int] = set()
     if not text:
@@ -250,34 +212,6 @@ def parse_id_ranges(text: str) -> set[int]:
                 ids.add(int(part))
     return ids
 
-def run_pipeline_on_paths(paths: List[str], resources: dict, user_vocab: set, models: dict | None = None):
-    cfg = Settings(
-        topk=int(3),
-        max_findings_per_file=int(max_findings),
-        show_only_top1_if_conf_ge=float(show_only_top1_if_conf_ge),
-    )
-    known_vocab_plus = set(resources["known_vocab"]) | set(user_vocab or set())
-
-    eng = build_engine(resources, models)
-
-    all_findings: List[Any] = []
-    for p in paths:
-        findings, meta = run_on_file(
-            path=p,
-            cfg=cfg,
-            eng=eng,
-            known_vocab=known_vocab_plus,
-            english_vocab=resources["english_vocab"],
-            known_vocab_for_names=resources["known_vocab_for_names"],
-            ignore_vocab=resources["ignore_vocab"],
-            domain_terms=resources["domain_terms"],
-            protected_phrases=resources["protected_phrases"],
-            protected_name_tokens=resources["protected_name_tokens"],
-        )
-        all_findings.extend(findings)
-
-    return all_findings
-
 def replace_in_docx_bytes(docx_bytes: bytes, replacements: dict[str, str]) -> bytes:
     items = [(k, v) for k, v in replacements.items() if k and v and k != v]
     if not items:
@@ -325,43 +259,66 @@ def replace_in_docx_bytes(docx_bytes: bytes, replacements: dict[str, str]) -> by
     return out.getvalue()
 
 if run_btn:
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmpdir = Path(tmpdir)
-        saved_paths: List[str] = []
+    if "upload_bytes_by_name" not in st.session_state:
+        st.session_state.upload_bytes_by_name = {}
 
-        if "upload_bytes_by_name" not in st.session_state:
-            st.session_state.upload_bytes_by_name = {}
+    # Checked straight from memory; the same bytes are reused for highlighting.
+    files = []
+    for up in uploads:
+        b = up.getvalue()
+        files.append((up.name, b))
+        st.session_state.upload_bytes_by_name[up.name] = b
 
-        for up in uploads:
-            out_path = tmpdir / up.name
-            b = up.getbuffer().tobytes()
-            out_path.write_bytes(b)
-            saved_paths.append(str(out_path))
+    st.info(f"Memproses {len(files)} file…")
 
-            st.session_state.upload_bytes_by_name[up.name] = b
+    prog = st.progress(0.0, text="Running spellcheck…")
 
-        st.info(f"Memproses {len(saved_paths)} file…")
+    def _show_progress(ev):
+        unit = "halaman" if ev.unit == "page" else "paragraf"
+        frac = min(ev.index / ev.total, 1.0) if ev.total else 0.0
+        prog.progress(frac, text=f"{ev.file}: {unit} {ev.index}/{ev.total} · {ev.findings} temuan · {ev.elapsed_s:.0f} detik")
 
-        with st.spinner("Running spellcheck…"):
-            findings = run_pipeline_on_paths(saved_paths, resources, set(user_vocab or []), models=models)
+    cfg = Settings(
+        topk=int(3),
+        max_findings_per_file=int(max_findings),
+        show_only_top1_if_conf_ge=float(show_only_top1_if_conf_ge),
+    )
+    findings, metas = run_pipeline_on_files(
+        files, cfg, resources, set(user_vocab or []),
+        models=models,
+        on_progress=_show_progress,
+        time_budget_s=float(st.secrets.get("RUN_TIME_BUDGET_S", 600)),
+        cache=get_result_cache(),
+        version=ver,
+        para_cache=get_paragraph_cache(),
+    )
+    prog.empty()
+
+    for m in metas:
+        if m.get("partial"):
+            unit = "halaman" if m.get("unit") == "page" else "paragraf"
+            if m.get("units_total"):
+                st.warning(f"{m['file']}: hasil parsial, batas waktu tercapai setelah {m['units_done']} dari {m['units_total']} {unit}.")
+            else:
+                st.warning(f"{m['file']}: tidak diperiksa, batas waktu tercapai.")
 
-        df = findings_to_dataframe(findings)
+    df = findings.to_dataframe()
 
-        st.session_state.run_id = str(uuid.uuid4())
-        st.session_state.run_ts_utc = datetime.utcnow().isoformat()
+    st.session_state.run_id = str(uuid.uuid4())
+    st.session_state.run_ts_utc = datetime.utcnow().isoformat()
 
-        df_raw_dev = df.copy()
-        if "_rid" not in df_raw_dev.columns:
-            df_raw_dev["_rid"] = range(len(df_raw_dev))
-        st.session_state.df_raw_dev = df_raw_dev
+    df_raw_dev = df.copy()
+    if "_rid" not in df_raw_dev.columns:
+        df_raw_dev["_rid"] = range(len(df_raw_dev))
+    st.session_state.df_raw_dev = df_raw_dev
 
-        if "_rid" not in df.columns:
-            df["_rid"] = range(len(df))
+    if "_rid" not in df.columns:
+        df["_rid"] = range(len(df))
 
-        st.session_state.df = df
-        st.session_state.report_ready = True
-        st.session_state.review_mode = False
-        st.session_state.csv_ready = False
+    st.session_state.df = df
+    st.session_state.report_ready = True
+    st.session_state.review_mode = False
+    st.session_state.csv_ready = False
 
 def _do_preview():
     st.session_state.preview_show = True
@@ -0,0 +1,3 @@
+from spellchecker.batch import main
+
+raise SystemExit(main())
@@ -0,0 +1,235 @@
+from __future__ import annotations
+import os, sys, json, time, glob, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from spellchecker.settings import Settings
+from spellchecker.pipeline import iter_findings
+from spellchecker.engine.suggest_wrapper import build_engine
+from spellchecker.reporting.writer import write_stream
+from spellchecker.cache.result_cache import doc_cache_key, result_cache_key
+from spellchecker.vocab.loaders import load_txt_set, load_version, load_resources_from_dir, load_suggest_models_from_dir
+from spellchecker.vocab.store import LayeredVocab
+
+EXTS = (".pdf", ".docx")
+DONE_FILE = "_done.jsonl"
+SUMMARY_FILE = "summary.json"
+
+def _glob_root(pattern: str) -> str:
+    # directory part of a glob before its first wildcard
+    parts = []
+    for part in os.path.normpath(pattern).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    root = os.sep.join(parts) if parts else "."
+    return root if os.path.isdir(root) else os.path.dirname(root) or "."
+
+def collect_inputs(inputs: Iterable[str]) -> List[Tuple[str, str]]:
+    # (path, output name); directories and globs keep the layout relative to
+    # their root in the output name, so a/report.pdf and b/report.pdf get
+    # different outputs. Two inputs mapping to one output name are an error.
+    out: List[Tuple[str, str]] = []
+    seen: Set[str] = set()
+    names: Dict[str, str] = {}
+
+    def add(path: str, rel: str) -> None:
+        ap = os.path.abspath(path)
+        if ap in seen or not ap.lower().endswith(EXTS):
+            return
+        seen.add(ap)
+        name = rel.replace(os.sep, "__").replace("/", "__")
+        other = names.get(name)
+        if other is not None:
+            raise ValueError(f"output name {name!r} used by both {other} and {ap}")
+        names[name] = ap
+        out.append((ap, name))
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, _, files in os.walk(item):
+                for n in sorted(files):
+                    full = os.path.join(dirpath, n)
+                    add(full, os.path.relpath(full, item))
+        elif glob.has_magic(item):
+            root = _glob_root(item)
+            for full in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(full):
+                    add(full, os.path.relpath(full, root))
+        elif os.path.isfile(item):
+            add(item, os.path.basename(item))
+    return out
+
+def file_signature(path: str, version: str, cfg: Settings, user_vocab: Iterable[str]) -> str:
+    # Same key as ResultCache: file content, resource version, settings and
+    # user vocabulary, so a rerun under any other of these redoes the file.
+    with open(path, "rb") as f:
+        return result_cache_key(doc_cache_key(f.read(), version, cfg), user_vocab)
+
+def load_done(out_dir: str) -> Dict[str, Dict[str, Any]]:
+    path = os.path.join(out_dir, DONE_FILE)
+    done: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                # last line may be cut by an interruption
+                continue
+            done[row["signature"]] = row
+    return done
+
+# Per worker process: (cfg, resources, engine), loaded once by _init_worker.
+_WORKER: Optional[Tuple[Settings, Dict[str, Any], Any]] = None
+
+def load_local_checker(resources_dir: str, user_vocab: Set[str]) -> Tuple[Dict[str, Any], Any]:
+    resources = load_resources_from_dir(resources_dir)
+    resources["known_vocab"] = LayeredVocab(resources["known_vocab"], user_vocab or ())
+    resources["inflection_lexicon"] = resources["inflection_lexicon"].extended(user_vocab or ())
+    resources["vocab_index"] = resources["vocab_index"].extended(user_vocab or ())
+    eng = build_engine(resources, load_suggest_models_from_dir(resources_dir))
+    return resources, eng
+
+def _init_worker(resources_dir: str, cfg: Settings, user_vocab: Set[str]) -> None:
+    global _WORKER
+    resources, eng = load_local_checker(resources_dir, user_vocab)
+    _WORKER = (cfg, resources, eng)
+
+def _check_file(path: str, name: str, signature: str, out_dir: str) -> Dict[str, Any]:
+    cfg, res, eng = _WORKER
+    csv_path = os.path.join(out_dir, name + ".csv")
+    jsonl_path = os.path.join(out_dir, name + ".jsonl")
+    row: Dict[str, Any] = {"path": path, "name": name, "signature": signature}
+    try:
+        events = iter_findings(
+            path, cfg, eng,
+            res["known_vocab"], res["english_vocab"], res["known_vocab_for_names"], res["ignore_vocab"],
+            res["domain_terms"], res["protected_phrases"], res["protected_name_tokens"],
+            progress_every=0,
+            vocab_index=res["vocab_index"],
+            inflection_lexicon=res["inflection_lexicon"],
+        )
+        meta = write_stream(events, cfg.topk, csv_path=csv_path + ".tmp", jsonl_path=jsonl_path + ".tmp")
+        os.replace(csv_path + ".tmp", csv_path)
+        os.replace(jsonl_path + ".tmp", jsonl_path)
+    except Exception as e:
+        row["error"] = repr(e)
+        return row
+    row.update({k: meta.get(k) for k in ("findings_count", "tokens_count", "unit", "units_done", "elapsed_s")})
+    return row
+
+def summarize(rows: List[Dict[str, Any]], wall_s: float) -> Dict[str, Any]:
+    ok = [r for r in rows if "error" not in r]
+    pages = sum(r.get("units_done") or 0 for r in ok if r.get("unit") == "page")
+    paragraphs = sum(r.get("units_done") or 0 for r in ok if r.get("unit") == "paragraph")
+    tokens = sum(r.get("tokens_count") or 0 for r in ok)
+    return {
+        "files": len(rows),
+        "errors": len(rows) - len(ok),
+        "findings": sum(r.get("findings_count") or 0 for r in ok),
+        "pages": pages,
+        "paragraphs": paragraphs,
+        "tokens": tokens,
+        "wall_s": round(wall_s, 3),
+        "pages_per_s": round(pages / wall_s, 2) if wall_s > 0 else 0.0,
+        "paragraphs_per_s": round(paragraphs / wall_s, 2) if wall_s > 0 else 0.0,
+        "tokens_per_s": round(tokens / wall_s, 1) if wall_s > 0 else 0.0,
+    }
+
+def run_batch(
+    inputs: Iterable[str],
+    resources_dir: str,
+    out_dir: str,
+    cfg: Settings,
+    user_vocab: Set[str],
+    workers: int = 1,
+    resume: bool = True,
+    log=print,
+) -> Dict[str, Any]:
+    os.makedirs(out_dir, exist_ok=True)
+    files = collect_inputs(inputs)
+    done = load_done(out_dir) if resume else {}
+    version = load_version(resources_dir)
+    todo: List[Tuple[str, str, str]] = []
+    prev_rows: List[Dict[str, Any]] = []
+    for p, n in files:
+        sig = file_signature(p, version, cfg, user_vocab)
+        row = done.get(sig)
+        if row is None:
+            todo.append((p, n, sig))
+        else:
+            prev_rows.append(row)
+    log(f"{len(files)} file, {len(files) - len(todo)} sudah selesai, {len(todo)} diproses ({workers} worker)")
+
+    t0 = time.perf_counter()
+    rows: List[Dict[str, Any]] = []
+    with open(os.path.join(out_dir, DONE_FILE), "a" if resume else "w", encoding="utf-8") as f_done:
+        def finish(row: Dict[str, Any]) -> None:
+            rows.append(row)
+            if "error" in row:
+                log(f"[{len(rows)}/{len(todo)}] GAGAL {row['path']}: {row['error']}")
+                return
+            f_done.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f_done.flush()
+            log(f"[{len(rows)}/{len(todo)}] {row['name']}: {row['findings_count']} temuan, {row['elapsed_s']} detik")
+
+        if not todo:
+            pass
+        elif workers <= 1:
+            _init_worker(resources_dir, cfg, user_vocab)
+            for p, n, sig in todo:
+                finish(_check_file(p, n, sig, out_dir))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(resources_dir, cfg, user_vocab)) as ex:
+                futs = [ex.submit(_check_file, p, n, sig, out_dir) for p, n, sig in todo]
+                for fut in as_completed(futs):
+                    finish(fut.result())
+
+    # Throughput covers this invocation only; the file list covers every
+    # input checked so far, including runs before an interruption.
+    summary = summarize(rows, time.perf_counter() - t0)
+    summary["version"] = version
+    summary["skipped_done"] = len(prev_rows)
+    summary["findings_total"] = sum(r.get("findings_count") or 0 for r in prev_rows + rows if "error" not in r)
+    with open(os.path.join(out_dir, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "files": prev_rows + rows}, f, ensure_ascii=False, indent=2)
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m spellchecker", description="Pemeriksaan batch file DOCX/PDF.")
+    ap.add_argument("inputs", nargs="+", help="file, folder, atau glob")
+    ap.add_argument("--resources", required=True, help="folder kamus lokal (struktur sama dengan bucket storage)")
+    ap.add_argument("--out", required=True, help="folder output CSV/JSONL dan summary.json")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--user-vocab", default=None, help="file txt kata tambahan")
+    ap.add_argument("--topk", type=int, default=3)
+    ap.add_argument("--max-findings", type=int, default=2000)
+    ap.add_argument("--top1-conf", type=float, default=0.72)
+    ap.add_argument("--no-resume", action="store_true", help="proses ulang semua file")
+    args = ap.parse_args(argv)
+
+    cfg = Settings(
+        topk=args.topk,
+        max_findings_per_file=args.max_findings,
+        show_only_top1_if_conf_ge=args.top1_conf,
+        collect_stats=False,
+    )
+    try:
+        summary = run_batch(
+            args.inputs, args.resources, args.out, cfg,
+            user_vocab=load_txt_set(args.user_vocab) if args.user_vocab else set(),
+            workers=max(1, args.workers),
+            resume=not args.no_resume,
+            log=lambda msg: print(msg, file=sys.stderr),
+        )
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(
+        f"{summary['files']} file ({summary['errors']} gagal), {summary['findings']} temuan, "
+        f"{summary['pages_per_s']} halaman/s, {summary['paragraphs_per_s']} paragraf/s, "
+        f"{summary['tokens_per_s']} token/s, {summary['wall_s']} detik"
+    )
+    return 1 if summary["errors"] else 0
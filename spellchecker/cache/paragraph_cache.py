@@ -0,0 +1,65 @@
+from __future__ import annotations
+import hashlib, threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from spellchecker.settings import Settings
+from spellchecker.cache.result_cache import settings_fingerprint, vocab_fingerprint
+from spellchecker.rules.abbr import AbbrevRegistry
+from spellchecker.rules.capital import SentenceStarts
+from spellchecker.rules.context_skip import ContextSkipIndex
+
+# Sentinel for memo values that may legitimately be None.
+MISSING = object()
+
+class ParagraphEntry:
+    # Everything about a DOCX paragraph that does not depend on the rest of
+    # the document. Per-token stage results in `memo` are filled lazily, the
+    # first time a token reaches that stage in any document.
+    __slots__ = (
+        "triples", "toks_norm", "sentence_starts", "protected", "phrase_idx", "context_skip", "abbrevs",
+        "hold_last_as_carry", "carry", "carry_from_hyphen", "memo",
+    )
+
+    def __init__(self, triples: List[Tuple]) -> None:
+        self.triples = triples
+        self.toks_norm: List[str] = []
+        self.sentence_starts = SentenceStarts("")
+        self.protected: FrozenSet[int] = frozenset()
+        self.phrase_idx: FrozenSet[int] = frozenset()
+        self.context_skip = ContextSkipIndex()
+        self.abbrevs = AbbrevRegistry("")
+        self.hold_last_as_carry = False
+        self.carry: Optional[str] = None
+        self.carry_from_hyphen = False
+        self.memo: List[Dict[str, Any]] = [{} for _ in triples]
+
+def paragraph_scope(version: str, cfg: Settings, user_vocab: Iterable[str]) -> str:
+    # Entries are only valid for the same resources, settings and user words.
+    return "|".join((str(version), settings_fingerprint(cfg), vocab_fingerprint(user_vocab)))
+
+class ParagraphCache:
+    def __init__(self, max_entries: int = 20000) -> None:
+        self.max_entries = int(max_entries)
+        self._items: "OrderedDict[str, ParagraphEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(scope: str, text: str) -> str:
+        return hashlib.sha1((scope + "\0" + text).encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get(self, scope: str, text: str) -> Optional[ParagraphEntry]:
+        key = self._key(scope, text)
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+            return entry
+
+    def put(self, scope: str, text: str, entry: ParagraphEntry) -> None:
+        key = self._key(scope, text)
+        with self._lock:
+            self._items[key] = entry
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
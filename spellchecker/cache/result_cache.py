@@ -0,0 +1,165 @@
+from __future__ import annotations
+import os, json, hashlib, tempfile
+from dataclasses import asdict, fields
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from spellchecker.settings import Settings
+from spellchecker.types import Finding
+
+# Settings fields that only affect instrumentation, never the findings.
+NON_RESULT_FIELDS = {"collect_stats", "rule_order_path", "profile_rules", "debug"}
+
+def settings_fingerprint(cfg: Settings) -> str:
+    d = {f.name: getattr(cfg, f.name) for f in fields(cfg) if f.name not in NON_RESULT_FIELDS}
+    return hashlib.sha1(json.dumps(d, sort_keys=True).encode("utf-8")).hexdigest()
+
+def vocab_fingerprint(words: Iterable[str]) -> str:
+    h = hashlib.sha1()
+    for w in sorted(set(words or ())):
+        h.update(w.encode("utf-8", "ignore"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+def doc_cache_key(file_bytes: Union[bytes, memoryview], version: str, cfg: Settings) -> str:
+    h = hashlib.sha256()
+    h.update(hashlib.sha256(file_bytes).digest())
+    h.update(b"|" + str(version).encode("utf-8") + b"|")
+    h.update(settings_fingerprint(cfg).encode("ascii"))
+    return h.hexdigest()
+
+def result_cache_key(doc_key: str, user_vocab: Iterable[str]) -> str:
+    h = hashlib.sha256()
+    h.update(doc_key.encode("ascii") + b"|")
+    h.update(vocab_fingerprint(user_vocab).encode("ascii"))
+    return h.hexdigest()
+
+# Puts between two full directory scans; the running total only sees this
+# process's writes, the rescan picks up the others.
+RESCAN_EVERY = 256
+# Eviction frees down to this share of max_bytes, so a full cache is not
+# rescanned on every put.
+EVICT_TO = 0.9
+
+class ResultCache:
+    # One JSON file per (document, version, user vocab, settings) key. Reads
+    # touch the file, so eviction by oldest mtime is LRU. put() keeps a
+    # running size total and only scans the directory when it passes
+    # max_bytes (or every RESCAN_EVERY puts).
+    def __init__(self, root: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self._total: Optional[int] = None
+        self._puts = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".json")
+
+    def _latest_path(self, doc_key: str) -> str:
+        return os.path.join(self.root, "latest", doc_key + ".json")
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _write(self, path: str, data: Dict[str, Any]) -> bool:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+        return True
+
+    def get(self, key: str) -> Optional[Tuple[List[Finding], Dict[str, Any]]]:
+        data = self._read(self._path(key))
+        if data is None:
+            return None
+        findings = [Finding(**d) for d in data.get("findings", [])]
+        return findings, data.get("meta", {})
+
+    def get_latest(self, doc_key: str) -> Optional[Tuple[List[Finding], Dict[str, Any], Set[str]]]:
+        # Most recent result for the same document under any user vocabulary.
+        ptr = self._read(self._latest_path(doc_key))
+        if not ptr or not ptr.get("key"):
+            return None
+        data = self._read(self._path(ptr["key"]))
+        if data is None:
+            return None
+        findings = [Finding(**d) for d in data.get("findings", [])]
+        return findings, data.get("meta", {}), set(data.get("user_vocab") or [])
+
+    def put(
+        self,
+        key: str,
+        findings: List[Finding],
+        meta: Dict[str, Any],
+        doc_key: Optional[str] = None,
+        user_vocab: Optional[Iterable[str]] = None,
+    ) -> None:
+        data = {
+            "findings": [asdict(x) for x in findings],
+            "meta": meta,
+            "user_vocab": sorted(set(user_vocab or ())),
+        }
+        paths = [self._path(key)]
+        if doc_key is not None:
+            paths.append(self._latest_path(doc_key))
+        before = sum(self._size(p) for p in paths)
+        if not self._write(paths[0], data):
+            return
+        if doc_key is not None:
+            self._write(paths[1], {"key": key})
+        self._puts += 1
+        if self._total is None or self._puts >= RESCAN_EVERY:
+            self.evict()
+            return
+        self._total += sum(self._size(p) for p in paths) - before
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        # Full scan: resyncs the running total and, over max_bytes, drops the
+        # oldest files down to EVICT_TO of it.
+        entries = []
+        total = 0
+        for dirpath, _, names in os.walk(self.root):
+            for n in names:
+                if not n.endswith(".json"):
+                    continue
+                p = os.path.join(dirpath, n)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+        self._puts = 0
+        if total > self.max_bytes:
+            target = int(self.max_bytes * EVICT_TO)
+            entries.sort()
+            for _, size, p in entries:
+                try:
+                    os.remove(p)
+                except OSError:
+                    continue
+                total -= size
+                if total <= target:
+                    break
+        self._total = total
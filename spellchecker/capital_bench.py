@@ -0,0 +1,76 @@
+from __future__ import annotations
+import sys, time, random, argparse
+from typing import Any, Dict, List, Optional
+
+from spellchecker.rules.text import NormalizedText, tokenize_docx_paragraph_with_context
+from spellchecker.rules.capital import SentenceStarts, is_sentence_start_from_offset
+from spellchecker.extractors.docx_extractor import iter_docx_paragraph_texts
+
+# Sentence-start lookups for the DOCX capital check: per-token
+# is_sentence_start_from_offset (copies the paragraph prefix every time)
+# against one SentenceStarts per paragraph. Long table-of-contents
+# paragraphs, with dot leaders and numbering on every entry, are the worst
+# case for the per-token version.
+
+TOC_TITLES = [
+    "Kata Pengantar", "Daftar Isi", "Daftar Tabel", "Daftar Gambar", "Pendahuluan",
+    "Latar Belakang", "Tujuan", "Metodologi", "Konsep dan Definisi", "Sumber Data",
+    "Kependudukan", "Ketenagakerjaan", "Pendidikan", "Kesehatan", "Perumahan",
+    "Pertanian", "Industri Pengolahan", "Perdagangan", "Inflasi (IHK)", "Lampiran",
+]
+
+def toc_paragraph(chars: int, seed: int = 0) -> str:
+    # "1.2 Latar Belakang ........ 3 1.3 Tujuan ........ 4 ..." as one paragraph
+    rnd = random.Random(seed)
+    parts: List[str] = []
+    n = page = 0
+    while n < chars:
+        page += rnd.randint(0, 3)
+        entry = f"{rnd.randint(1, 9)}.{rnd.randint(1, 12)} {rnd.choice(TOC_TITLES)} {'.' * rnd.randint(8, 40)} {page}"
+        parts.append(entry)
+        n += len(entry) + 1
+    return " ".join(parts)[:chars]
+
+def measure(paragraphs: List[str]) -> Dict[str, Any]:
+    units = []
+    for p in paragraphs:
+        nt = NormalizedText(p)
+        units.append((nt.keep_case, [t.start for t in tokenize_docx_paragraph_with_context(nt)]))
+
+    t0 = time.perf_counter()
+    old = [[is_sentence_start_from_offset(raw, i) for i in starts] for raw, starts in units]
+    t1 = time.perf_counter()
+    new = []
+    for raw, starts in units:
+        ss = SentenceStarts(raw)
+        new.append([i in ss for i in starts])
+    t2 = time.perf_counter()
+    return {
+        "paragraphs": len(units),
+        "tokens": sum(len(s) for _, s in units),
+        "per_token_ms": round((t1 - t0) * 1000.0, 2),
+        "index_ms": round((t2 - t1) * 1000.0, 2),
+        "equal": old == new,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m spellchecker.capital_bench", description="Benchmark awal kalimat untuk pemeriksaan huruf kapital.")
+    ap.add_argument("--docx", default=None, help="pakai paragraf dari file DOCX ini (default: daftar isi sintetis)")
+    ap.add_argument("--chars", type=int, default=5000, help="panjang paragraf daftar isi sintetis")
+    ap.add_argument("--paragraphs", type=int, default=50, help="jumlah paragraf daftar isi sintetis")
+    args = ap.parse_args(argv)
+
+    if args.docx:
+        paragraphs = [p.strip() for p in iter_docx_paragraph_texts(args.docx) if p.strip()]
+    else:
+        paragraphs = [toc_paragraph(args.chars, seed=i) for i in range(args.paragraphs)]
+
+    out = measure(paragraphs)
+    print(
+        f"{out['paragraphs']} paragraf, {out['tokens']} token: per token {out['per_token_ms']} ms, "
+        f"indeks {out['index_ms']} ms, hasil {'sama' if out['equal'] else 'BERBEDA'}"
+    )
+    return 0 if out["equal"] else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
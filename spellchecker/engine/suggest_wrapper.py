@@ -1,21 +1,45 @@
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+import pickle
+from typing import Dict, Any, List, Optional, Set
+
+from spellchecker.vocab.index import SUGGEST, ENGLISH, ABBR
 
 _import_err = None
 try:
-    from suggest import SuggestEngine 
+    from suggest import SuggestEngine, INDEX_PKL
 except Exception as e:
     SuggestEngine = None
+    INDEX_PKL = "models/symspell_id.pkl"
     _import_err = e
 
+def engine_vocab(models: Dict | None = None) -> Set[str]:
+    # The vocabulary SuggestEngine loads from its SymSpell index. Offline
+    # only (python -m spellchecker.vocab.store puts it in the store); at run
+    # time the engine is the only one to unpickle the index.
+    path = (models or {}).get("index_pkl") or INDEX_PKL
+    with open(path, "rb") as f:
+        return pickle.load(f)["vocab"]
+
 def build_engine(resources: Dict, models: Dict | None = None):
     if SuggestEngine is None:
         raise ImportError(f"SuggestEngine not found. Root error: {_import_err!r}")
-    return SuggestEngine(
+    kwargs = {}
+    if models and models.get("index_pkl"):
+        kwargs["index_pkl"] = models["index_pkl"]
+    eng = SuggestEngine(
         english_vocab=resources.get("english_vocab", set()),
         singkatan=resources.get("singkatan", set()),
         models=models,
+        **kwargs,
     )
+    idx = resources.get("vocab_index")
+    if idx is not None and idx.bits & SUGGEST:
+        # the shared index (a store built with the engine vocabulary) holds
+        # the engine's vocabulary, english_vocab and singkatan; read-only
+        # here. Otherwise the engine keeps its own membership sets.
+        eng.classify = idx.classify
+        eng.known_bits = SUGGEST | ENGLISH | ABBR
+    return eng
 
 def normalize_suggestions(suggs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     out = []
@@ -36,3 +60,20 @@ def suggest(eng: Any, query: str, topk: int) -> Dict[str, Any]:
     res = eng.suggest(query, topk=topk) or {}
     res["suggestions"] = normalize_suggestions(res.get("suggestions", []))
     return res
+
+def suggest_many(eng: Any, queries: List[str], topk: int) -> Dict[str, Dict[str, Any]]:
+    # A token's whole query lattice in one call; the gain is that duplicate
+    # queries are asked once, the engine still does one lookup per query.
+    # Engines without suggest_batch get a plain loop.
+    qs = list(dict.fromkeys(queries))
+    batch = getattr(eng, "suggest_batch", None)
+    if batch is not None:
+        raw = batch(qs, topk=topk)
+    else:
+        raw = [eng.suggest(q, topk=topk) for q in qs]
+    out: Dict[str, Dict[str, Any]] = {}
+    for q, res in zip(qs, raw):
+        res = res or {}
+        res["suggestions"] = normalize_suggestions(res.get("suggestions", []))
+        out[q] = res
+    return out
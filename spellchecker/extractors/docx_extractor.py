@@ -4,8 +4,10 @@ from docx import Document
 from pathlib import Path
 import os, tempfile, subprocess
 
-def iter_docx_paragraph_texts(path: str) -> Iterable[str]:
-    doc = Document(path)
+from spellchecker.extractors.source import Source, open_source
+
+def iter_docx_paragraph_texts(src: Source) -> Iterable[str]:
+    doc = Document(open_source(src))
     for p in doc.paragraphs:
         if p.text:
             yield p.text
@@ -2,9 +2,15 @@ from __future__ import annotations
 from typing import Iterable, Tuple
 import pdfplumber
 
-def iter_pdf_pages_raw(path: str) -> Iterable[Tuple[int, str]]:
-    with pdfplumber.open(path) as pdf:
+from spellchecker.extractors.source import Source, open_source
+
+def iter_pdf_pages_raw(src: Source) -> Iterable[Tuple[int, str]]:
+    with pdfplumber.open(open_source(src)) as pdf:
         for i, page in enumerate(pdf.pages, start=1):
             t = page.extract_text() or ""
             if t.strip():
                 yield i, t
+
+def pdf_page_count(src: Source) -> int:
+    with pdfplumber.open(open_source(src)) as pdf:
+        return len(pdf.pages)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+import io
+from typing import Any, Union
+
+# A document source: a filesystem path, the file contents in memory
+# (bytes/bytearray/memoryview) or an open binary file object. pdfplumber and
+# python-docx both read from file objects, so in-memory uploads never touch
+# the disk.
+Source = Union[str, bytes, bytearray, memoryview, Any]
+
+def open_source(src: Source) -> Any:
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        # BytesIO over bytes shares the buffer until written to.
+        return io.BytesIO(src)
+    if hasattr(src, "seek"):
+        src.seek(0)
+    return src
+
+def source_bytes(src: Source) -> Union[bytes, bytearray, memoryview]:
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return src
+    if hasattr(src, "getbuffer"):
+        return src.getbuffer()
+    if hasattr(src, "read"):
+        src.seek(0)
+        return src.read()
+    with open(src, "rb") as f:
+        return f.read()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import sys, time, argparse
+from typing import Any, Dict, Iterable, List, Optional
+
+from docx import Document
+
+from spellchecker.settings import Settings
+from spellchecker.pipeline import DocxParagraphChecker, DocState
+from spellchecker.batch import load_local_checker
+
+# Latency benchmark for DocxParagraphChecker.check_paragraph, the editor-side
+# API: replays paragraphs as they would be typed (re-check after every word)
+# against one warm checker and reports percentiles per call. Tokens never
+# seen before still pay for a full SymSpell lookup, which shows up in max_ms.
+
+SAMPLE_PARAGRAPHS = [
+    "Badan Pusat Statistik (BPS) merupakan lembaga pemerintah yang bertugas menyediakan data statistik.",
+    "Pertumbuhan ekonomi Kabupaten Sidoarjo pada tahun 2023 mencapai 5,2 persen dibandingkan tahun sebelumnya.",
+    "Penduduk miskin adalah penduduk yang memiliki rata-rata pengeluaran per kapita per bulan di bawah garis kemiskinan.",
+    "Tingkat pengangguran terbuka (TPT) menunjukan persentase jumlah pengangguran terhadap jumlah angkatan kerja.",
+    "Hasil pendataan menunjukkan bahwa sebagian besar rumah tangga telah memiliki akses air minum layak.",
+    "Perhitungan inflasi menggunakan pendekatan Indeks Harga Konsumen (IHK) yang diterbitkan setiap bulan.",
+    "Rumah nya berada di dekat pasar tradisional yang ramai dikunjungi masyarakat.",
+    "Metodologi pengumpulan data menggunakan wawancara tatap muka dengan kuesioner terstruktur.",
+]
+
+def percentile(sorted_ms: List[float], q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    i = min(len(sorted_ms) - 1, max(0, int(round(q * (len(sorted_ms) - 1)))))
+    return sorted_ms[i]
+
+def state_copy(state: DocState) -> DocState:
+    # Intermediate typing steps must not leak into the document state.
+    out = DocState()
+    for name in DocState.__slots__:
+        v = getattr(state, name)
+        setattr(out, name, v.copy() if hasattr(v, "copy") else v)
+    return out
+
+def typing_steps(paragraph: str) -> List[str]:
+    words = paragraph.split()
+    return [" ".join(words[:i]) for i in range(1, len(words) + 1)]
+
+def measure_paragraph_latency(
+    checker: DocxParagraphChecker,
+    paragraphs: List[str],
+    warmup_paragraphs: Iterable[str] = (),
+) -> Dict[str, Any]:
+    # Warm-up paragraphs fill the suggestion caches the way an open editor
+    # session would; the measured paragraphs are not part of them, so each
+    # typing step is seen for the first time.
+    state = DocState()
+    for para in warmup_paragraphs:
+        checker.check_paragraph(para, state)
+
+    times: List[float] = []
+    for para in paragraphs:
+        for text in typing_steps(para):
+            t0 = time.perf_counter()
+            checker.check_paragraph(text, state_copy(state))
+            times.append((time.perf_counter() - t0) * 1000.0)
+        # the finished paragraph moves the document state forward
+        checker.check_paragraph(para, state)
+    times.sort()
+    return {
+        "calls": len(times),
+        "p50_ms": round(percentile(times, 0.50), 3),
+        "p95_ms": round(percentile(times, 0.95), 3),
+        "p99_ms": round(percentile(times, 0.99), 3),
+        "max_ms": round(times[-1], 3) if times else 0.0,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m spellchecker.latency", description="Benchmark latensi check_paragraph.")
+    ap.add_argument("--resources", required=True, help="folder kamus lokal (struktur sama dengan bucket storage)")
+    ap.add_argument("--docx", default=None, help="ambil paragraf dari file DOCX ini (default: contoh bawaan)")
+    ap.add_argument("--limit", type=int, default=200, help="maksimum paragraf dari --docx")
+    ap.add_argument("--warmup", type=int, default=None, help="jumlah paragraf awal untuk pemanasan (default: separuh)")
+    ap.add_argument("--target-ms", type=float, default=10.0)
+    args = ap.parse_args(argv)
+
+    if args.docx:
+        paragraphs = [p.text.strip() for p in Document(args.docx).paragraphs if p.text.strip()][: args.limit]
+    else:
+        paragraphs = SAMPLE_PARAGRAPHS
+
+    n_warm = len(paragraphs) // 2 if args.warmup is None else args.warmup
+    warmup, paragraphs = paragraphs[:n_warm], paragraphs[n_warm:]
+
+    res, eng = load_local_checker(args.resources, set())
+    checker = DocxParagraphChecker(
+        Settings(collect_stats=False), eng,
+        res["known_vocab"], res["english_vocab"], res["known_vocab_for_names"], res["ignore_vocab"],
+        res["domain_terms"], res["protected_phrases"], res["protected_name_tokens"],
+        vocab_index=res["vocab_index"],
+        inflection_lexicon=res["inflection_lexicon"],
+    )
+    out = measure_paragraph_latency(checker, paragraphs, warmup_paragraphs=warmup)
+    ok = out["p99_ms"] <= args.target_ms
+    print(
+        f"{out['calls']} panggilan: p50 {out['p50_ms']} ms, p95 {out['p95_ms']} ms, "
+        f"p99 {out['p99_ms']} ms, max {out['max_ms']} ms (target p99 {args.target_ms} ms: {'OK' if ok else 'GAGAL'})"
+    )
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
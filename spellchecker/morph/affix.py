@@ -94,17 +94,22 @@ def top1_conf(suggs: List[Dict[str, Any]]) -> float:
     c = suggs[0].get("confidence")
     return float(c) if isinstance(c, (int, float)) else -1.0
 
-def pick_best_suggest_query_for_nya(tok: str, eng, topk: int, suggest_fn):
+def nya_query_candidates(tok: str) -> List[str]:
     base = tok[:-3]
     candidates = [base]
     if tok.endswith("anya") and base.endswith("a") and len(base) >= 3:
         candidates.append(base + "n")
+    return candidates
+
+def pick_best_suggest_query_for_nya(tok: str, results: Dict[str, Dict[str, Any]]):
+    # results: suggest result per query, see suggest_many
+    candidates = nya_query_candidates(tok)
 
     best_q = candidates[0]
-    best_res = suggest_fn(eng, best_q, topk)
+    best_res = results[best_q]
 
     for q in candidates[1:]:
-        res = suggest_fn(eng, q, topk)
+        res = results[q]
 
         if best_res.get("status") != "ok" and res.get("status") == "ok":
             best_q, best_res = q, res
@@ -117,6 +122,16 @@ def pick_best_suggest_query_for_nya(tok: str, eng, topk: int, suggest_fn):
 
     return best_q, best_res
 
+def pick_best_luluh_query(cands: List[str], results: Dict[str, Dict[str, Any]]) -> str:
+    # highest top1_conf, the earlier candidate on ties
+    best = cands[0]
+    best_conf = top1_conf(results[best].get("suggestions", []))
+    for c in cands[1:]:
+        conf = top1_conf(results[c].get("suggestions", []))
+        if conf > best_conf:
+            best, best_conf = c, conf
+    return best
+
 def reaffix_suggestion(stem_candidate: str, info: Dict[str, Any]) -> str:
     out = stem_candidate
     for s in reversed(info.get("suffixes", [])):
@@ -0,0 +1,249 @@
+from __future__ import annotations
+import os, io, sys, gzip, json, time, random, argparse
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from spellchecker.settings import Settings
+from spellchecker.cache.result_cache import vocab_fingerprint
+from spellchecker.rules.skip import should_skip_token
+from spellchecker.rules.inflection import InflectionLexicon, is_probably_valid_inflection
+
+# Offline build of the inflection lexicon (stem-level affixed forms of every
+# known_vocab root, see InflectionLexicon). Shipped next to the other models
+# as a gzip'd sorted word list with a one-line JSON header; the header
+# carries the format, the resource version and a fingerprint of the roots,
+# and a file whose roots do not match the loaded vocabulary is ignored.
+#
+#   python -m spellchecker.morph.lexicon --resources DIR          # build
+#   python -m spellchecker.morph.lexicon --check                  # fixed roots
+#   python -m spellchecker.morph.lexicon --resources DIR --check  # + full vocab
+#
+# --check compares is_probably_valid_inflection, with and without a lexicon,
+# against the frozen copy of the per-token affix search below. It always runs
+# on the fixed roots in benchdata/roots.txt and the words of
+# benchdata/corpus.txt, so it needs no resource files.
+
+LEXICON_PATH = "models/inflection_lexicon.txt.gz"
+LEXICON_FORMAT = "inflection-lexicon/1"
+BENCHDATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchdata")
+ROOTS_PATH = os.path.join(BENCHDATA, "roots.txt")
+
+def dump_lexicon(lex: InflectionLexicon, roots_fp: str) -> bytes:
+    forms = sorted(lex.forms | lex.extra)
+    head = {"format": LEXICON_FORMAT, "version": lex.version, "roots": roots_fp, "forms": len(forms)}
+    buf = io.BytesIO()
+    # mtime=0 so the same vocabulary always gives the same bytes
+    with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as f:
+        f.write(("# " + json.dumps(head, sort_keys=True) + "\n").encode("utf-8"))
+        f.write("\n".join(forms).encode("utf-8"))
+    return buf.getvalue()
+
+def parse_lexicon(b: bytes, roots_fp: str) -> Optional[InflectionLexicon]:
+    try:
+        lines = gzip.decompress(b).decode("utf-8").split("\n")
+        head = json.loads(lines[0][2:])
+    except (OSError, EOFError, ValueError, IndexError):
+        return None
+    if head.get("format") != LEXICON_FORMAT or head.get("roots") != roots_fp:
+        return None
+    return InflectionLexicon(frozenset(w for w in lines[1:] if w), version=str(head.get("version") or ""))
+
+def lexicon_from_bytes(b: Optional[bytes], known_vocab: Set[str], version: str = "") -> InflectionLexicon:
+    # the shipped artifact when it matches known_vocab, else built here
+    # (once per resource load, a few seconds for the full vocabulary)
+    lex = parse_lexicon(b, vocab_fingerprint(known_vocab)) if b else None
+    if lex is None:
+        print(f"{LEXICON_PATH} missing or stale for version {version or '-'}, building from roots", file=sys.stderr)
+        lex = InflectionLexicon.from_roots(known_vocab, version=version)
+    return lex
+
+def load_lexicon(root: str, known_vocab: Set[str], version: str = "") -> InflectionLexicon:
+    path = os.path.join(root, LEXICON_PATH)
+    b = None
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            b = f.read()
+    return lexicon_from_bytes(b, known_vocab, version)
+
+# is_probably_valid_inflection as it was before the lexicon, helpers
+# included. Frozen: do not change it along with rules/inflection.py.
+
+_REF_ENCLITICS = ("lah", "kah", "tah", "pun", "nya", "kan", "i", "an")
+_REF_PREFIXES_SIMPLE = ("di", "ke", "se", "ber", "ter", "per", "pe", "me")
+
+def _ref_strip_enclitic(tok: str) -> str:
+    for suf in _REF_ENCLITICS:
+        if tok.endswith(suf) and len(tok) > len(suf) + 2:
+            return tok[: -len(suf)]
+    return tok
+
+def _ref_strip_suffix_once(tok: str) -> List[str]:
+    cands = {tok}
+    if tok.endswith("nya") and len(tok) > 5:
+        cands.add(tok[:-3])
+    for suf in ("kan", "i", "an"):
+        if tok.endswith(suf) and len(tok) > len(suf) + 2:
+            base = tok[: -len(suf)]
+            cands.add(base)
+            if base.endswith("nya") and len(base) > 5:
+                cands.add(base[:-3])
+    return list(cands)
+
+def _ref_men_peN_stem_candidates(word: str, prefix_type: str) -> List[str]:
+    cands = set()
+    if word.startswith(prefix_type + "ny") and len(word) > 5:
+        rest = word[len(prefix_type + "ny"):]
+        cands.add("s" + rest)
+        cands.add(rest)
+    if word.startswith(prefix_type + "ng") and len(word) > 5:
+        rest = word[len(prefix_type + "ng"):]
+        cands.add(rest)
+        cands.add("k" + rest)
+    if word.startswith(prefix_type + "n") and len(word) > 4:
+        rest = word[len(prefix_type + "n"):]
+        cands.add(rest)
+        cands.add("t" + rest)
+    if word.startswith(prefix_type + "m") and len(word) > 4:
+        rest = word[len(prefix_type + "m"):]
+        cands.add(rest)
+        cands.add("p" + rest)
+    return [c for c in cands if len(c) >= 3]
+
+def reference_is_probably_valid_inflection(tok: str, known_vocab: Set[str], cfg: Settings) -> bool:
+    if not tok or should_skip_token(tok, cfg):
+        return False
+    if tok in known_vocab:
+        return True
+
+    t0 = _ref_strip_enclitic(tok)
+    suffix_stripped = _ref_strip_suffix_once(t0)
+
+    for t in suffix_stripped:
+        if t in known_vocab:
+            return True
+
+        for pref in _REF_PREFIXES_SIMPLE:
+            if t.startswith(pref) and len(t) > len(pref) + 2:
+                base = t[len(pref):]
+                if base in known_vocab:
+                    return True
+
+        if t.startswith("me") and len(t) > 4:
+            for cand in _ref_men_peN_stem_candidates(t, "me"):
+                if cand in known_vocab:
+                    return True
+
+        if t.startswith("pe") and len(t) > 4:
+            for cand in _ref_men_peN_stem_candidates(t, "pe"):
+                if cand in known_vocab:
+                    return True
+
+        for pref in ("ber", "ter", "per"):
+            if t.startswith(pref) and len(t) > len(pref) + 2:
+                base = t[len(pref):]
+                if base in known_vocab:
+                    return True
+
+        if t.startswith("ke") and t.endswith("an") and len(t) > 6:
+            mid = t[2:-2]
+            if mid in known_vocab:
+                return True
+        if t.startswith("pe") and t.endswith("an") and len(t) > 6:
+            mid = t[2:-2]
+            if mid in known_vocab:
+                return True
+
+    return False
+
+def load_fixed_roots(path: str = ROOTS_PATH) -> Set[str]:
+    with open(path, encoding="utf-8") as f:
+        return {w.strip() for w in f if w.strip()}
+
+def fixed_tokens(roots: Iterable[str]) -> Set[str]:
+    # probes of the roots plus every word of the benchmark corpus
+    from spellchecker.normalize_bench import load_corpus
+
+    out = probe_tokens(roots)
+    for para in load_corpus():
+        out.update(w.strip(".,;:()[]\"'“”‘’") for w in para.lower().split())
+    out.discard("")
+    return out
+
+def probe_tokens(roots: Iterable[str], per_root: int = 6, seed: int = 0) -> Set[str]:
+    # roots with random prefixes, first-letter drops, suffixes and enclitics
+    prefixes = ["", "di", "ke", "se", "ber", "ter", "per", "pe", "me", "men", "mem", "meng", "meny",
+                "pen", "pem", "peng", "peny", "memper", "mempe"]
+    suffixes = ["", "nya", "kan", "i", "an", "lah", "kah", "tah", "pun", "kannya", "annya", "inya"]
+    r = random.Random(seed)
+    out: Set[str] = set()
+    for w in sorted(roots):
+        out.add(w)
+        for _ in range(per_root):
+            out.add(r.choice(prefixes) + w[r.randint(0, 1):] + r.choice(suffixes) + r.choice(suffixes))
+    return out
+
+def check_lexicon(lex: InflectionLexicon, known_vocab: Set[str], tokens: Iterable[str], cfg: Optional[Settings] = None) -> Dict[str, Any]:
+    # the lexicon path and the lexicon-less fallback, both against the reference
+    cfg = cfg or Settings()
+    toks = sorted(tokens)
+    t0 = time.perf_counter()
+    ref = [reference_is_probably_valid_inflection(t, known_vocab, cfg) for t in toks]
+    t1 = time.perf_counter()
+    new = [is_probably_valid_inflection(t, known_vocab, cfg, lex) for t in toks]
+    t2 = time.perf_counter()
+    search = [is_probably_valid_inflection(t, known_vocab, cfg) for t in toks]
+    return {
+        "tokens": len(toks),
+        "search_ms": round((t1 - t0) * 1000.0, 2),
+        "lexicon_ms": round((t2 - t1) * 1000.0, 2),
+        "diff": [t for t, a, b, c in zip(toks, ref, new, search) if not a == b == c],
+    }
+
+def _print_check(label: str, out: Dict[str, Any]) -> None:
+    for t in out["diff"][:20]:
+        print(f"BEDA {t!r}")
+    print(f"{label}: {out['tokens']} token, pencarian {out['search_ms']} ms, leksikon {out['lexicon_ms']} ms, {len(out['diff'])} perbedaan")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from spellchecker.vocab.loaders import load_resources_from_dir, load_version
+
+    ap = argparse.ArgumentParser(prog="python -m spellchecker.morph.lexicon", description="Bangun leksikon bentuk berimbuhan dari kata dasar kamus.")
+    ap.add_argument("--resources", default=None, help="folder kamus lokal (struktur sama dengan bucket storage)")
+    ap.add_argument("--out", default=None, help=f"file keluaran (default: <resources>/{LEXICON_PATH})")
+    ap.add_argument("--check", action="store_true", help="bandingkan dengan pencarian imbuhan referensi pada kata dasar tetap (dan kamus bila --resources)")
+    args = ap.parse_args(argv)
+    if not args.resources and not args.check:
+        ap.error("--resources wajib kecuali dengan --check")
+
+    ok = True
+    if args.check:
+        roots = load_fixed_roots()
+        out = check_lexicon(InflectionLexicon.from_roots(roots), roots, fixed_tokens(roots))
+        _print_check(f"{len(roots)} kata dasar tetap", out)
+        ok = not out["diff"]
+        if not args.resources:
+            return 0 if ok else 1
+
+    res = load_resources_from_dir(args.resources)
+    known_vocab = res["known_vocab"]
+    version = load_version(args.resources)
+
+    t0 = time.perf_counter()
+    lex = InflectionLexicon.from_roots(known_vocab, version=version)
+    build_ms = (time.perf_counter() - t0) * 1000.0
+    data = dump_lexicon(lex, vocab_fingerprint(known_vocab))
+    print(f"{len(known_vocab)} kata dasar -> {len(lex)} bentuk, {build_ms:.0f} ms, {len(data) / 1024:.0f} KiB")
+
+    if args.check:
+        out = check_lexicon(lex, known_vocab, probe_tokens(known_vocab))
+        _print_check("kamus", out)
+        return 0 if ok and not out["diff"] else 1
+
+    path = args.out or os.path.join(args.resources, LEXICON_PATH)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    print(f"ditulis ke {path}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,17 +1,18 @@
 from typing import List, Tuple, Optional, Dict, Any
+from spellchecker.rules.text import TokenSpan
 
 def detect_space_error_nya(
-    triples: List[Tuple[str, str, str, str, int, int]],
+    triples: List[TokenSpan],
     idx: int,
 ) -> Optional[Dict[str, Any]]:
     if idx <= 0 or idx >= len(triples):
         return None
 
-    tok, tok_orig, snippet, snippet_raw, start, end = triples[idx]
+    tok, tok_orig = triples[idx].tok, triples[idx].tok_orig
     if tok != "nya":
         return None
 
-    prev_tok, prev_orig, *_rest = triples[idx - 1]
+    prev_tok, prev_orig = triples[idx - 1].tok, triples[idx - 1].tok_orig
 
     if not prev_tok or not prev_tok.isalpha():
         return None
@@ -0,0 +1,148 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+
+from spellchecker.settings import Settings
+from spellchecker.morph.affix import _AFFIX_PREFIXES, apply_luluh_candidates
+from spellchecker.rules.inflection import _ENCLITICS
+
+# Stemmer on the project's own affix tables: suffixes are peeled in layers
+# (particle, then -nya, then -kan/-i/-an), prefixes up to two rounds with the
+# meN-/peN- letter restored, and the first candidate found in the loaded
+# vocabulary is the stem. Same interface as Sastrawi's stemmer (stem(word),
+# the word itself when nothing is found); cfg.stemmer picks between them.
+
+_POSSESSIVES = ("nya",)
+_DERIVATIONAL = ("kan", "i", "an")
+_PARTICLES = tuple(s for s in _ENCLITICS if s not in _POSSESSIVES + _DERIVATIONAL)
+_SUFFIX_LAYERS = (_PARTICLES, _POSSESSIVES, _DERIVATIONAL)
+
+_VOWELS = "aeiou"
+# Letters the stripped rest may start with after each prefix (None: any).
+# meN-/peN- follow the nasal assimilation rules, the dropped k/p/t/s come
+# back through apply_luluh_candidates; ber-/ter-/per- lose their r before r.
+_PREFIX_ALLOWS: Dict[str, Optional[str]] = {
+    "meng": _VOWELS + "ghk", "peng": _VOWELS + "ghk",
+    "meny": _VOWELS, "peny": _VOWELS,
+    "men": _VOWELS + "dcjzs", "pen": _VOWELS + "dcjzs",
+    "mem": _VOWELS + "bfvp", "pem": _VOWELS + "bfvp",
+    "me": "lrwymn", "pe": "lrwymn",
+    "ber": "abcdefghijklmnopqstuvwxyz",
+    "ter": "abcdefghijklmnopqstuvwxyz",
+    "per": "abcdefghijklmnopqstuvwxyz",
+}
+
+_MIN_STEM = 3
+_MAX_PREFIX_ROUNDS = 2
+STEM_MEMO_MAX = 50000
+
+STEMMERS = ("sastrawi", "lexicon")
+
+class AffixTrie:
+    # Character trie over affixes; matches() returns every affix that the
+    # word starts with (ends with, for a suffix trie), longest first.
+    __slots__ = ("_root", "_suffix")
+
+    def __init__(self, affixes, suffix: bool = False) -> None:
+        self._root: Dict[str, Any] = {}
+        self._suffix = suffix
+        for a in set(affixes):
+            node = self._root
+            for ch in (reversed(a) if suffix else a):
+                node = node.setdefault(ch, {})
+            node[""] = a
+
+    def matches(self, word: str) -> List[str]:
+        out: List[str] = []
+        node = self._root
+        for ch in (reversed(word) if self._suffix else word):
+            node = node.get(ch)
+            if node is None:
+                break
+            a = node.get("")
+            if a is not None:
+                out.append(a)
+        out.reverse()
+        return out
+
+_PREFIX_TRIE = AffixTrie(_AFFIX_PREFIXES)
+_SUFFIX_TRIES = tuple(AffixTrie(layer, suffix=True) for layer in _SUFFIX_LAYERS)
+
+def _suffix_bases(word: str) -> List[str]:
+    # word with 0..3 suffix layers removed, fewest removed first
+    bases = [word]
+    frontier = [word]
+    for trie in _SUFFIX_TRIES:
+        nxt = []
+        for w in frontier:
+            for s in trie.matches(w):
+                if len(w) - len(s) >= _MIN_STEM:
+                    nxt.append(w[: -len(s)])
+        bases += nxt
+        frontier = frontier + nxt
+    return bases
+
+def _prefix_candidates(word: str, rounds: int) -> Iterator[str]:
+    for p in _PREFIX_TRIE.matches(word):
+        rest = word[len(p):]
+        if len(rest) < _MIN_STEM:
+            continue
+        allows = _PREFIX_ALLOWS.get(p)
+        if allows is not None and rest[0] not in allows:
+            continue
+        for c in apply_luluh_candidates(rest, [p]):
+            yield c
+            if rounds > 1:
+                yield from _prefix_candidates(c, rounds - 1)
+
+class LexiconStemmer:
+    __slots__ = ("vocab", "_memo")
+
+    def __init__(self, vocab: Set[str]) -> None:
+        self.vocab = vocab
+        self._memo: Dict[str, str] = {}
+
+    @staticmethod
+    def candidates(word: str) -> Iterator[str]:
+        # in the order stem() tries them; does not depend on the vocabulary
+        for b in _suffix_bases(word):
+            yield b
+            yield from _prefix_candidates(b, _MAX_PREFIX_ROUNDS)
+
+    def stem(self, word: str) -> str:
+        hit = self._memo.get(word)
+        if hit is not None:
+            return hit
+        out = word
+        vocab = self.vocab
+        for c in self.candidates(word):
+            if c in vocab:
+                out = c
+                break
+        if len(self._memo) >= STEM_MEMO_MAX:
+            self._memo.clear()
+        self._memo[word] = out
+        return out
+
+# One stemmer (and memo) per vocabulary set, keyed by identity like
+# phrase_matcher; the set is kept alive with it so the id stays valid.
+_STEMMERS: Dict[int, Tuple[Set[str], LexiconStemmer]] = {}
+_STEMMERS_MAX = 8
+
+def lexicon_stemmer(vocab: Set[str]) -> LexiconStemmer:
+    hit = _STEMMERS.get(id(vocab))
+    if hit is not None and hit[0] is vocab:
+        return hit[1]
+    s = LexiconStemmer(vocab)
+    if len(_STEMMERS) >= _STEMMERS_MAX:
+        _STEMMERS.clear()
+    _STEMMERS[id(vocab)] = (vocab, s)
+    return s
+
+def make_stemmer(cfg: Settings, known_vocab: Set[str]) -> Any:
+    if cfg.stemmer == "lexicon":
+        return lexicon_stemmer(known_vocab)
+    if cfg.stemmer == "sastrawi":
+        return StemmerFactory().create_stemmer()
+    raise ValueError(f"unknown stemmer {cfg.stemmer!r}, expected one of {STEMMERS}")
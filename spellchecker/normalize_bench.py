@@ -0,0 +1,208 @@
+from __future__ import annotations
+import os, re, sys, time, argparse, unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from spellchecker.rules import text as T
+from spellchecker.rules.formula import looks_like_formula_line, looks_like_formula_math
+from spellchecker.rules.biblio import is_bibliography_citation_line
+from spellchecker.extractors.pdf_extractor import iter_pdf_pages_raw
+from spellchecker.extractors.docx_extractor import iter_docx_paragraph_texts
+
+# Counts full-text normalization passes (NFKC + regex substitutions) per
+# page/paragraph for the old per-step calls and for one NormalizedText, and
+# checks the compiled normalizer against the chained re.sub reference below.
+# --check always runs on the fixed corpus in benchdata/corpus.txt (report
+# paragraphs, regency lists, citation lines, URLs, degrees, subscripts), so
+# it needs no input files.
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchdata", "corpus.txt")
+
+def load_corpus(path: str = CORPUS_PATH) -> List[str]:
+    # blank-line separated paragraphs; lines inside one are kept
+    with open(path, encoding="utf-8") as f:
+        return [p.strip("\n") for p in f.read().split("\n\n") if p.strip()]
+
+def reference_normalize_math_text(s: str) -> str:
+    if not s:
+        return ""
+    s = unicodedata.normalize("NFKC", s)
+    s = s.translate(T._SUBSCRIPT_MAP)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+def _reference_protect_urls(s: str) -> str:
+    s = T.RE_URL.sub(" __URL__ ", s)
+    return T.RE_DOMAIN.sub(" __URL__ ", s)
+
+def reference_normalize_text(s: str) -> str:
+    s = reference_normalize_math_text(s)
+    s = _reference_protect_urls(s)
+    s = s.replace("\u00a0", " ")
+    s = s.replace("\u00ad", "")
+    s = re.sub(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.([A-Za-z]{1,6})\.?\b", r"\1_\2_\3", s)
+    s = re.sub(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.?\b", r"\1_\2", s)
+    s = re.sub(r"\b([A-Za-z]+)-([A-Za-z]+)\b", r"\1_\2", s)
+    return s.lower()
+
+def reference_normalize_text_keep_case(s: str) -> str:
+    s = reference_normalize_math_text(s)
+    s = _reference_protect_urls(s)
+    s = s.replace("\u00a0", " ").replace("\u00ad", "")
+    s = s.replace("\u2019", "'").replace("\u2018", "'").replace("\u02BC", "'").replace("`", "'")
+    s = s.replace("'", "")
+    s = re.sub(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.([A-Za-z]{1,6})\.?\b", r"\1_\2_\3", s)
+    s = re.sub(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.?\b", r"\1_\2", s)
+    s = re.sub(r"\b([A-Za-z]+)-([A-Za-z]+)\b", r"\1_\2", s)
+    return s
+
+REFERENCE = {
+    "normalize_math_text": (reference_normalize_math_text, T.normalize_math_text),
+    "normalize_text": (reference_normalize_text, T.normalize_text),
+    "normalize_text_keep_case": (reference_normalize_text_keep_case, T.normalize_text_keep_case),
+}
+
+def check_equivalence(units: List[str]) -> List[Dict[str, str]]:
+    # every unit and every line of it, through each reference/compiled pair
+    bad = []
+    for u in units:
+        for s in [u] + u.splitlines():
+            for name, (ref, fn) in REFERENCE.items():
+                a, b = ref(s), fn(s)
+                if a != b:
+                    bad.append({"fn": name, "text": s, "reference": a, "compiled": b})
+    return bad
+
+def time_functions(units: List[str], rounds: int = 3) -> Dict[str, Any]:
+    out = {}
+    for name, (ref, fn) in REFERENCE.items():
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for u in units:
+                ref(u)
+        t1 = time.perf_counter()
+        for _ in range(rounds):
+            for u in units:
+                fn(u)
+        t2 = time.perf_counter()
+        out[name] = (round((t1 - t0) * 1000.0 / rounds, 2), round((t2 - t1) * 1000.0 / rounds, 2))
+    return out
+
+class _CountingPattern:
+    def __init__(self, pat: Any, counts: Counter) -> None:
+        self._pat = pat
+        self._counts = counts
+
+    def sub(self, *a, **k):
+        self._counts["regex"] += 1
+        return self._pat.sub(*a, **k)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pat, name)
+
+@contextmanager
+def count_passes() -> Iterator[Counter]:
+    counts: Counter = Counter()
+    names = ["_RE_WS", "_RE_DEGREE3", "_RE_DEGREE2", "_RE_REDUP", "_RE_DOTTED_REDUP", "RE_URL", "RE_DOMAIN", "RE_PUNCT"]
+    saved = {n: getattr(T, n) for n in names}
+    saved_nfkc = T._nfkc
+
+    def nfkc(s: str) -> str:
+        counts["nfkc"] += 1
+        return saved_nfkc(s)
+
+    try:
+        for n in names:
+            setattr(T, n, _CountingPattern(saved[n], counts))
+        T._nfkc = nfkc
+        yield counts
+    finally:
+        for n, v in saved.items():
+            setattr(T, n, v)
+        T._nfkc = saved_nfkc
+
+def legacy_page(page_text: str) -> None:
+    # the PDF branch before NormalizedText
+    for line in page_text.splitlines():
+        line = line.strip()
+        if not line or is_bibliography_citation_line(line):
+            continue
+        looks_like_formula_line(line)
+        T.normalize_math_text(line)
+    list(T.tokenize_with_context(page_text))
+
+def shared_page(page_text: str) -> None:
+    nt = T.NormalizedText(page_text)
+    for line, t_norm in nt.math_lines():
+        if is_bibliography_citation_line(line):
+            continue
+    list(T.tokenize_with_context(nt))
+
+def legacy_paragraph(text: str) -> None:
+    looks_like_formula_line(text)
+    T.normalize_math_text(text)
+    T.normalize_text_keep_case(text)
+    T.tokenize_docx_paragraph_with_context(text)
+
+def shared_paragraph(text: str) -> None:
+    nt = T.NormalizedText(text)
+    looks_like_formula_math(nt.math)
+    nt.keep_case
+    T.tokenize_docx_paragraph_with_context(nt)
+
+def measure(fn, units: List[str]) -> Dict[str, Any]:
+    with count_passes() as counts:
+        for u in units:
+            fn(u)
+    t0 = time.perf_counter()
+    for u in units:
+        fn(u)
+    dt = time.perf_counter() - t0
+    n = max(1, len(units))
+    return {
+        "units": len(units),
+        "nfkc_per_unit": round(counts["nfkc"] / n, 2),
+        "regex_per_unit": round(counts["regex"] / n, 2),
+        "ms_per_unit": round(dt * 1000.0 / n, 3),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m spellchecker.normalize_bench", description="Jumlah pass normalisasi per halaman/paragraf.")
+    ap.add_argument("files", nargs="*", help="file PDF/DOCX (tanpa file: korpus tetap)")
+    ap.add_argument("--check", action="store_true", help="bandingkan normalizer dengan implementasi referensi pada korpus tetap dan file")
+    args = ap.parse_args(argv)
+
+    pages: List[str] = []
+    paragraphs: List[str] = []
+    for f in args.files:
+        if f.lower().endswith(".pdf"):
+            pages += [t for _, t in iter_pdf_pages_raw(f)]
+        else:
+            paragraphs += [p.strip() for p in iter_docx_paragraph_texts(f) if p.strip()]
+    corpus = load_corpus()
+    if not args.files:
+        paragraphs = corpus
+
+    for label, units, old, new in (("halaman", pages, legacy_page, shared_page), ("paragraf", paragraphs, legacy_paragraph, shared_paragraph)):
+        if not units:
+            continue
+        a, b = measure(old, units), measure(new, units)
+        print(
+            f"{len(units)} {label}: NFKC {a['nfkc_per_unit']} -> {b['nfkc_per_unit']}, "
+            f"regex {a['regex_per_unit']} -> {b['regex_per_unit']}, "
+            f"{a['ms_per_unit']} -> {b['ms_per_unit']} ms per {label}"
+        )
+    for name, (ms_ref, ms_new) in time_functions(pages + paragraphs).items():
+        print(f"{name}: {ms_ref} -> {ms_new} ms")
+
+    if args.check:
+        bad = check_equivalence(corpus + pages + (paragraphs if args.files else []))
+        for b in bad[:20]:
+            print(f"BEDA {b['fn']}: {b['text']!r}\n  referensi {b['reference']!r}\n  compiled  {b['compiled']!r}")
+        print(f"{len(bad)} perbedaan")
+        return 1 if bad else 0
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
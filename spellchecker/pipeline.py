@@ -1,36 +1,45 @@
 from __future__ import annotations
-import os, time
+import os, time, threading
+from dataclasses import replace
 from collections import Counter
-from typing import Dict, Set, List, Tuple, Any, Optional
+from typing import Dict, Set, List, Tuple, Any, Optional, Generator, Iterator, Union, Callable
 
 from docx import Document
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
 
 from spellchecker.settings import Settings
-from spellchecker.types import Finding
-
-from spellchecker.engine.suggest_wrapper import build_engine, suggest as suggest_call
-from spellchecker.extractors.pdf_extractor import iter_pdf_pages_raw
-
-from spellchecker.rules.text import tokenize_with_context, tokenize_docx_paragraph_with_context, normalize_math_text, normalize_text_keep_case
-from spellchecker.rules.skip import should_skip_token, is_valid_reduplication, RE_DEGREE_TOKEN
-from spellchecker.rules.abbr import paren_abbrev_from_snippet, is_probable_paren_abbrev, is_acronym_like_pdf, is_acronym_like_orig
-from spellchecker.rules.citation import should_skip_as_citation_name_pdf, protect_citation_spans_docx
-from spellchecker.rules.capital import is_sentence_start_from_offset, is_capitalization_error
+from spellchecker.types import Finding, Progress
+from spellchecker.stats import RunStats, make_stats
+from spellchecker.cache.paragraph_cache import ParagraphCache, ParagraphEntry, MISSING, paragraph_scope
+from spellchecker.cache.result_cache import ResultCache, doc_cache_key, result_cache_key
+from spellchecker.reporting.table import FindingsTable
+
+from spellchecker.engine.suggest_wrapper import build_engine, suggest as suggest_call, suggest_many
+from spellchecker.extractors.pdf_extractor import iter_pdf_pages_raw, pdf_page_count
+from spellchecker.extractors.source import Source, open_source, source_bytes
+
+from spellchecker.rules.text import tokenize_with_context, tokenize_docx_paragraph_with_context, NormalizedText
+from spellchecker.rules.skip import is_valid_reduplication
+from spellchecker.rules.inflection import InflectionLexicon, is_probably_valid_inflection
+from spellchecker.rules.cascade import TokenCtx, run_segment, load_rule_order, save_rule_order
+from spellchecker.vocab.index import VocabIndex, vocab_index_for, KNOWN, ENGLISH, IGNORE
+from spellchecker.vocab.store import LayeredVocab
+from spellchecker.rules.abbr import AbbrevRegistry, is_acronym_like_orig
+from spellchecker.rules.citation import protect_citation_spans_docx
+from spellchecker.rules.capital import SentenceStarts, is_capitalization_error
 from spellchecker.rules.docx_roles import is_role_header_paragraph, protect_name_run_in_paragraph
 from spellchecker.rules.names import protect_name_degree_spans
 from spellchecker.rules.hyphen import fix_hyphenation_block_with_vocab, protect_hyphen_join_spans_docx, HYPHENS
 from spellchecker.rules.team import is_tim_penyusun_page, drop_name_degree_lines, RE_DAFTAR_PUSTAKA, RE_TIM_PENYUSUN, RE_KATA_PENGANTAR
 from spellchecker.rules.biblio import is_bibliography_citation_line
-from spellchecker.rules.formula import looks_like_formula_line, RE_VAR_DEF
-from spellchecker.rules.lang import looks_englishish
-from spellchecker.rules.inflection import is_probably_valid_inflection
+from spellchecker.rules.formula import looks_like_formula_math, RE_VAR_DEF
+from spellchecker.rules.phrases import PhraseMatcher, phrase_matcher
+from spellchecker.rules.context_skip import analyze_context_skips
 from spellchecker.rules.glossary import is_doc_term_candidate, is_strong_typo_from_suggestions
-from spellchecker.rules.context_skip import should_skip_address_token, should_skip_paren_author_verb, should_skip_author_year
 from spellchecker.morph.space_nya import detect_space_error_nya
+from spellchecker.morph.stemmer import LexiconStemmer, make_stemmer
 from spellchecker.morph.affix import (
     maybe_affixed_id, cached_stem, deaffix_for_suggest,
-    pick_best_suggest_query_for_nya, reaffix_suggestion,
+    nya_query_candidates, pick_best_suggest_query_for_nya, pick_best_luluh_query, reaffix_suggestion,
     top1_conf, is_synth_top, top_term, apply_luluh_candidates
 )
 
@@ -47,7 +56,390 @@ def build_vocabs(
     known_vocab_for_names = known_vocab | english_vocab | set(ignore_vocab)
     return known_vocab, english_vocab, known_vocab_for_names
 
-def run_on_file(
+SUGGEST_CACHE_MAX = 50000
+
+class DocState:
+    # Document-level state carried from one DOCX paragraph to the next. One
+    # state per document: whoever keeps it across check_paragraph calls (an
+    # editor session, latency.py) starts a fresh DocState for the next one.
+    __slots__ = (
+        "doc_term_counter", "doc_glossary", "glossary_candidates",
+        "abbr_seen", "abbr_reported", "abbr_candidate_count", "unknown_seen",
+        "morph_ok_count", "doc_symbols", "trace",
+        "pending_role_header", "in_bibliography", "in_timpenyusun", "carry", "carry_from_hyphen",
+        "count_file", "n_tokens", "para_cache_hits",
+    )
+
+    def __init__(self, keep_trace: bool = False) -> None:
+        self.doc_term_counter: Counter = Counter()
+        self.doc_glossary: Set[str] = set()
+        self.glossary_candidates: Set[str] = set()
+        self.abbr_seen: Set[str] = set()
+        self.abbr_reported: Set[str] = set()
+        self.abbr_candidate_count: Counter = Counter()
+        self.unknown_seen: Set[str] = set()
+        self.morph_ok_count = 0
+        self.doc_symbols: Set[str] = set()
+        # One entry per yielded finding, see patch_findings_for_user_vocab;
+        # only iter_findings needs it (keep_trace), for its meta.
+        self.trace: Optional[List[Any]] = [] if keep_trace else None
+        self.pending_role_header = False
+        self.in_bibliography = False
+        self.in_timpenyusun = False
+        self.carry: Optional[str] = None
+        self.carry_from_hyphen = False
+        self.count_file = 0
+        self.n_tokens = 0
+        self.para_cache_hits = 0
+
+class DocxParagraphChecker:
+    # The DOCX branch of iter_findings for one paragraph at a time. Holds
+    # everything that is constant for a run (engine, vocab, stemmer, rule
+    # order), so it can be kept warm and fed paragraphs as they are typed.
+    def __init__(
+        self,
+        cfg: Settings,
+        eng: Any,
+        known_vocab: Set[str],
+        english_vocab: Set[str],
+        known_vocab_for_names: Set[str],
+        ignore_vocab: Set[str],
+        domain_terms: Set[str],
+        protected_phrases: Set[str],
+        protected_name_tokens: Set[str],
+        base: str = "",
+        stats: Optional[RunStats] = None,
+        stemmer: Any = None,
+        stem_cache: Optional[Dict[str, str]] = None,
+        para_cache: Optional[ParagraphCache] = None,
+        para_scope: str = "",
+        vocab_index: Optional[VocabIndex] = None,
+        inflection_lexicon: Optional[InflectionLexicon] = None,
+    ) -> None:
+        self.cfg = cfg
+        self.eng = eng
+        self.known_vocab = known_vocab
+        self.english_vocab = english_vocab
+        self.known_vocab_for_names = known_vocab_for_names
+        self.ignore_vocab = ignore_vocab
+        self.base = base
+        self.stats = stats if stats is not None else make_stats(False)
+        self.stemmer = stemmer if stemmer is not None else make_stemmer(cfg, known_vocab)
+        self.stem_cache = stem_cache if stem_cache is not None else {}
+        # _suggest_docx only depends on the token and its leading case
+        self.suggest_cache: Dict[Tuple[str, bool], Tuple] = {}
+        self.profiling = cfg.profile_rules
+        # profiling needs every rule evaluated on every token
+        self.para_cache = None if self.profiling else para_cache
+        self.para_scope = para_scope
+        segments = load_rule_order(cfg.rule_order_path)
+        self.rules_docx_pre_capital = segments["docx_pre_capital"]
+        self.rules_docx_post_capital = segments["docx_post_capital"]
+        self.rules_docx_post_abbr = segments["docx_post_abbr"]
+        self.ctx = TokenCtx(
+            cfg, known_vocab, english_vocab, known_vocab_for_names, ignore_vocab,
+            domain_terms, protected_phrases, protected_name_tokens, vocab_index, inflection_lexicon,
+        )
+        self.vocab = self.ctx.vocab
+        self.phrases = phrase_matcher(protected_phrases, "docx")
+
+    def check_paragraph(self, text: str, state: Optional[DocState] = None) -> Tuple[List[Finding], DocState]:
+        # Pass the returned state back in to check the next paragraph of the
+        # same document (abbreviations, glossary, hyphen carry, ...).
+        st = state if state is not None else DocState()
+        return list(self.iter_paragraph(text, st)), st
+
+    def iter_paragraph(self, para_text: str, st: DocState) -> Iterator[Finding]:
+        cfg = self.cfg
+        eng = self.eng
+        known_vocab = self.known_vocab
+        english_vocab = self.english_vocab
+        known_vocab_for_names = self.known_vocab_for_names
+        base = self.base
+        page_label = "DOCX"
+        stats = self.stats
+        clock = stats.clock
+        stemmer = self.stemmer
+        stem_cache = self.stem_cache
+        suggest_cache = self.suggest_cache
+        profiling = self.profiling
+        para_cache = self.para_cache
+        para_scope = self.para_scope
+        rules_docx_pre_capital = self.rules_docx_pre_capital
+        rules_docx_post_capital = self.rules_docx_post_capital
+        rules_docx_post_abbr = self.rules_docx_post_abbr
+        ctx = self.ctx
+        classify = self.vocab.classify
+
+        doc_term_counter = st.doc_term_counter
+        doc_glossary = st.doc_glossary
+        glossary_candidates = st.glossary_candidates
+        abbr_seen = st.abbr_seen
+        abbr_reported = st.abbr_reported
+        abbr_candidate_count = st.abbr_candidate_count
+        unknown_seen = st.unknown_seen
+        doc_symbols = st.doc_symbols
+        trace = st.trace
+
+        text = para_text.strip()
+        if not text:
+            return
+
+        if RE_TIM_PENYUSUN.match(text):
+            st.in_timpenyusun = True
+            return
+        if RE_KATA_PENGANTAR.match(text):
+            st.in_timpenyusun = False
+            return
+        if st.in_timpenyusun:
+            return
+
+        if RE_DAFTAR_PUSTAKA.match(text):
+            st.in_bibliography = True
+            return
+        if st.in_bibliography:
+            return
+
+        if is_role_header_paragraph(text):
+            st.pending_role_header = True
+            return
+
+        nt = NormalizedText(text)
+        m = RE_VAR_DEF.match(nt.math)
+        if m:
+            doc_symbols.add(m.group(1).lower())
+        if looks_like_formula_math(nt.math):
+            return
+
+        if is_bibliography_citation_line(text):
+            return
+
+        entry = para_cache.get(para_scope, para_text) if para_cache is not None else None
+        if entry is None:
+            t0 = clock()
+            entry = _docx_paragraph_entry(para_text, nt, known_vocab_for_names, cfg, self.phrases)
+            stats.add_time("tokenize", t0)
+            if para_cache is not None:
+                para_cache.put(para_scope, para_text, entry)
+        else:
+            st.para_cache_hits += 1
+        triples = entry.triples
+        if not triples:
+            return
+        st.n_tokens += len(triples)
+
+        toks_norm = entry.toks_norm
+        sentence_starts = entry.sentence_starts
+
+        skip_first = False
+        if st.carry is not None:
+            first = toks_norm[0]
+            if st.carry.isalpha() and first.isalpha():
+                joined = st.carry + first
+                if joined in known_vocab_for_names:
+                    skip_first = True
+            st.carry = None
+            st.carry_from_hyphen = False
+
+        protected_idx = entry.protected
+        if st.pending_role_header:
+            protected_idx = protected_idx | protect_name_run_in_paragraph(
+                triples,
+                known_vocab=known_vocab_for_names,
+                english_vocab=english_vocab,
+                cfg=cfg,
+                min_titlecase=2,
+                max_take=8,
+            )
+            st.pending_role_header = False
+
+        # carry last token heuristic
+        hold_last_as_carry = entry.hold_last_as_carry
+        last_idx = len(toks_norm) - 1
+        if hold_last_as_carry:
+            st.carry = entry.carry
+            st.carry_from_hyphen = entry.carry_from_hyphen
+
+        if skip_first:
+            protected_idx = protected_idx | {0}
+
+        for idx, t in enumerate(triples):
+            tok = t.tok
+            t0 = clock()
+            rejected = idx in protected_idx or tok in doc_symbols
+            stats.record("protect", t0, rejected)
+            if rejected:
+                continue
+
+            # Context-free results of this token, shared by paragraph cache hits.
+            memo = entry.memo[idx]
+            nya_info = memo.get("nya", MISSING)
+            if nya_info is MISSING:
+                t0 = clock()
+                nya_info = memo["nya"] = detect_space_error_nya(triples, idx)
+                stats.record("space_nya", t0, nya_info is not None)
+            if nya_info is not None:
+                join_term = nya_info["join_term"]
+                if trace is not None:
+                    trace.append(None)
+                yield Finding(
+                    file=base,
+                    page=page_label,
+                    token=tok,
+                    snippet=t.snippet,
+                    status="space_error",
+                    suggestions=[{"term": join_term, "confidence": 1.0}],
+                )
+                st.count_file += 1
+                if st.count_file >= cfg.max_findings_per_file:
+                    return
+                continue
+
+            if hold_last_as_carry and idx == last_idx:
+                continue
+
+            tok_orig = t.tok_orig
+            ctx.tok = tok
+            ctx.mask = mask = classify(tok)
+            ctx.tok_orig = tok_orig
+            ctx.span = t
+            ctx.in_phrase = idx in entry.phrase_idx
+            ctx.idx = idx
+            ctx.context_skip = entry.context_skip
+            hit = memo.get("pre_capital")
+            if hit is None:
+                hit = memo["pre_capital"] = run_segment(rules_docx_pre_capital, ctx, stats, "docx_pre_capital", profiling)
+            if hit:
+                continue
+
+            # capital
+            rejected = memo.get("capital")
+            if rejected is None:
+                t0 = clock()
+                rejected = memo["capital"] = t.start in sentence_starts and is_capitalization_error(tok_orig)
+                stats.record("capital", t0, rejected)
+            if rejected:
+                sugg = tok_orig[:1].upper() + tok_orig[1:]
+                if trace is not None:
+                    trace.append(None)
+                yield Finding(
+                    file=base,
+                    page=page_label,
+                    token=tok,
+                    snippet=t.snippet_raw,
+                    status="capital_error",
+                    suggestions=[{"term": sugg, "confidence": 1.0}],
+                )
+                st.count_file += 1
+                if st.count_file >= cfg.max_findings_per_file:
+                    return
+                continue
+
+            hit = memo.get("post_capital")
+            if hit is None:
+                hit = memo["post_capital"] = run_segment(rules_docx_post_capital, ctx, stats, "docx_post_capital", profiling)
+            if hit:
+                continue
+
+            # abbreviations
+            t0 = clock()
+            lo, hi = t.window
+            abbrevs = entry.abbrevs
+            abbr_seen |= abbrevs.defined_within(lo, hi)
+            if abbrevs.is_defined(tok, lo, hi):
+                stats.record("abbr", t0, True)
+                if tok not in abbr_reported:
+                    if trace is not None:
+                        trace.append(None)
+                    yield Finding(base, page_label, tok, t.snippet_raw, "abbr_confirmed", [])
+                    abbr_reported.add(tok)
+                    st.count_file += 1
+                    if st.count_file >= cfg.max_findings_per_file:
+                        return
+                continue
+            if tok in abbr_seen:
+                stats.record("abbr", t0, True)
+                continue
+
+            if tok not in abbr_seen and is_acronym_like_orig(tok_orig):
+                stats.record("abbr", t0, True)
+                if not mask & (KNOWN | ENGLISH | IGNORE):
+                    abbr_candidate_count[tok] += 1
+                    if abbr_candidate_count[tok] == cfg.abbr_cand_min_count:
+                        if trace is not None:
+                            trace.append("abbr")
+                        yield Finding(base, page_label, tok, t.snippet_raw, "abbr_candidate", [])
+                        st.count_file += 1
+                        if st.count_file >= cfg.max_findings_per_file:
+                            return
+                continue
+            stats.record("abbr", t0, False)
+
+            hit = memo.get("post_abbr")
+            if hit is None:
+                hit = memo["post_abbr"] = run_segment(rules_docx_post_abbr, ctx, stats, "docx_post_abbr", profiling)
+            if hit:
+                continue
+
+            sugg = memo.get("suggest")
+            if sugg is None:
+                skey = (tok, tok_orig[:1].isupper())
+                sugg = suggest_cache.get(skey)
+                if sugg is None:
+                    if len(suggest_cache) >= SUGGEST_CACHE_MAX:
+                        suggest_cache.clear()
+                    sugg = suggest_cache[skey] = _suggest_docx(
+                        tok, tok_orig, mask, cfg, eng, known_vocab, stemmer, stem_cache, stats,
+                    )
+                memo["suggest"] = sugg
+            stem, morph_ok, status, suggs, no_affix, affix_words = sugg
+            if morph_ok:
+                st.morph_ok_count += 1
+                continue
+
+            suggest_t0 = clock()
+            # auto glossary (only on raw token)
+            if no_affix and is_doc_term_candidate(tok, known_vocab, english_vocab, cfg):
+                doc_term_counter[tok] += 1
+                if (
+                    doc_term_counter[tok] >= cfg.auto_glossary_min_freq
+                    and len(doc_glossary) < cfg.auto_glossary_max_doc_terms
+                    and not is_strong_typo_from_suggestions(suggs, cfg)
+                ):
+                    doc_glossary.add(tok)
+                    glossary_candidates.add(tok)
+                    stats.record("suggest", suggest_t0, True)
+                    continue
+
+            if tok in doc_glossary:
+                stats.record("suggest", suggest_t0, True)
+                continue
+
+            if suggs:
+                top1 = suggs[0].get("confidence")
+                if isinstance(top1, (int, float)) and top1 >= cfg.show_only_top1_if_conf_ge:
+                    suggs = suggs[:1]
+
+            is_unknownish = (not suggs) or (isinstance(suggs[0].get("confidence"), (int, float)) and suggs[0].get("confidence") < cfg.auto_glossary_conf_strong)
+            if is_unknownish and tok in unknown_seen:
+                stats.record("suggest", suggest_t0, True)
+                continue
+            if is_unknownish:
+                unknown_seen.add(tok)
+
+            if status == "ok":
+                stats.record("suggest", suggest_t0, True)
+                continue
+
+            stats.record("suggest", suggest_t0, False)
+            if trace is not None:
+                trace.append({"redup": False, "stem": stem, "affix": affix_words})
+            yield Finding(base, page_label, tok, t.snippet_raw, status, [dict(x) for x in suggs])
+            st.count_file += 1
+            if st.count_file >= cfg.max_findings_per_file:
+                return
+
+def iter_findings(
     path: str,
     cfg: Settings,
     eng: Any,
@@ -58,29 +450,60 @@ def run_on_file(
     domain_terms: Set[str],
     protected_phrases: Set[str],
     protected_name_tokens: Set[str],
-) -> Tuple[List[Finding], Dict[str, Any]]:
+    progress_every: int = 50,
+    deadline: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+    para_cache: Optional[ParagraphCache] = None,
+    para_scope: str = "",
+    data: Optional[Source] = None,
+    vocab_index: Optional[VocabIndex] = None,
+    inflection_lexicon: Optional[InflectionLexicon] = None,
+) -> Generator[Union[Finding, Progress], None, Dict[str, Any]]:
+    # deadline is a time.monotonic() value; both it and cancel are checked
+    # between pages/paragraphs only, so a stop never splits a unit.
+    # With data (a path, bytes/memoryview or file object) the document is
+    # read from there and path only supplies the file name and type.
     base = os.path.basename(path)
-    stemmer = StemmerFactory().create_stemmer()
-
-    findings: List[Finding] = []
-    doc_term_counter = Counter()
-    doc_glossary: Set[str] = set()
-    glossary_candidates: Set[str] = set()
-
-    abbr_seen: Set[str] = set()
-    abbr_reported: Set[str] = set()
-    abbr_candidate_count = Counter()
-    unknown_seen: Set[str] = set()
-
-    morph_log: List[Tuple[str, str]] = []
+    src = path if data is None else data
+    stemmer = make_stemmer(cfg, known_vocab)
+    run_t0 = time.perf_counter()
+    n_tokens = 0
+    stats = make_stats(cfg.collect_stats or cfg.profile_rules)
+    clock = stats.clock
+
+    profiling = cfg.profile_rules
+    para_cache_hits = 0
+    rules_pdf = load_rule_order(cfg.rule_order_path)["pdf"]
+    ctx = TokenCtx(
+        cfg, known_vocab, english_vocab, known_vocab_for_names, ignore_vocab,
+        domain_terms, protected_phrases, protected_name_tokens, vocab_index, inflection_lexicon,
+    )
+    classify = ctx.vocab.classify
+    phrases = phrase_matcher(protected_phrases, "pdf")
+
+    st = DocState(keep_trace=True)
+    doc_term_counter = st.doc_term_counter
+    doc_glossary = st.doc_glossary
+    glossary_candidates = st.glossary_candidates
+    abbr_seen = st.abbr_seen
+    abbr_reported = st.abbr_reported
+    abbr_candidate_count = st.abbr_candidate_count
+    unknown_seen = st.unknown_seen
+    doc_symbols = st.doc_symbols
+    trace = st.trace
     stem_cache: Dict[str, str] = {}
-    doc_symbols: Set[str] = set()
 
     count_file = 0
+    stop_reason: Optional[str] = None
+    units_done = 0
+    units_total = 0
 
     if path.lower().endswith(".pdf"):
+        unit = "page"
         crew_pages_left = 0
-        for page_no, page_text in iter_pdf_pages_raw(path):
+        n_pages = pdf_page_count(src)
+        units_total = n_pages
+        for page_no, page_text in stats.timed_iter(iter_pdf_pages_raw(src), "page", key=lambda x: x[0]):
             is_crew = False
             if cfg.enable_tim_penyusun_filter and page_no <= cfg.tim_page_limit:
                 if is_tim_penyusun_page(page_text):
@@ -92,32 +515,39 @@ def run_on_file(
             if is_crew:
                 page_text = drop_name_degree_lines(page_text)
 
-            for line in (page_text or "").splitlines():
-                line = (line or "").strip()
-                if not line:
-                    continue
+            # Formula and non-formula lines both only register their
+            # symbol here, so no formula check is needed.
+            nt = NormalizedText(page_text)
+            for line, t_norm in nt.math_lines():
                 if is_bibliography_citation_line(line):
                     continue
-                if looks_like_formula_line(line):
-                    t_norm = normalize_math_text(line)
-                    m = RE_VAR_DEF.match(t_norm)
-                    if m:
-                        doc_symbols.add(m.group(1).lower())
-                    continue
-                t_norm = normalize_math_text(line)
                 m = RE_VAR_DEF.match(t_norm)
                 if m:
                     doc_symbols.add(m.group(1).lower())
 
-            for tok, snippet, snippet_raw in tokenize_with_context(page_text):
-                abbr_seen |= paren_abbrev_from_snippet(snippet_raw)
+            t0 = clock()
+            tokens = list(tokenize_with_context(nt))
+            phrase_idx = phrases.protected_indices([t.tok for t in tokens])
+            abbrevs = AbbrevRegistry(nt.lower)
+            stats.add_time("tokenize", t0)
+            for idx, t in enumerate(tokens):
+                tok = t.tok
+                mask = classify(tok)
+                n_tokens += 1
+
+                t0 = clock()
+                lo, hi = t.window
+                abbr_seen |= abbrevs.defined_within(lo, hi)
 
                 if tok in doc_symbols:
+                    stats.record("abbr", t0, True)
                     continue
 
-                if is_probable_paren_abbrev(tok, snippet_raw):
+                if abbrevs.is_defined(tok, lo, hi):
+                    stats.record("abbr", t0, True)
                     if tok not in abbr_reported:
-                        findings.append(Finding(base, str(page_no), tok, snippet, "abbr_confirmed", []))
+                        trace.append(None)
+                        yield Finding(base, str(page_no), tok, t.snippet, "abbr_confirmed", [])
                         abbr_reported.add(tok)
                         count_file += 1
                         if count_file >= cfg.max_findings_per_file:
@@ -125,55 +555,41 @@ def run_on_file(
                     continue
 
                 if tok in abbr_seen:
+                    stats.record("abbr", t0, True)
                     continue
 
-                if is_acronym_like_pdf(tok, snippet_raw) and tok not in abbr_seen:
-                    if tok not in known_vocab and tok not in english_vocab and tok not in ignore_vocab:
+                if abbrevs.is_acronym(tok, lo, hi) and tok not in abbr_seen:
+                    stats.record("abbr", t0, True)
+                    if not mask & (KNOWN | ENGLISH | IGNORE):
                         abbr_candidate_count[tok] += 1
                         if abbr_candidate_count[tok] == cfg.abbr_cand_min_count:
-                            findings.append(Finding(base, str(page_no), tok, snippet, "abbr_candidate", []))
+                            trace.append("abbr")
+                            yield Finding(base, str(page_no), tok, t.snippet, "abbr_candidate", [])
                             count_file += 1
                             if count_file >= cfg.max_findings_per_file:
                                 break
                     continue
+                stats.record("abbr", t0, False)
 
-                if should_skip_token(tok, cfg):
-                    continue
-                if RE_DEGREE_TOKEN.match(tok):
-                    continue
-                if is_valid_reduplication(tok, known_vocab):
-                    continue
-                if tok in ignore_vocab:
-                    continue
-                if tok in english_vocab:
-                    continue
-
-                if protected_phrases and tok in snippet:
-                    if any((tok in ph and ph in snippet) for ph in protected_phrases):
-                        continue
-
-                if tok in known_vocab:
-                    continue
-
-                if is_probably_valid_inflection(tok, known_vocab, cfg):
-                    continue
-
-                if looks_englishish(tok, english_vocab, cfg, snippet):
-                    continue
-
-                if tok in protected_name_tokens:
-                    continue
-
-                if should_skip_as_citation_name_pdf(tok, snippet, known_vocab, english_vocab, cfg):
+                ctx.tok = tok
+                ctx.mask = mask
+                ctx.span = t
+                ctx.in_phrase = idx in phrase_idx
+                if run_segment(rules_pdf, ctx, stats, "pdf", profiling):
                     continue
 
                 # Sastrawi success => skip
-                if tok.isalpha() and tok not in known_vocab and tok not in english_vocab and maybe_affixed_id(tok):
+                stem = None
+                if tok.isalpha() and not mask & (KNOWN | ENGLISH) and maybe_affixed_id(tok):
+                    t0 = clock()
                     stem = cached_stem(tok, stemmer, stem_cache)
-                    if stem and stem != tok and stem in known_vocab:
-                        morph_log.append((tok, stem))
+                    rejected = stem and stem != tok and stem in known_vocab
+                    stats.record("stemmer", t0, rejected)
+                    if rejected:
+                        st.morph_ok_count += 1
                         continue
 
+                suggest_t0 = clock()
                 res = suggest_call(eng, tok, cfg.topk)
                 suggs = res.get("suggestions", [])
                 status = res.get("status", "")
@@ -187,9 +603,11 @@ def run_on_file(
                     ):
                         doc_glossary.add(tok)
                         glossary_candidates.add(tok)
+                        stats.record("suggest", suggest_t0, True)
                         continue
 
                 if tok in doc_glossary:
+                    stats.record("suggest", suggest_t0, True)
                     continue
 
                 if suggs:
@@ -199,385 +617,550 @@ def run_on_file(
 
                 is_unknownish = (not suggs) or (isinstance(suggs[0].get("confidence"), (int, float)) and suggs[0].get("confidence") < cfg.auto_glossary_conf_strong)
                 if is_unknownish and tok in unknown_seen:
+                    stats.record("suggest", suggest_t0, True)
                     continue
                 if is_unknownish:
                     unknown_seen.add(tok)
 
                 if status == "ok":
+                    stats.record("suggest", suggest_t0, True)
                     continue
 
-                findings.append(Finding(base, str(page_no), tok, snippet, status, suggs))
+                stats.record("suggest", suggest_t0, False)
+                trace.append({"redup": True, "stem": stem, "affix": []})
+                yield Finding(base, str(page_no), tok, t.snippet, status, suggs)
                 count_file += 1
                 if count_file >= cfg.max_findings_per_file:
                     break
 
+            units_done = page_no
+            yield Progress(base, "page", page_no, n_pages, n_tokens, count_file, time.perf_counter() - run_t0)
             if count_file >= cfg.max_findings_per_file:
                 break
+            stop_reason = stop_requested(deadline, cancel)
+            if stop_reason is not None and page_no < n_pages:
+                break
+            stop_reason = None
 
     else:
-        doc = Document(path)
-        page_label = "DOCX"
-        pending_role_header = False
-        in_bibliography = False
-        in_timpenyusun = False
-        carry: Optional[str] = None
-        carry_from_hyphen = False
-
-        for p in doc.paragraphs:
-            text = (p.text or "").strip()
-            if not text:
-                continue
-
-            if RE_TIM_PENYUSUN.match(text):
-                in_timpenyusun = True
-                continue
-            if RE_KATA_PENGANTAR.match(text):
-                in_timpenyusun = False
-                continue
-            if in_timpenyusun:
-                continue
-
-            if RE_DAFTAR_PUSTAKA.match(text):
-                in_bibliography = True
-                continue
-            if in_bibliography:
-                continue
-
-            if is_role_header_paragraph(text):
-                pending_role_header = True
-                continue
-
-            if looks_like_formula_line(text):
-                t_norm = normalize_math_text(text)
-                m = RE_VAR_DEF.match(t_norm)
-                if m:
-                    doc_symbols.add(m.group(1).lower())
-                continue
-
-            t_norm = normalize_math_text(text)
-            m = RE_VAR_DEF.match(t_norm)
-            if m:
-                doc_symbols.add(m.group(1).lower())
-
-            if is_bibliography_citation_line(text):
-                continue
-
-            fixed_text = fix_hyphenation_block_with_vocab(p.text or "", known_vocab_for_names)
-
-            triples = tokenize_docx_paragraph_with_context(fixed_text)
-            if not triples:
-                continue
-
-            toks_norm = [t[0] for t in triples]
-            toks_orig = [t[1] for t in triples]
-            raw_para = normalize_text_keep_case(text)
-
-            skip_first = False
-            if carry is not None:
-                first = toks_norm[0]
-                if carry.isalpha() and first.isalpha():
-                    joined = carry + first
-                    if joined in known_vocab_for_names:
-                        skip_first = True
-                carry = None
-                carry_from_hyphen = False
-
-            extra_protect: Set[int] = set()
-            if pending_role_header:
-                extra_protect |= protect_name_run_in_paragraph(
-                    triples,
-                    known_vocab=known_vocab_for_names,
-                    english_vocab=english_vocab,
-                    cfg=cfg,
-                    min_titlecase=2,
-                    max_take=8,
-                )
-                pending_role_header = False
-
-            protected_idx = protect_name_degree_spans(toks_norm, toks_orig, known_vocab_for_names, cfg)
-            protected_idx |= protect_citation_spans_docx(toks_norm, toks_orig, cfg)
-            protected_idx |= extra_protect
-            protected_idx |= protect_hyphen_join_spans_docx(triples, known_vocab_for_names)
-
-            # carry last token heuristic
-            hold_last_as_carry = False
-            last_idx = len(toks_norm) - 1
-            last_tok = toks_norm[last_idx]
-            last_orig = toks_orig[last_idx] if last_idx < len(toks_orig) else ""
-            ends_with_hyphen = last_orig.endswith(HYPHENS)
-
-            if ends_with_hyphen:
-                prefix = last_orig
-                import re as _re
-                prefix = _re.sub(r"[-‐-]+$", "", prefix).strip().lower()
-                if prefix.isalpha():
-                    hold_last_as_carry = True
-                    carry = prefix
-                    carry_from_hyphen = True
-            else:
-                if last_tok.isalpha() and 1 <= len(last_tok) <= 3 and last_tok not in known_vocab_for_names:
-                    hold_last_as_carry = True
-                    carry = last_tok
-                    carry_from_hyphen = False
-
-            if skip_first:
-                protected_idx.add(0)
+        doc = Document(open_source(src))
+        docx = DocxParagraphChecker(
+            cfg, eng,
+            known_vocab, english_vocab, known_vocab_for_names, ignore_vocab,
+            domain_terms, protected_phrases, protected_name_tokens,
+            base=base, stats=stats, stemmer=stemmer, stem_cache=stem_cache,
+            para_cache=para_cache, para_scope=para_scope, vocab_index=ctx.vocab,
+            inflection_lexicon=inflection_lexicon,
+        )
+
+        unit = "paragraph"
+        stats.extract_unit = "paragraph"
+        paragraphs = doc.paragraphs
+        n_paras = len(paragraphs)
+        units_total = n_paras
+        para_no = 0
+        for para_no, p in enumerate(paragraphs, start=1):
+            stop_reason = stop_requested(deadline, cancel)
+            if stop_reason is not None:
+                break
+            units_done = para_no
 
-            for idx, (tok, tok_orig, snippet, snippet_raw, t_start, t_end) in enumerate(triples):
-                if idx in protected_idx:
-                    continue
-                if tok in doc_symbols:
-                    continue
-                
-                nya_info = detect_space_error_nya(triples, idx)
-                if nya_info is not None:
-                    join_term = nya_info["join_term"]
-                    findings.append(Finding(
-                        file=base,
-                        page=page_label,
-                        token=tok,
-                        snippet=snippet,
-                        status="space_error",
-                        suggestions=[{"term": join_term, "confidence": 1.0}],
-                    ))
-                    count_file += 1
-                    if count_file >= cfg.max_findings_per_file:
-                        break
-                    continue
+            if progress_every and para_no % progress_every == 0:
+                yield Progress(base, "paragraph", para_no, n_paras, st.n_tokens, st.count_file, time.perf_counter() - run_t0)
 
-                if hold_last_as_carry and idx == last_idx:
-                    continue
+            t0 = clock()
+            para_text = p.text or ""
+            stats.add_extract_time(para_no, t0)
 
-                if should_skip_token(tok, cfg):
-                    continue
-                if RE_DEGREE_TOKEN.match(tok):
-                    continue
-                if should_skip_address_token(tok, snippet_raw):
-                    continue
-                if should_skip_paren_author_verb(tok, snippet_raw):
-                    continue
-                if should_skip_author_year(tok, snippet_raw):
-                    continue
+            yield from docx.iter_paragraph(para_text, st)
+            if st.count_file >= cfg.max_findings_per_file:
+                break
 
-                if tok in domain_terms or tok in protected_phrases:
-                    continue
-                if tok in ignore_vocab:
-                    continue
+        count_file = st.count_file
+        n_tokens = st.n_tokens
+        para_cache_hits = st.para_cache_hits
 
-                # capital
-                is_start = is_sentence_start_from_offset(raw_para, t_start)
-                if is_start and is_capitalization_error(tok_orig):
-                    sugg = tok_orig[:1].upper() + tok_orig[1:]
-                    findings.append(Finding(
-                        file=base,
-                        page=page_label,
-                        token=tok,
-                        snippet=snippet_raw,
-                        status="capital_error",
-                        suggestions=[{"term": sugg, "confidence": 1.0}],
-                    ))
-                    count_file += 1
-                    if count_file >= cfg.max_findings_per_file:
-                        break
-                    continue
+        yield Progress(base, "paragraph", units_done, n_paras, n_tokens, count_file, time.perf_counter() - run_t0)
 
-                if is_valid_reduplication(tok, known_vocab_for_names):
-                    continue
-                if tok in known_vocab_for_names:
-                    continue
+    meta = {
+        "file": base,
+        "created_at": time.strftime("%Y-%m-%d"),
+        "topk": cfg.topk,
+        "findings_count": count_file,
+        "morph_ok_count": st.morph_ok_count,
+        "glossary_candidates_count": len(glossary_candidates),
+        "tokens_count": n_tokens,
+        "elapsed_s": round(time.perf_counter() - run_t0, 3),
+        "unit": unit,
+        "units_done": units_done,
+        "units_total": units_total,
+        "partial": stop_reason is not None,
+        "stop_reason": stop_reason,
+        "para_cache_hits": para_cache_hits,
+        "trace": {
+            "capped": count_file >= cfg.max_findings_per_file,
+            "glossary_full": len(doc_glossary) >= cfg.auto_glossary_max_doc_terms,
+            "findings": trace,
+        },
+    }
+    if stats.enabled:
+        meta["stats"] = stats.to_dict()
+    return meta
 
-                # abbreviations
-                abbr_seen |= paren_abbrev_from_snippet(snippet_raw)
-                if is_probable_paren_abbrev(tok, snippet_raw):
-                    if tok not in abbr_reported:
-                        findings.append(Finding(base, page_label, tok, snippet_raw, "abbr_confirmed", []))
-                        abbr_reported.add(tok)
-                        count_file += 1
-                        if count_file >= cfg.max_findings_per_file:
+def _docx_paragraph_entry(
+    para_text: str,
+    nt: NormalizedText,
+    known_vocab_for_names: Set[str],
+    cfg: Settings,
+    phrases: PhraseMatcher,
+) -> ParagraphEntry:
+    # nt is the stripped paragraph; its normalized form equals that of
+    # para_text, so it is reused unless hyphen joining changed the text.
+    fixed_text = fix_hyphenation_block_with_vocab(para_text, known_vocab_for_names)
+    src = nt if fixed_text == para_text else NormalizedText(fixed_text)
+    triples = tokenize_docx_paragraph_with_context(src)
+    entry = ParagraphEntry(triples)
+    if not triples:
+        return entry
+
+    toks_norm = [t.tok for t in triples]
+    toks_orig = [t.tok_orig for t in triples]
+    entry.toks_norm = toks_norm
+    entry.sentence_starts = SentenceStarts(nt.keep_case)
+    entry.phrase_idx = frozenset(phrases.protected_indices(toks_norm))
+    entry.context_skip = analyze_context_skips(src.keep_case, triples)
+    entry.abbrevs = AbbrevRegistry(src.keep_case)
+
+    protected_idx = protect_name_degree_spans(toks_norm, toks_orig, known_vocab_for_names, cfg)
+    protected_idx |= protect_citation_spans_docx(toks_norm, toks_orig, cfg)
+    protected_idx |= protect_hyphen_join_spans_docx(triples, known_vocab_for_names)
+    entry.protected = frozenset(protected_idx)
+
+    last_idx = len(toks_norm) - 1
+    last_tok = toks_norm[last_idx]
+    last_orig = toks_orig[last_idx] if last_idx < len(toks_orig) else ""
+    ends_with_hyphen = last_orig.endswith(HYPHENS)
+
+    if ends_with_hyphen:
+        prefix = last_orig
+        import re as _re
+        prefix = _re.sub(r"[-‐-]+$", "", prefix).strip().lower()
+        if prefix.isalpha():
+            entry.hold_last_as_carry = True
+            entry.carry = prefix
+            entry.carry_from_hyphen = True
+    else:
+        if last_tok.isalpha() and 1 <= len(last_tok) <= 3 and last_tok not in known_vocab_for_names:
+            entry.hold_last_as_carry = True
+            entry.carry = last_tok
+            entry.carry_from_hyphen = False
+    return entry
+
+def _suggest_docx(
+    tok: str,
+    tok_orig: str,
+    mask: int,
+    cfg: Settings,
+    eng: Any,
+    known_vocab: Set[str],
+    stemmer: Any,
+    stem_cache: Dict[str, str],
+    stats: Any,
+) -> Tuple[Optional[str], bool, str, List[Dict], bool, List[str]]:
+    # Context-free part of the DOCX token check, shared by paragraph cache
+    # hits: (stem, morph_ok, status, suggestions, no_affix, affix_words).
+    clock = stats.clock
+    suggest_query = tok
+    affix_info = None
+    stem = None
+    # known_vocab lookups that chose between suggestions
+    affix_words: List[str] = []
+    # Query lattice: the deaffixed base forms (meN-/peN- variants, -nya
+    # repairs) that may replace the raw token, collected and handed to
+    # suggest_many together with it below; repeated queries are asked once,
+    # each distinct one is still its own engine lookup.
+    luluh: List[str] = []
+    nya: List[str] = []
+    if not tok_orig[:1].isupper():
+        if tok.isalpha() and not mask & (KNOWN | ENGLISH) and maybe_affixed_id(tok):
+            t0 = clock()
+            stem = cached_stem(tok, stemmer, stem_cache)
+            rejected = stem and stem != tok and stem in known_vocab
+            stats.record("stemmer", t0, rejected)
+
+            if rejected:
+                return stem, True, "", [], True, affix_words
+
+            if stem == tok:
+                t0 = clock()
+                base_tok, info = deaffix_for_suggest(tok)
+                if base_tok != tok and len(base_tok) >= 3:
+                    cands = apply_luluh_candidates(base_tok, info.get("prefixes", []))
+
+                    picked = None
+                    for c in cands:
+                        affix_words.append(c)
+                        if c in known_vocab:
+                            picked = c
                             break
-                    continue
-                if tok in abbr_seen:
-                    continue
-                
-                if is_acronym_like_orig(tok_orig) and tok not in abbr_seen:
-                    if tok not in known_vocab and tok not in english_vocab and tok not in ignore_vocab:
-                        abbr_candidate_count[tok] += 1
-                        if abbr_candidate_count[tok] == cfg.abbr_cand_min_count:
-                            findings.append(Finding(base, page_label, tok, snippet_raw, "abbr_candidate", []))
-                            count_file += 1
-                            if count_file >= cfg.max_findings_per_file:
-                                break
-                    continue
-
-                if is_probably_valid_inflection(tok, known_vocab, cfg):
-                    continue
-                if looks_englishish(tok, english_vocab, cfg, snippet):
-                    continue
-                if tok in protected_name_tokens:
-                    continue
-
-                # -------- suggestion: raw first (confusion short-circuit) ----------
-                raw_res = suggest_call(eng, tok, cfg.topk)
-                raw_suggs = raw_res.get("suggestions", [])
-                raw_status = raw_res.get("status", "")
-
-                if raw_status == "confusion":
-                    res = raw_res
-                    suggs = raw_suggs
-                    status = raw_status
-                    affix_info = None
-                    suggest_query = tok
-                    goto_after_affix = True
-                else:
-                    goto_after_affix = False
-
-                suggest_query = tok
-                affix_info = None
-                if not tok_orig[:1].isupper():
-                    if tok.isalpha() and tok not in known_vocab and tok not in english_vocab and maybe_affixed_id(tok):
-                        stem = cached_stem(tok, stemmer, stem_cache)
-
-                        if stem and stem != tok and stem in known_vocab:
-                            morph_log.append((tok, stem))
-                            continue
-
-                        if stem == tok:
-                            base_tok, info = deaffix_for_suggest(tok)
-                            if base_tok != tok and len(base_tok) >= 3:
-                                cands = apply_luluh_candidates(base_tok, info.get("prefixes", []))
-
-                                picked = None
-                                for c in cands:
-                                    if c in known_vocab:
-                                        picked = c
-                                        break
-
-                                if picked is not None:
-                                    base_tok = picked
-                                else:
-                                    best = cands[0]
-                                    best_res = eng.suggest(best, topk=cfg.topk)
-                                    best_conf = top1_conf(best_res.get("suggestions", []))
-
-                                    for c in cands[1:]:
-                                        res = eng.suggest(c, topk=cfg.topk)
-                                        conf = top1_conf(res.get("suggestions", []))
-                                        if conf > best_conf:
-                                            best, best_res, best_conf = c, res, conf
-
-                                    base_tok = best
-
-                                suggest_query = base_tok
-                                affix_info = info
-
-                used_prefetch_res = None
-                if affix_info and affix_info.get("suffixes") and affix_info["suffixes"][0] == "nya":
-                    suggest_query, used_prefetch_res = pick_best_suggest_query_for_nya(tok, eng, cfg.topk, suggest_call)
-
-                if used_prefetch_res is not None:
-                    res = used_prefetch_res
-                else:
-                    res = suggest_call(eng, suggest_query, cfg.topk)
 
-                suggs = res.get("suggestions", [])
-                status = res.get("status", "")
-
-                if not goto_after_affix:
-                    if affix_info is not None and suggest_query != tok:
-                        status = cfg.status_affix_typo
-                        if not suggs:
-                            suggs = [{"suggestion": suggest_query, "term": suggest_query, "confidence": 0.01, "_synthetic": True}]
-
-                    if affix_info and suggs:
-                        re_sugs = []
-                        for s in suggs:
-                            cand = s.get("term") or s.get("suggestion") or s.get("word")
-                            if not cand:
-                                continue
-                            new_s = dict(s)
-                            new_term = reaffix_suggestion(cand, affix_info)
-                            new_s["term"] = new_term
-                            new_s["suggestion"] = new_term
-                            re_sugs.append(new_s)
-                        suggs = re_sugs
-
-                    # pick raw vs affix
-                    final_suggs = raw_suggs
-                    final_status = raw_status
-
-                    raw_conf = top1_conf(raw_suggs)
-                    aff_conf = top1_conf(suggs)
-
-                    use_affix = (affix_info is not None and suggest_query != tok)
-
-                    if use_affix:
-                        if raw_conf >= cfg.auto_glossary_conf_strong:
-                            use_affix = False
-
-                        if use_affix and is_synth_top(suggs):
-                            top = (suggs[0].get("term") or suggs[0].get("suggestion") or "").lower()
-                            if top and top not in known_vocab:
-                                use_affix = False
-
-                        short_pfx = {"di", "ke", "se", "pe"}
-                        if use_affix and any(p in short_pfx for p in (affix_info or {}).get("prefixes", [])):
-                            top = (suggs[0].get("term") or suggs[0].get("suggestion") or "").lower()
-                            if top and top not in known_vocab:
-                                use_affix = False
-
-                        if use_affix and aff_conf <= raw_conf + 0.12:
-                            use_affix = False
-
-                    if use_affix:
-                        final_suggs = suggs
-                        final_status = status
-
-                    suggs = final_suggs
-                    status = final_status
-
-                # auto glossary (only on raw token)
-                if affix_info is None and is_doc_term_candidate(tok, known_vocab, english_vocab, cfg):
-                    doc_term_counter[tok] += 1
-                    if (
-                        doc_term_counter[tok] >= cfg.auto_glossary_min_freq
-                        and len(doc_glossary) < cfg.auto_glossary_max_doc_terms
-                        and not is_strong_typo_from_suggestions(suggs, cfg)
-                    ):
-                        doc_glossary.add(tok)
-                        glossary_candidates.add(tok)
-                        continue
-
-                if tok in doc_glossary:
-                    continue
-
-                if suggs:
-                    top1 = suggs[0].get("confidence")
-                    if isinstance(top1, (int, float)) and top1 >= cfg.show_only_top1_if_conf_ge:
-                        suggs = suggs[:1]
-
-                is_unknownish = (not suggs) or (isinstance(suggs[0].get("confidence"), (int, float)) and suggs[0].get("confidence") < cfg.auto_glossary_conf_strong)
-                if is_unknownish and tok in unknown_seen:
-                    continue
-                if is_unknownish:
-                    unknown_seen.add(tok)
+                    luluh = [picked] if picked is not None else cands
+                    affix_info = info
+                    if info.get("suffixes") and info["suffixes"][0] == "nya":
+                        nya = nya_query_candidates(tok)
+                stats.add_time("affix_requery", t0)
+
+    t0 = clock()
+    results = suggest_many(eng, [tok] + luluh + nya, cfg.topk)
+    # -------- raw first (confusion short-circuit) ----------
+    raw_res = results[tok]
+    raw_suggs = raw_res.get("suggestions", [])
+    raw_status = raw_res.get("status", "")
+    goto_after_affix = raw_status == "confusion"
+
+    if luluh:
+        suggest_query = pick_best_luluh_query(luluh, results)
+    if nya:
+        suggest_query, res = pick_best_suggest_query_for_nya(tok, results)
+    else:
+        res = results[suggest_query]
 
-                if status == "ok":
+    suggs = res.get("suggestions", [])
+    status = res.get("status", "")
+    if affix_info is not None:
+        stats.record("affix_requery", t0, False)
+    else:
+        stats.add_time("suggest", t0)
+
+    t0 = clock()
+    if not goto_after_affix:
+        if affix_info is not None and suggest_query != tok:
+            status = cfg.status_affix_typo
+            if not suggs:
+                suggs = [{"suggestion": suggest_query, "term": suggest_query, "confidence": 0.01, "_synthetic": True}]
+
+        if affix_info and suggs:
+            re_sugs = []
+            for s in suggs:
+                cand = s.get("term") or s.get("suggestion") or s.get("word")
+                if not cand:
                     continue
+                new_s = dict(s)
+                new_term = reaffix_suggestion(cand, affix_info)
+                new_s["term"] = new_term
+                new_s["suggestion"] = new_term
+                re_sugs.append(new_s)
+            suggs = re_sugs
+
+        # pick raw vs affix
+        final_suggs = raw_suggs
+        final_status = raw_status
+
+        raw_conf = top1_conf(raw_suggs)
+        aff_conf = top1_conf(suggs)
+
+        use_affix = (affix_info is not None and suggest_query != tok)
+
+        if use_affix:
+            if raw_conf >= cfg.auto_glossary_conf_strong:
+                use_affix = False
+
+            if use_affix and is_synth_top(suggs):
+                top = (suggs[0].get("term") or suggs[0].get("suggestion") or "").lower()
+                affix_words.append(top)
+                if top and top not in known_vocab:
+                    use_affix = False
+
+            short_pfx = {"di", "ke", "se", "pe"}
+            if use_affix and any(p in short_pfx for p in (affix_info or {}).get("prefixes", [])):
+                top = (suggs[0].get("term") or suggs[0].get("suggestion") or "").lower()
+                affix_words.append(top)
+                if top and top not in known_vocab:
+                    use_affix = False
+
+            if use_affix and aff_conf <= raw_conf + 0.12:
+                use_affix = False
+
+        if use_affix:
+            final_suggs = suggs
+            final_status = status
+
+        suggs = final_suggs
+        status = final_status
+    stats.add_time("suggest", t0)
+
+    return stem, False, status, suggs, affix_info is None, affix_words
+
+def stop_requested(deadline: Optional[float], cancel: Optional[threading.Event]) -> Optional[str]:
+    if cancel is not None and cancel.is_set():
+        return "cancelled"
+    if deadline is not None and time.monotonic() >= deadline:
+        return "deadline"
+    return None
+
+def collect_findings(
+    events: Generator[Union[Finding, Progress], None, Dict[str, Any]],
+    on_progress: Optional[Callable[[Progress], None]] = None,
+) -> Tuple[List[Finding], Dict[str, Any]]:
+    findings: List[Finding] = []
+    while True:
+        try:
+            ev = next(events)
+        except StopIteration as stop:
+            return findings, (stop.value or {})
+        if isinstance(ev, Progress):
+            if on_progress is not None:
+                on_progress(ev)
+        else:
+            findings.append(ev)
 
-                findings.append(Finding(base, page_label, tok, snippet_raw, status, suggs))
-                count_file += 1
-                if count_file >= cfg.max_findings_per_file:
-                    break
-
-            if count_file >= cfg.max_findings_per_file:
-                break
+def run_on_file(
+    path: str,
+    cfg: Settings,
+    eng: Any,
+    known_vocab: Set[str],
+    english_vocab: Set[str],
+    known_vocab_for_names: Set[str],
+    ignore_vocab: Set[str],
+    domain_terms: Set[str],
+    protected_phrases: Set[str],
+    protected_name_tokens: Set[str],
+    time_budget_s: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[List[Finding], Dict[str, Any]]:
+    deadline = time.monotonic() + time_budget_s if time_budget_s is not None else None
+    return collect_findings(iter_findings(
+        path, cfg, eng,
+        known_vocab, english_vocab, known_vocab_for_names, ignore_vocab,
+        domain_terms, protected_phrases, protected_name_tokens,
+        deadline=deadline, cancel=cancel,
+    ))
+
+def run_on_bytes(
+    name: str,
+    data: Source,
+    cfg: Settings,
+    eng: Any,
+    known_vocab: Set[str],
+    english_vocab: Set[str],
+    known_vocab_for_names: Set[str],
+    ignore_vocab: Set[str],
+    domain_terms: Set[str],
+    protected_phrases: Set[str],
+    protected_name_tokens: Set[str],
+    time_budget_s: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[List[Finding], Dict[str, Any]]:
+    deadline = time.monotonic() + time_budget_s if time_budget_s is not None else None
+    return collect_findings(iter_findings(
+        name, cfg, eng,
+        known_vocab, english_vocab, known_vocab_for_names, ignore_vocab,
+        domain_terms, protected_phrases, protected_name_tokens,
+        deadline=deadline, cancel=cancel, data=data,
+    ))
+
+def patch_findings_for_user_vocab(
+    findings: List[Finding],
+    meta: Dict[str, Any],
+    added: Set[str],
+    known_vocab: Set[str],
+    cfg: Settings,
+    inflection_lexicon: Optional[InflectionLexicon] = None,
+) -> Optional[Tuple[List[Finding], Dict[str, Any]]]:
+    # Re-evaluates only the known_vocab-dependent decisions for words added to
+    # the user vocabulary. Adding words can only turn a finding into a skip
+    # (known word, reduplication, inflection, stem), the remaining
+    # findings are unchanged. Returns None when the trace cannot prove that:
+    # no trace, a capped/partial run, a full auto glossary, or an added word
+    # that took part in picking an affix suggestion.
+    trace = meta.get("trace") or {}
+    entries = trace.get("findings")
+    if entries is None or len(entries) != len(findings):
+        return None
+    if meta.get("partial") or trace.get("capped") or trace.get("glossary_full"):
+        return None
+
+    kept: List[Finding] = []
+    kept_trace: List[Any] = []
+    dropped = 0
+    for f, e in zip(findings, entries):
+        tok = f.token
+        if e is None:
+            drop = False
+        elif e == "abbr":
+            drop = tok in added
+        else:
+            if any(w in added for w in e.get("affix", ())):
+                return None
+            stem = e.get("stem")
+            if stem and cfg.stemmer == "lexicon":
+                # the lexicon stem is the first candidate in known_vocab: a
+                # finding had none, so any added candidate now becomes its stem
+                stem_hit = any(c != tok and c in added for c in LexiconStemmer.candidates(tok))
+            else:
+                stem_hit = bool(stem and stem != tok and stem in added)
+            drop = (
+                tok in added
+                or (e.get("redup") and is_valid_reduplication(tok, known_vocab))
+                or is_probably_valid_inflection(tok, known_vocab, cfg, inflection_lexicon)
+                or stem_hit
+            )
+        if drop:
+            dropped += 1
+            continue
+        kept.append(f)
+        kept_trace.append(e)
+
+    meta = dict(meta)
+    meta["findings_count"] = len(kept)
+    meta["trace"] = dict(trace, findings=kept_trace)
+    meta["vocab_patch"] = {"added": len(added), "dropped": dropped}
+    return kept, meta
+
+def run_pipeline_on_paths(
+    paths: List[str],
+    cfg: Settings,
+    resources: Dict[str, Any],
+    user_vocab: Set[str],
+    models: Dict | None = None,
+    on_progress: Optional[Callable[[Progress], None]] = None,
+    time_budget_s: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+    cache: Optional[ResultCache] = None,
+    version: str = "",
+    para_cache: Optional[ParagraphCache] = None,
+) -> Tuple[FindingsTable, List[Dict[str, Any]]]:
+    return run_pipeline_on_files(
+        [(os.path.basename(p), p) for p in paths], cfg, resources, user_vocab,
+        models=models, on_progress=on_progress, time_budget_s=time_budget_s, cancel=cancel,
+        cache=cache, version=version, para_cache=para_cache,
+    )
+
+def run_pipeline_on_files(
+    files: List[Tuple[str, Source]],
+    cfg: Settings,
+    resources: Dict[str, Any],
+    user_vocab: Set[str],
+    models: Dict | None = None,
+    on_progress: Optional[Callable[[Progress], None]] = None,
+    time_budget_s: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+    cache: Optional[ResultCache] = None,
+    version: str = "",
+    para_cache: Optional[ParagraphCache] = None,
+) -> Tuple[FindingsTable, List[Dict[str, Any]]]:
+    # base words are shared, never copied per run
+    known_vocab_plus = LayeredVocab(resources["known_vocab"], user_vocab or ())
+    base_lexicon = resources.get("inflection_lexicon")
+    lexicon_plus = base_lexicon.extended(user_vocab or ()) if base_lexicon is not None else None
+    base_index = resources.get("vocab_index") or vocab_index_for(
+        resources["known_vocab"], resources["english_vocab"], resources["known_vocab_for_names"],
+        resources["ignore_vocab"], resources["domain_terms"], resources["protected_name_tokens"],
+    )
+    index_plus = base_index.extended(user_vocab or ())
+    para_scope = paragraph_scope(version, cfg, user_vocab or ()) if para_cache is not None else ""
+    deadline = time.monotonic() + time_budget_s if time_budget_s is not None else None
+
+    # Built on the first cache miss, a fully cached run never loads the models.
+    eng = None
+
+    all_findings = FindingsTable(cfg.topk)
+    metas: List[Dict[str, Any]] = []
+    # files are (name, source) pairs; a source is a path or the contents
+    # already in memory, e.g. an upload's bytes.
+    for name, src in files:
+        reason = stop_requested(deadline, cancel)
+        if reason is not None:
+            metas.append({
+                "file": os.path.basename(name),
+                "findings_count": 0,
+                "units_done": 0,
+                "units_total": None,
+                "partial": True,
+                "stop_reason": reason,
+            })
+            continue
+
+        base = os.path.basename(name)
+        key = doc_key = None
+        if cache is not None:
+            doc_key = doc_cache_key(source_bytes(src), version, cfg)
+            key = result_cache_key(doc_key, user_vocab or ())
+            hit = cache.get(key)
+            if hit is None:
+                # Same document checked before with fewer user words.
+                prev = cache.get_latest(doc_key)
+                if prev is not None and prev[2] <= set(user_vocab or ()):
+                    hit = patch_findings_for_user_vocab(
+                        prev[0], prev[1], set(user_vocab or ()) - prev[2], known_vocab_plus, cfg,
+                        lexicon_plus,
+                    )
+                    if hit is not None:
+                        cache.put(key, hit[0], hit[1], doc_key=doc_key, user_vocab=user_vocab)
+            if hit is not None:
+                findings, meta = hit
+                # Same bytes may arrive under another name.
+                for x in findings:
+                    x.file = base
+                meta = dict(meta, file=base, cached=True)
+                all_findings.extend(findings)
+                metas.append(meta)
+                continue
 
-    meta = {
-        "file": base,
-        "created_at": time.strftime("%Y-%m-%d"),
-        "topk": cfg.topk,
-        "findings_count": len(findings),
-        "morph_ok_count": len(morph_log),
-        "glossary_candidates_count": len(glossary_candidates),
-    }
-    return findings, meta
+        if eng is None:
+            eng = build_engine(resources, models)
+        findings, meta = collect_findings(iter_findings(
+            path=name,
+            cfg=cfg,
+            eng=eng,
+            known_vocab=known_vocab_plus,
+            english_vocab=resources["english_vocab"],
+            known_vocab_for_names=resources["known_vocab_for_names"],
+            ignore_vocab=resources["ignore_vocab"],
+            domain_terms=resources["domain_terms"],
+            protected_phrases=resources["protected_phrases"],
+            protected_name_tokens=resources["protected_name_tokens"],
+            deadline=deadline,
+            cancel=cancel,
+            para_cache=para_cache,
+            para_scope=para_scope,
+            data=src,
+            vocab_index=index_plus,
+            inflection_lexicon=lexicon_plus,
+        ), on_progress=on_progress)
+        if key is not None and not meta.get("partial"):
+            cache.put(key, findings, meta, doc_key=doc_key, user_vocab=user_vocab)
+        all_findings.extend(findings)
+        metas.append(meta)
+
+    return all_findings, metas
+
+def profile_rule_order(
+    paths: List[str],
+    out_path: str,
+    cfg: Settings,
+    eng: Any,
+    known_vocab: Set[str],
+    english_vocab: Set[str],
+    known_vocab_for_names: Set[str],
+    ignore_vocab: Set[str],
+    domain_terms: Set[str],
+    protected_phrases: Set[str],
+    protected_name_tokens: Set[str],
+) -> Dict[str, Any]:
+    pcfg = replace(cfg, profile_rules=True, rule_order_path=None)
+    profile: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for path in paths:
+        _, meta = run_on_file(
+            path, pcfg, eng,
+            known_vocab, english_vocab, known_vocab_for_names, ignore_vocab,
+            domain_terms, protected_phrases, protected_name_tokens,
+        )
+        for seg, rules in meta.get("stats", {}).get("rules", {}).items():
+            acc_seg = profile.setdefault(seg, {})
+            for name, r in rules.items():
+                acc = acc_seg.setdefault(name, {"entered": 0, "rejected": 0, "time_ms": 0.0})
+                acc["entered"] += r["entered"]
+                acc["rejected"] += r["rejected"]
+                acc["time_ms"] += r["time_ms"]
+    return save_rule_order(out_path, profile)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+import re, sys, time, random, argparse, importlib, pkgutil
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import spellchecker.rules as rules_pkg
+from spellchecker.rules.biblio import RE_BIB_CITATION_LINE
+from spellchecker.rules.context_skip import AUTHOR_YEAR_PATTERNS, finditer_author_year
+from spellchecker.extractors.pdf_extractor import iter_pdf_pages_raw
+from spellchecker.extractors.docx_extractor import iter_docx_paragraph_texts
+from spellchecker.normalize_bench import load_corpus
+
+# Times every compiled pattern in spellchecker/rules against long generated
+# inputs built to make backtracking patterns blow up (runs of capitalised
+# names, comma/"dan" lists, initials, dot leaders) and against real pages
+# and paragraphs, and fails when one call goes over the threshold. --check
+# compares the rewritten patterns with the originals kept below on the fixed
+# corpus in benchdata/corpus.txt, any given files and generated citation lines.
+
+REFERENCE_BIB_CITATION_LINE = re.compile(r"""
+    ^\s*
+    (
+      [A-Z][A-Za-z'’\-]+
+      (?:\s+[A-Z][A-Za-z'’\-]+)*
+      (?:\s*,\s*[A-Z][A-Za-z\.]{1,6})?
+    )
+    (?:
+      \s*(?:,|&|dan)\s*
+      [A-Z][A-Za-z'’\-]+
+      (?:\s+[A-Z][A-Za-z'’\-]+)*
+      (?:\s*,\s*[A-Z][A-Za-z\.]{1,6})?
+    )*
+    \s*[\.,]\s*
+    (?:\(|\[)?\s*(17|18|19|20)\d{2}\s*(?:\)|\])?
+    \s*[\.,]\s*
+    """, re.VERBOSE)
+
+REGENCIES = [
+    "Sidoarjo", "Gresik", "Mojokerto", "Jombang", "Nganjuk", "Madiun", "Magetan", "Ngawi",
+    "Bojonegoro", "Tuban", "Lamongan", "Pasuruan", "Probolinggo", "Lumajang", "Jember",
+    "Banyuwangi", "Bondowoso", "Situbondo", "Malang", "Blitar", "Kediri", "Tulungagung",
+    "Trenggalek", "Ponorogo", "Pacitan", "Bangkalan", "Sampang", "Pamekasan", "Sumenep", "Batu",
+]
+
+def rule_patterns() -> List[Tuple[str, re.Pattern]]:
+    out: List[Tuple[str, re.Pattern]] = []
+    seen = set()
+    for info in pkgutil.iter_modules(rules_pkg.__path__):
+        mod = importlib.import_module(f"spellchecker.rules.{info.name}")
+        for attr, v in sorted(vars(mod).items()):
+            if isinstance(v, re.Pattern) and id(v) not in seen:
+                seen.add(id(v))
+                out.append((f"{info.name}.{attr}", v))
+    return out
+
+def adversarial_inputs(words: int) -> Dict[str, str]:
+    w = (REGENCIES * (words // len(REGENCIES) + 1))[:words]
+    base = {
+        "kapital": " ".join(w),
+        "kapital_koma": ", ".join(w),
+        "kapital_dan": " dan ".join(w),
+        "kapital_titik": " ".join(x + "." for x in w),
+        "kapital_inisial": ", ".join(x + ", A." for x in w),
+        "kurung_koma": "(" + ", ".join(w),
+        "kecil_koma": ", ".join(w).lower(),
+        "huruf_besar": " ".join(x.upper() for x in w),
+        "titik_pemandu": "Daftar Isi " + "." * (words * 8) + " 1",
+        "spasi": "Sidoarjo" + " " * (words * 8) + "x",
+        "tanda_hubung": "-".join(w),
+    }
+    out: Dict[str, str] = {}
+    for k, s in base.items():
+        out[k] = s
+        out[k + "+tahun"] = s + " 2020"
+        out[k + "+nyaris"] = s + " (20x"
+    return out
+
+def _runner(pat: re.Pattern) -> Callable[[str], Any]:
+    # patterns that the rules only ever run through a driver are timed that way
+    if any(pat is p for p in AUTHOR_YEAR_PATTERNS):
+        return lambda s: list(finditer_author_year(pat, s))
+    return lambda s: (list(pat.finditer(s)), pat.match(s))
+
+def time_patterns(inputs: Dict[str, str], max_ms: float) -> List[Dict[str, Any]]:
+    rows = []
+    for name, pat in rule_patterns():
+        run = _runner(pat)
+        worst, worst_input = 0.0, ""
+        for label, s in inputs.items():
+            t0 = time.perf_counter()
+            run(s)
+            ms = (time.perf_counter() - t0) * 1000.0
+            if ms > worst:
+                worst, worst_input = ms, label
+        rows.append({"pattern": name, "max_ms": round(worst, 2), "input": worst_input, "ok": worst <= max_ms})
+    rows.sort(key=lambda r: -r["max_ms"])
+    return rows
+
+def _bib_lines(r: random.Random) -> str:
+    # short citation-like lines; the reference pattern is only safe on these
+    out = []
+    for i in range(r.randint(1, 5)):
+        if i:
+            out.append(r.choice([", ", " & ", " dan ", ",", "dan ", " "]))
+        out.append(" ".join(r.choice(["Santoso", "Hidayat", "Jordan", "Ab", "Sudan", "O'Neil", "Xy"]) for _ in range(r.randint(1, 3))))
+        if r.random() < 0.5:
+            out.append(r.choice([", A.", ", J.R.", ", Ab", ", Abc.D", ",A", ", A.B.C.D.E."]))
+    out.append(r.choice([". ", ", ", " . ", "."]))
+    out.append(r.choice(["(2020)", "2020", "[1999]", "( 2020 )", "2020)", "1650"]))
+    out.append(r.choice([". Judul", ".", ",", " x", ""]))
+    return "".join(out)
+
+def check_equivalence(units: Iterable[str], n_random: int = 20000) -> List[Dict[str, str]]:
+    units = list(units)
+    r = random.Random(0)
+    lines = [ln.strip() for u in units for ln in u.splitlines()]
+    lines += [_bib_lines(r) for _ in range(n_random)]
+    bad = []
+    for s in lines:
+        if bool(REFERENCE_BIB_CITATION_LINE.match(s)) != bool(RE_BIB_CITATION_LINE.match(s)):
+            bad.append({"pattern": "biblio.RE_BIB_CITATION_LINE", "text": s})
+
+    def spans(ms) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        return [(m.span(), m.span("author")) for m in ms]
+
+    for s in units + lines:
+        for pat in AUTHOR_YEAR_PATTERNS:
+            if spans(pat.finditer(s)) != spans(finditer_author_year(pat, s)):
+                bad.append({"pattern": pat.pattern.strip()[:40], "text": s})
+    return bad
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m spellchecker.regex_bench", description="Uji waktu regex di spellchecker/rules terhadap input panjang.")
+    ap.add_argument("files", nargs="*", help="file PDF/DOCX sebagai input nyata")
+    ap.add_argument("--words", type=int, default=400, help="jumlah kata per input sintetis")
+    ap.add_argument("--max-ms", type=float, default=100.0, help="batas waktu per pola per input")
+    ap.add_argument("--check", action="store_true", help="bandingkan pola yang ditulis ulang dengan pola asli pada korpus tetap dan file")
+    args = ap.parse_args(argv)
+
+    units: List[str] = []
+    for f in args.files:
+        if f.lower().endswith(".pdf"):
+            units += [t for _, t in iter_pdf_pages_raw(f)]
+        else:
+            units += [p for p in iter_docx_paragraph_texts(f) if p.strip()]
+
+    inputs = adversarial_inputs(args.words)
+    real = units or load_corpus()
+    if real:
+        longest = sorted(real, key=len, reverse=True)[:20]
+        inputs.update({f"nyata_{i}": u for i, u in enumerate(longest)})
+
+    rows = time_patterns(inputs, args.max_ms)
+    failed = [r for r in rows if not r["ok"]]
+    for r in rows[:10]:
+        print(f"{r['pattern']}: {r['max_ms']} ms ({r['input']})")
+    print(f"{len(rows)} pola, {len(inputs)} input, {len(failed)} di atas {args.max_ms} ms")
+    for r in failed:
+        print(f"LAMBAT {r['pattern']}: {r['max_ms']} ms pada {r['input']}")
+
+    ok = not failed
+    if args.check:
+        bad = check_equivalence(load_corpus() + units)
+        for b in bad[:20]:
+            print(f"BEDA {b['pattern']}: {b['text'][:200]!r}")
+        print(f"{len(bad)} perbedaan")
+        ok = ok and not bad
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+from __future__ import annotations
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List
+
+from spellchecker.types import Finding
+
+class FindingsTable:
+    # Findings stored column-wise: file and status as codes into small
+    # category lists, top-k suggestions as fixed suggestion/confidence
+    # columns. Converts to a DataFrame without building a dict per row.
+    def __init__(self, topk: int = 3) -> None:
+        self.topk = int(topk)
+        self.files: List[str] = []
+        self.statuses: List[str] = []
+        self._file_code: Dict[str, int] = {}
+        self._status_code: Dict[str, int] = {}
+        self.file_codes = array("i")
+        self.status_codes = array("i")
+        self.page: List[str] = []
+        self.token: List[str] = []
+        self.snippet: List[str] = []
+        self.suggestion: List[List[str]] = [[] for _ in range(self.topk)]
+        self.confidence: List[array] = [array("d") for _ in range(self.topk)]
+
+    def __len__(self) -> int:
+        return len(self.token)
+
+    def _code(self, codes: Dict[str, int], values: List[str], v: str) -> int:
+        c = codes.get(v)
+        if c is None:
+            c = codes[v] = len(values)
+            values.append(v)
+        return c
+
+    def append(self, fd: Finding) -> None:
+        self.file_codes.append(self._code(self._file_code, self.files, fd.file))
+        self.status_codes.append(self._code(self._status_code, self.statuses, fd.status))
+        self.page.append(fd.page)
+        self.token.append(fd.token)
+        self.snippet.append(fd.snippet)
+        sug = fd.suggestions or []
+        for i in range(self.topk):
+            if i < len(sug):
+                s = sug[i]
+                self.suggestion[i].append(s.get("suggestion") or s.get("term") or s.get("word") or "")
+                conf = s.get("confidence")
+                self.confidence[i].append(float(conf) if conf not in (None, "") else float("nan"))
+            else:
+                self.suggestion[i].append("")
+                self.confidence[i].append(float("nan"))
+
+    def extend(self, findings: Iterable[Finding]) -> None:
+        for fd in findings:
+            self.append(fd)
+
+    def __iter__(self) -> Iterator[Finding]:
+        # Rebuilt rows carry only the top-k suggestion/confidence pairs.
+        for r in range(len(self.token)):
+            suggs = []
+            for i in range(self.topk):
+                if self.suggestion[i][r]:
+                    conf = self.confidence[i][r]
+                    suggs.append({"suggestion": self.suggestion[i][r], "confidence": None if conf != conf else conf})
+            yield Finding(
+                self.files[self.file_codes[r]], self.page[r], self.token[r], self.snippet[r],
+                self.statuses[self.status_codes[r]], suggs,
+            )
+
+    def columns(self) -> List[str]:
+        cols = ["file", "page", "token", "status"]
+        for i in range(1, self.topk + 1):
+            cols += [f"suggestion_{i}", f"confidence_{i}"]
+        return cols + ["snippet"]
+
+    def to_dataframe(self) -> Any:
+        # Same frame the app built row by row: plain string file/status
+        # (categoricals change groupby defaults and category-bound fillna)
+        # and object confidences, "" without a suggestion and None without
+        # a confidence. The column data is still taken from the codes.
+        import numpy as np
+        import pandas as pd
+
+        files = np.empty(len(self.files), dtype=object)
+        files[:] = self.files
+        statuses = np.empty(len(self.statuses), dtype=object)
+        statuses[:] = self.statuses
+        data: Dict[str, Any] = {
+            "file": files[np.frombuffer(self.file_codes, dtype=np.int32)],
+            "page": self.page,
+            "token": self.token,
+            "status": statuses[np.frombuffer(self.status_codes, dtype=np.int32)],
+        }
+        for i in range(self.topk):
+            raw = np.frombuffer(self.confidence[i], dtype=np.float64)
+            conf = raw.astype(object)
+            conf[np.isnan(raw)] = None
+            conf[np.array([not x for x in self.suggestion[i]], dtype=bool)] = ""
+            data[f"suggestion_{i + 1}"] = self.suggestion[i]
+            data[f"confidence_{i + 1}"] = conf
+        data["snippet"] = self.snippet
+        return pd.DataFrame(data, columns=self.columns())
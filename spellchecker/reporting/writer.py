@@ -1,42 +1,85 @@
 from __future__ import annotations
 import csv, json, time
-from typing import List, Dict, Any, Optional
-from spellchecker.types import Finding
+from typing import List, Dict, Any, Optional, Iterable, Generator, Union
+from spellchecker.types import Finding, Progress
 
-def findings_to_rows(findings: List[Finding], topk: int) -> List[List[Any]]:
-    rows = []
-    for fd in findings:
-        sug = fd.suggestions or []
-        row = [fd.file, fd.page, fd.token, fd.status]
-        for i in range(topk):
-            if i < len(sug):
-                row += [sug[i].get("suggestion", ""), sug[i].get("confidence", "")]
-            else:
-                row += ["", ""]
-        row.append(fd.snippet)
-        rows.append(row)
-    return rows
+def finding_to_row(fd: Finding, topk: int) -> List[Any]:
+    sug = fd.suggestions or []
+    row = [fd.file, fd.page, fd.token, fd.status]
+    for i in range(topk):
+        if i < len(sug):
+            row += [sug[i].get("suggestion", ""), sug[i].get("confidence", "")]
+        else:
+            row += ["", ""]
+    row.append(fd.snippet)
+    return row
 
-def write_csv(path: str, findings: List[Finding], topk: int):
+def findings_to_rows(findings: Iterable[Finding], topk: int) -> List[List[Any]]:
+    return [finding_to_row(fd, topk) for fd in findings]
+
+def csv_header(topk: int) -> List[str]:
+    header = ["file","page","token","status"]
+    for i in range(1, topk+1):
+        header += [f"suggestion_{i}", f"confidence_{i}"]
+    header += ["snippet"]
+    return header
+
+def finding_to_json(fd: Finding) -> str:
+    return json.dumps({
+        "file": fd.file,
+        "page": fd.page,
+        "token": fd.token,
+        "status": fd.status,
+        "snippet": fd.snippet,
+        "suggestions": fd.suggestions,
+    }, ensure_ascii=False)
+
+def write_csv(path: str, findings: Iterable[Finding], topk: int):
     with open(path, "w", encoding="utf-8", newline="") as f:
         w = csv.writer(f)
-        header = ["file","page","token","status"]
-        for i in range(1, topk+1):
-            header += [f"suggestion_{i}", f"confidence_{i}"]
-        header += ["snippet"]
-        w.writerow(header)
-        for row in findings_to_rows(findings, topk):
-            w.writerow(row)
+        w.writerow(csv_header(topk))
+        for fd in findings:
+            w.writerow(finding_to_row(fd, topk))
 
-def write_jsonl(path: str, findings: List[Finding], meta: Dict[str, Any]):
+def write_jsonl(path: str, findings: Iterable[Finding], meta: Dict[str, Any]):
     with open(path, "w", encoding="utf-8") as f:
         f.write(json.dumps({"__meta__": meta}, ensure_ascii=False) + "\n")
         for fd in findings:
-            f.write(json.dumps({
-                "file": fd.file,
-                "page": fd.page,
-                "token": fd.token,
-                "status": fd.status,
-                "snippet": fd.snippet,
-                "suggestions": fd.suggestions,
-            }, ensure_ascii=False) + "\n")
+            f.write(finding_to_json(fd) + "\n")
+
+def write_stream(
+    events: Generator[Union[Finding, Progress], None, Dict[str, Any]],
+    topk: int,
+    csv_path: Optional[str] = None,
+    jsonl_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    # Consumes iter_findings() output as it is produced. The CSV is written
+    # as it goes; the JSONL lines are held until the end so the meta line
+    # comes first, as in write_jsonl (meta is only known once done).
+    f_csv = open(csv_path, "w", encoding="utf-8", newline="") if csv_path else None
+    lines: List[str] = []
+    try:
+        w = csv.writer(f_csv) if f_csv else None
+        if w:
+            w.writerow(csv_header(topk))
+        while True:
+            try:
+                ev = next(events)
+            except StopIteration as stop:
+                meta = stop.value or {}
+                break
+            if isinstance(ev, Progress):
+                continue
+            if w:
+                w.writerow(finding_to_row(ev, topk))
+            if jsonl_path:
+                lines.append(finding_to_json(ev))
+    finally:
+        if f_csv:
+            f_csv.close()
+    if jsonl_path:
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"__meta__": meta}, ensure_ascii=False) + "\n")
+            for line in lines:
+                f.write(line + "\n")
+    return meta
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import re
-from typing import Set
+from bisect import bisect_left
+from typing import Dict, FrozenSet, List, Set, Tuple
 
 RE_PAREN_ABBR = re.compile(
     r"\(\s*("
@@ -10,26 +11,20 @@ RE_PAREN_ABBR = re.compile(
     r")\s*\)"
 )
 
-def paren_abbrev_from_snippet(snippet: str) -> Set[str]:
-    out: Set[str] = set()
-    if not snippet:
-        return out
-    for m in RE_PAREN_ABBR.finditer(snippet):
-        inner = m.group(1).strip()
-        parts = re.split(r"\s*(?:/|-)\s*", inner)
-        for p in parts:
-            p = p.strip().lower()
-            if not p:
-                continue
-            p_norm = p.strip(".")
-            p_norm = re.sub(r"\.+", "_", p_norm)
-            p_norm = re.sub(r"_+", "_", p_norm).strip("_")
-            if 2 <= len(p_norm) <= 20:
-                out.add(p_norm)
-    return out
+RE_PAREN_SPLIT = re.compile(r"(?:(?<!\s)\s+)?[/-]\s*")
+RE_DOTS = re.compile(r"\.+")
 
-def is_probable_paren_abbrev(tok: str, snippet: str) -> bool:
-    return tok in paren_abbrev_from_snippet(snippet)
+def paren_abbrev_parts(inner: str) -> FrozenSet[str]:
+    # "(B.P.S / Bappeda)" -> {"b_p_s", "bappeda"}
+    out: Set[str] = set()
+    for p in RE_PAREN_SPLIT.split(inner.strip()):
+        p = p.strip().lower()
+        if not p:
+            continue
+        p_norm = RE_DOTS.sub("_", p.strip(".")).strip("_")
+        if 2 <= len(p_norm) <= 20:
+            out.add(p_norm)
+    return frozenset(out)
 
 RE_ACRONYM_TOKEN = re.compile(
     r"^(?:"
@@ -59,13 +54,53 @@ RE_ACRONYM_IN_TEXT = re.compile(
     r")\b"
 )
 
-def is_acronym_like_pdf(tok_norm: str, snippet_raw: str) -> bool:
-    if not tok_norm or not snippet_raw:
-        return False
-    for m in RE_ACRONYM_IN_TEXT.finditer(snippet_raw):
-        a = m.group(0)
-        if a.lower() == tok_norm:
-            return True
-        if a.replace(".", "").lower() == tok_norm:
+Span = Tuple[int, int]
+
+def _any_within(spans: List[Span], lo: int, hi: int) -> bool:
+    for a, b in spans:
+        if a >= lo and b <= hi:
             return True
     return False
+
+class AbbrevRegistry:
+    # Parenthesised definitions and acronym occurrences of one page or
+    # paragraph, found in a single scan and kept with their offsets. Queries
+    # take a token's context window and only see entries lying inside it,
+    # which is what matching on the token's snippet used to give.
+    __slots__ = ("_defs", "_def_starts", "_def_spans", "_acr_spans")
+
+    def __init__(self, text: str) -> None:
+        self._defs: List[Tuple[int, int, FrozenSet[str]]] = []
+        self._def_spans: Dict[str, List[Span]] = {}
+        for m in RE_PAREN_ABBR.finditer(text):
+            parts = paren_abbrev_parts(m.group(1))
+            if not parts:
+                continue
+            self._defs.append((m.start(), m.end(), parts))
+            for p in parts:
+                self._def_spans.setdefault(p, []).append(m.span())
+        self._def_starts = [d[0] for d in self._defs]
+
+        self._acr_spans: Dict[str, List[Span]] = {}
+        for m in RE_ACRONYM_IN_TEXT.finditer(text):
+            a = m.group(0)
+            for key in {a.lower(), a.replace(".", "").lower()}:
+                self._acr_spans.setdefault(key, []).append(m.span())
+
+    def defined_within(self, lo: int, hi: int) -> Set[str]:
+        out: Set[str] = set()
+        i = bisect_left(self._def_starts, lo)
+        defs = self._defs
+        while i < len(defs) and defs[i][0] < hi:
+            if defs[i][1] <= hi:
+                out |= defs[i][2]
+            i += 1
+        return out
+
+    def is_defined(self, tok: str, lo: int, hi: int) -> bool:
+        spans = self._def_spans.get(tok)
+        return spans is not None and _any_within(spans, lo, hi)
+
+    def is_acronym(self, tok: str, lo: int, hi: int) -> bool:
+        spans = self._acr_spans.get(tok)
+        return spans is not None and _any_within(spans, lo, hi)
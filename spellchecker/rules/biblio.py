@@ -1,21 +1,23 @@
 from __future__ import annotations
 import re
 
+# "Santoso, B., & Hidayat, A. (2020). ..." at the start of a line. Names are
+# matched whole and a ", X." initials part only when it holds a dot (a
+# dotless one is just another name after a comma), so each part of a line
+# has one reading and a long run of names that is not a citation fails in
+# one pass instead of trying every way to split it.
 RE_BIB_CITATION_LINE = re.compile(r"""
     ^\s*
-    (
-      [A-Z][A-Za-z'’\-]+
-      (?:\s+[A-Z][A-Za-z'’\-]+)*
-      (?:\s*,\s*[A-Z][A-Za-z\.]{1,6})?
-    )
+    [A-Z][A-Za-z'’\-]+(?![A-Za-z'’\-])
     (?:
-      \s*(?:,|&|dan)\s*
-      [A-Z][A-Za-z'’\-]+
-      (?:\s+[A-Z][A-Za-z'’\-]+)*
-      (?:\s*,\s*[A-Z][A-Za-z\.]{1,6})?
+      \s+[A-Z][A-Za-z'’\-]+(?![A-Za-z'’\-])
+    | \s*(?:,|&|dan)\s*[A-Z][A-Za-z'’\-]+(?![A-Za-z'’\-])
+    | \s*,\s*(?=[A-Z][A-Za-z]{0,5}\.)[A-Z][A-Za-z\.]{1,6}
+      \s*(?:,|&|dan)\s*[A-Z][A-Za-z'’\-]+(?![A-Za-z'’\-])
     )*
+    (?:\s*,\s*(?=[A-Z][A-Za-z]{0,5}\.)[A-Z][A-Za-z\.]{1,6})?
     \s*[\.,]\s*
-    (?:\(|\[)?\s*(17|18|19|20)\d{2}\s*(?:\)|\])?
+    (?:\(|\[)?\s*(?:17|18|19|20)\d{2}\s*(?:\)|\])?
     \s*[\.,]\s*
     """, re.VERBOSE)
 
@@ -12,6 +12,72 @@ def is_sentence_start_from_offset(raw: str, start_idx: int) -> bool:
     tail = left[-40:]
     return bool(_BOUNDARY.search(tail))
 
+_CLOSERS = frozenset('"“”\'’)]}')
+_ENDERS = frozenset(".!?")
+# Runs of whitespace, closers and enders holding at least one closer or
+# ender. Any other character ends a sentence-start stretch, and whitespace
+# alone carries the answer of the character before it, so only these runs
+# need walking.
+_RE_BOUNDARY_RUN = re.compile(r'(?<!\s)\s*["“”\'’)\]\}.!?][\s"“”\'’)\]\}.!?]*', re.UNICODE)
+_RE_CLOSER = re.compile(r'["“”\'’)\]\}]')
+_RE_ENDER = re.compile(r"[.!?]")
+
+class SentenceStarts:
+    # is_sentence_start_from_offset(raw, i) for every offset of one paragraph,
+    # filled in a single left-to-right pass. For the text left of i (trailing
+    # whitespace dropped) _BOUNDARY asks: walking back over closing
+    # quotes/brackets and then whitespace, is the next character one of
+    # .!? within the last 40 characters, or is nothing else left in them?
+    __slots__ = ("_flags",)
+
+    def __init__(self, raw: str) -> None:
+        flags = bytearray(len(raw) + 1)
+        lead = len(raw) - len(raw.lstrip())
+        flags[0:lead + 1] = b"\x01" * (lead + 1)
+        for m in _RE_BOUNDARY_RUN.finditer(raw):
+            a, b = m.span()
+            end_ok = 1 if a == 0 else 0  # answer for the text ending at the last non-space
+            if _RE_CLOSER.search(raw, a, b) is None:
+                # only whitespace and enders: everything from the first
+                # ender on is a boundary (dot leaders, ". ", "?! ")
+                e = _RE_ENDER.search(raw, a, b)
+                f = b if e is None else e.start()
+                if end_ok:
+                    flags[a + 1:f + 1] = b"\x01" * (f - a)
+                flags[f + 1:b + 1] = b"\x01" * (b - f)
+                continue
+            ws_run = 0      # whitespace run ending at the current character
+            cl_run = 0      # closer run ending at the current character
+            ws_before = 0   # whitespace run right before that closer run
+            for k in range(a, b):
+                ch = raw[k]
+                if ch.isspace():
+                    ws_run += 1
+                    cl_run = 0
+                else:
+                    if ch in _CLOSERS:
+                        if cl_run == 0:
+                            ws_before = ws_run
+                        cl_run += 1
+                        run = cl_run + ws_before
+                    else:
+                        cl_run = 0
+                        run = 0
+                    ws_run = 0
+                    p = k - run
+                    if p < 0 or run >= 40:
+                        end_ok = 1
+                    else:
+                        end_ok = 1 if raw[p] in _ENDERS else 0
+                flags[k + 1] = end_ok
+        self._flags = flags
+
+    def __contains__(self, start_idx: int) -> bool:
+        if start_idx <= 0:
+            return True
+        flags = self._flags
+        return bool(flags[min(start_idx, len(flags) - 1)])
+
 def is_capitalization_error(tok_orig: str) -> bool:
     t = (tok_orig or "").strip()
     if not t:
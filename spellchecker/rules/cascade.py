@@ -0,0 +1,254 @@
+from __future__ import annotations
+import json, os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from spellchecker.settings import Settings
+from spellchecker.stats import RunStats
+from spellchecker.rules.skip import should_skip_token, is_valid_reduplication, RE_DEGREE_TOKEN
+from spellchecker.rules.inflection import InflectionLexicon, is_probably_valid_inflection
+from spellchecker.rules.text import TokenSpan
+from spellchecker.rules.lang import looks_englishish
+from spellchecker.rules.citation import should_skip_as_citation_name_pdf
+from spellchecker.rules.context_skip import ContextSkipIndex
+from spellchecker.vocab.index import (
+    VocabIndex, vocab_index_for, KNOWN, ENGLISH, NAMES, IGNORE, DOMAIN, PROTECTED_NAME,
+)
+
+# A segment is a run of pure "skip this token" predicates that sit between two
+# stateful steps of the pipeline (emitting a finding, touching abbr_seen, the
+# stemmer log, ...). Inside a segment the outcome is "skip if any rule hits",
+# so rules commute and may be reordered freely as long as `after` holds.
+# Stateful steps are never part of a segment and never move.
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    stage: str
+    check: Callable[["TokenCtx"], Any]
+    cost: int = 1
+    after: Tuple[str, ...] = ()
+
+class TokenCtx:
+    __slots__ = (
+        "cfg", "known_vocab", "english_vocab", "known_vocab_for_names", "ignore_vocab",
+        "domain_terms", "protected_phrases", "protected_name_tokens",
+        "vocab", "lexicon", "tok", "tok_orig", "mask", "span", "in_phrase", "idx", "context_skip",
+    )
+
+    def __init__(
+        self,
+        cfg: Settings,
+        known_vocab: Set[str],
+        english_vocab: Set[str],
+        known_vocab_for_names: Set[str],
+        ignore_vocab: Set[str],
+        domain_terms: Set[str],
+        protected_phrases: Set[str],
+        protected_name_tokens: Set[str],
+        vocab: Optional[VocabIndex] = None,
+        lexicon: Optional[InflectionLexicon] = None,
+    ) -> None:
+        self.cfg = cfg
+        self.known_vocab = known_vocab
+        self.english_vocab = english_vocab
+        self.known_vocab_for_names = known_vocab_for_names
+        self.ignore_vocab = ignore_vocab
+        self.domain_terms = domain_terms
+        self.protected_phrases = protected_phrases
+        self.protected_name_tokens = protected_name_tokens
+        self.vocab = vocab if vocab is not None else vocab_index_for(
+            known_vocab, english_vocab, known_vocab_for_names, ignore_vocab, domain_terms, protected_name_tokens,
+        )
+        # InflectionLexicon of known_vocab, None falls back to the affix search
+        self.lexicon = lexicon
+        self.tok = ""
+        self.tok_orig = ""
+        # vocab.classify(tok), set together with tok
+        self.mask = 0
+        self.span: Optional[TokenSpan] = None
+        # token lies inside a protected phrase (PhraseMatcher over the unit)
+        self.in_phrase = False
+        # position of the token in its unit and the unit's ContextSkipIndex
+        self.idx = -1
+        self.context_skip = ContextSkipIndex()
+
+    # Context windows are read through the token, so rules that never look
+    # at them never make the tokenizer slice one.
+    @property
+    def snippet(self) -> str:
+        return self.span.snippet
+
+    @property
+    def snippet_raw(self) -> str:
+        return self.span.snippet_raw
+
+def _skip_token(c: TokenCtx) -> bool:
+    return should_skip_token(c.tok, c.cfg)
+
+def _degree_token(c: TokenCtx) -> bool:
+    return RE_DEGREE_TOKEN.match(c.tok) is not None
+
+def _reduplication(c: TokenCtx) -> bool:
+    return is_valid_reduplication(c.tok, c.known_vocab)
+
+def _reduplication_names(c: TokenCtx) -> bool:
+    return is_valid_reduplication(c.tok, c.known_vocab_for_names)
+
+def _ignore_vocab(c: TokenCtx) -> bool:
+    return c.mask & IGNORE != 0
+
+def _english_vocab(c: TokenCtx) -> bool:
+    return c.mask & ENGLISH != 0
+
+def _known_vocab(c: TokenCtx) -> bool:
+    return c.mask & KNOWN != 0
+
+def _known_vocab_for_names(c: TokenCtx) -> bool:
+    return c.mask & NAMES != 0
+
+def _domain_term(c: TokenCtx) -> bool:
+    return c.mask & DOMAIN != 0
+
+def _protected_phrase(c: TokenCtx) -> bool:
+    return c.in_phrase
+
+def _protected_name(c: TokenCtx) -> bool:
+    return c.mask & PROTECTED_NAME != 0
+
+def _inflection(c: TokenCtx) -> bool:
+    return is_probably_valid_inflection(c.tok, c.known_vocab, c.cfg, c.lexicon)
+
+def _englishish(c: TokenCtx) -> bool:
+    return looks_englishish(c.tok, c.english_vocab, c.cfg, c.snippet)
+
+def _citation_name_pdf(c: TokenCtx) -> bool:
+    return should_skip_as_citation_name_pdf(c.tok, c.snippet, c.known_vocab, c.english_vocab, c.cfg)
+
+def _address(c: TokenCtx) -> bool:
+    return c.idx in c.context_skip.address
+
+def _paren_author_verb(c: TokenCtx) -> bool:
+    return c.idx in c.context_skip.paren_author
+
+def _author_year(c: TokenCtx) -> bool:
+    return c.idx in c.context_skip.author_year
+
+# Default orders are the hand-written orders of the original if-chains.
+SEGMENTS: Dict[str, List[Rule]] = {
+    "pdf": [
+        Rule("skip_token", "skip", _skip_token, cost=3),
+        Rule("degree_token", "skip", _degree_token, cost=2),
+        Rule("reduplication", "vocab", _reduplication, cost=2),
+        Rule("ignore_vocab", "vocab", _ignore_vocab),
+        Rule("english_vocab", "vocab", _english_vocab),
+        Rule("protected_phrase", "vocab", _protected_phrase),
+        Rule("known_vocab", "vocab", _known_vocab),
+        Rule("inflection", "inflection", _inflection, cost=8, after=("known_vocab",)),
+        Rule("englishish", "englishish", _englishish, cost=5),
+        Rule("protected_name", "names", _protected_name),
+        Rule("citation_name", "citation", _citation_name_pdf, cost=15, after=("known_vocab", "english_vocab")),
+    ],
+    "docx_pre_capital": [
+        Rule("skip_token", "skip", _skip_token, cost=3),
+        Rule("degree_token", "skip", _degree_token, cost=2),
+        Rule("address", "citation", _address, cost=10),
+        Rule("paren_author_verb", "citation", _paren_author_verb, cost=10),
+        Rule("author_year", "citation", _author_year, cost=50),
+        Rule("domain_term", "whitelist", _domain_term),
+        Rule("protected_phrase", "whitelist", _protected_phrase),
+        Rule("ignore_vocab", "whitelist", _ignore_vocab),
+    ],
+    "docx_post_capital": [
+        Rule("reduplication", "vocab", _reduplication_names, cost=2),
+        Rule("known_vocab", "vocab", _known_vocab_for_names),
+    ],
+    "docx_post_abbr": [
+        Rule("inflection", "inflection", _inflection, cost=8),
+        Rule("englishish", "englishish", _englishish, cost=5),
+        Rule("protected_name", "names", _protected_name),
+    ],
+}
+
+def run_segment(rules: List[Rule], c: TokenCtx, stats: RunStats, segment: str, exhaustive: bool = False) -> bool:
+    # exhaustive=True is the profiling mode: every rule is evaluated so its
+    # own rejection rate is measured, the outcome is unchanged.
+    if not stats.enabled:
+        for r in rules:
+            if r.check(c):
+                return True
+        return False
+
+    hit_any = False
+    for r in rules:
+        t0 = stats.clock()
+        hit = r.check(c)
+        stats.record_rule(segment, r.name, r.stage, t0, hit)
+        if hit:
+            if not exhaustive:
+                return True
+            hit_any = True
+    return hit_any
+
+def order_rules(rules: List[Rule], names: Iterable[str]) -> List[Rule]:
+    # Follows `names` as closely as the `after` constraints allow; rules not
+    # mentioned keep their default relative order at the end.
+    by_name = {r.name: r for r in rules}
+    wanted = [n for n in names if n in by_name]
+    wanted += [r.name for r in rules if r.name not in wanted]
+
+    placed: List[Rule] = []
+    done: Set[str] = set()
+    pending = list(wanted)
+    while pending:
+        for i, n in enumerate(pending):
+            r = by_name[n]
+            if all(a in done or a not in by_name for a in r.after):
+                placed.append(r)
+                done.add(n)
+                del pending[i]
+                break
+        else:
+            raise ValueError(f"cyclic rule dependencies: {pending}")
+    return placed
+
+def optimise_order(rules: List[Rule], profile: Dict[str, Dict[str, Any]]) -> List[str]:
+    # Independent filters are cheapest overall when sorted by expected cost per
+    # rejection (cost / rejection rate); `after` edges are honoured greedily.
+    def rank(r: Rule) -> float:
+        p = profile.get(r.name) or {}
+        entered = p.get("entered") or 0
+        if not entered:
+            return float(r.cost)
+        cost = (p.get("time_ms") or 0.0) / entered
+        rate = (p.get("rejected") or 0) / entered
+        return cost / rate if rate > 0 else float("inf")
+
+    ranked = sorted(rules, key=rank)
+    return [r.name for r in order_rules(rules, [r.name for r in ranked])]
+
+_ORDER_CACHE: Dict[Tuple[str, float], Dict[str, List[Rule]]] = {}
+
+def load_rule_order(path: Optional[str]) -> Dict[str, List[Rule]]:
+    if not path or not os.path.exists(path):
+        return SEGMENTS
+    key = (path, os.path.getmtime(path))
+    cached = _ORDER_CACHE.get(key)
+    if cached is not None:
+        return cached
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    order = data.get("segments", {}) if isinstance(data, dict) else {}
+    out = {seg: order_rules(rules, order.get(seg, [])) for seg, rules in SEGMENTS.items()}
+    _ORDER_CACHE[key] = out
+    return out
+
+def save_rule_order(path: str, profile: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    data = {
+        "version": 1,
+        "segments": {seg: optimise_order(rules, profile.get(seg, {})) for seg, rules in SEGMENTS.items()},
+        "profile": profile,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return data
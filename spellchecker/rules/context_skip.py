@@ -1,19 +1,11 @@
 from __future__ import annotations
 import re
+from bisect import bisect_left
+from typing import FrozenSet, Iterator, List, Match, Pattern, Set
 
-RE_ADDR_INLINE = re.compile(r"(?i)\balamat\s*:\s*\S")
+from spellchecker.rules.text import TokenSpan
 
-def should_skip_address_token(tok: str, snippet_raw: str) -> bool:
-    if not snippet_raw:
-        return False
-    s = snippet_raw.lower()
-    if not RE_ADDR_INLINE.search(s):
-        return False
-    after = re.split(r"(?i)\balamat\s*:\s*", s, maxsplit=1)
-    if len(after) < 2:
-        return False
-    addr_part = after[1]
-    return bool(re.search(rf"\b{re.escape(tok.lower())}\b", addr_part))
+RE_ADDR_INLINE = re.compile(r"(?i)\balamat\s*:\s*(?=\S)")
 
 RE_PAREN_AUTHOR_VERB = re.compile(
     r"\(\s*([a-z][a-z'’\-]+(?:\s+[a-z][a-z'’\-]+){0,3})\s*\)\s*"
@@ -21,16 +13,6 @@ RE_PAREN_AUTHOR_VERB = re.compile(
     re.IGNORECASE
 )
 
-def should_skip_paren_author_verb(tok: str, snippet_raw: str) -> bool:
-    if not tok or not snippet_raw:
-        return False
-    s = snippet_raw.lower()
-    for m in RE_PAREN_AUTHOR_VERB.finditer(s):
-        names = m.group(1).lower().split()
-        if tok.lower() in names:
-            return True
-    return False
-
 YEAR = r"(?:1[7-9]\d{2}|20\d{2})"
 NAME_PARTICLES = r"(?:bin|binti|ibn|van|von|de|da|di|del|della|al)"
 NAME_TOKEN = r"(?:[A-Za-z][A-Za-z'’\-\.]*)"
@@ -84,17 +66,89 @@ RE_PAREN_AUTHORLIST_YEAR = re.compile(
     """, re.IGNORECASE | re.VERBOSE
 )
 
-NAME_WORDS = re.compile(r"[a-z][a-z'’\-]*", re.IGNORECASE)
-
-def should_skip_author_year(tok: str, snippet_raw: str) -> bool:
-    if not tok or not snippet_raw or not tok.isalpha():
-        return False
-    s = snippet_raw.lower()
-    t = tok.lower()
-    for pat in (RE_AUTHOR_YEAR_WITH_TRIGGER, RE_AUTHOR_YEAR_NO_TRIGGER, RE_PAREN_AUTHORLIST_YEAR):
-        for m in pat.finditer(s):
-            author_text = (m.group("author") or "").lower()
-            names = NAME_WORDS.findall(author_text)
-            if t in names:
-                return True
-    return False
+AUTHOR_YEAR_PATTERNS = (RE_AUTHOR_YEAR_WITH_TRIGGER, RE_AUTHOR_YEAR_NO_TRIGGER, RE_PAREN_AUTHORLIST_YEAR)
+
+# Every character an author part, its trigger word and the separators before
+# the year can use. A citation lies in a run of these that ends right at its
+# year, so runs with no year after them are skipped whole: a long list of
+# names costs one scan instead of one failed attempt per word.
+_RE_AUTHOR_RUN = re.compile(r"[A-Za-z'’\-\.\s,&]+", re.IGNORECASE)
+_RE_YEAR_AFTER_RUN = re.compile(rf"(?:\(\s*)?{YEAR}")  # a run never ends at whitespace
+_RE_WORD_START = re.compile(r"(?<!\w)[A-Za-z]", re.IGNORECASE)
+
+def finditer_author_year(pat: Pattern[str], text: str) -> Iterator[Match[str]]:
+    # Same matches as pat.finditer(text) for the AUTHOR_YEAR_PATTERNS; only
+    # the starts a citation can have are tried.
+    paren = pat is RE_PAREN_AUTHORLIST_YEAR
+    pos = 0
+    for run in _RE_AUTHOR_RUN.finditer(text):
+        a, b = run.span()
+        if b <= pos or not _RE_YEAR_AFTER_RUN.match(text, b):
+            continue
+        if paren:
+            # the opening parenthesis sits just before the run
+            if a - 1 >= pos and text[a - 1] == "(":
+                m = pat.match(text, a - 1)
+                if m is not None:
+                    yield m
+                    pos = m.end()
+            continue
+        for w in _RE_WORD_START.finditer(text, max(a, pos), b):
+            if w.start() < pos:
+                continue
+            m = pat.match(text, w.start())
+            if m is not None:
+                yield m
+                pos = m.end()
+
+class ContextSkipIndex:
+    # Token indices of one paragraph that sit in an address tail, a
+    # "(Author) menyatakan" name or the author part of an author-year
+    # citation. Built once per paragraph; rules look tokens up by index.
+    __slots__ = ("address", "paren_author", "author_year")
+
+    def __init__(self) -> None:
+        self.address: FrozenSet[int] = frozenset()
+        self.paren_author: FrozenSet[int] = frozenset()
+        self.author_year: FrozenSet[int] = frozenset()
+
+def _tokens_in(starts: List[int], toks: List[TokenSpan], a: int, b: int, out: Set[int]) -> None:
+    i = bisect_left(starts, a)
+    while i < len(toks) and toks[i].end <= b:
+        out.add(i)
+        i += 1
+
+def analyze_context_skips(raw: str, toks: List[TokenSpan], window: int = 45) -> ContextSkipIndex:
+    # raw is the text the tokens' offsets point into. Each pattern runs once
+    # over the whole paragraph instead of over every token's snippet.
+    idx = ContextSkipIndex()
+    if not toks:
+        return idx
+    starts = [t.start for t in toks]
+
+    # An address tail reaches as far as a token window would have seen the
+    # "alamat:" label.
+    address: Set[int] = set()
+    for m in RE_ADDR_INLINE.finditer(raw):
+        i = bisect_left(starts, m.end())
+        while i < len(toks) and toks[i].start <= m.start() + window:
+            address.add(i)
+            i += 1
+    idx.address = frozenset(address)
+
+    paren: Set[int] = set()
+    for m in RE_PAREN_AUTHOR_VERB.finditer(raw):
+        _tokens_in(starts, toks, m.start(1), m.end(1), paren)
+    idx.paren_author = frozenset(paren)
+
+    # The author part may run several words back from the year; as with the
+    # per-token windows, only names within `window` of the citation's end
+    # count, so ordinary words before a citation stay checked.
+    authors: Set[int] = set()
+    for pat in AUTHOR_YEAR_PATTERNS:
+        for m in finditer_author_year(pat, raw):
+            span: Set[int] = set()
+            _tokens_in(starts, toks, m.start("author"), m.end("author"), span)
+            authors.update(i for i in span if m.end() <= toks[i].end + window)
+    idx.author_year = frozenset(i for i in authors if toks[i].tok.isalpha())
+    return idx
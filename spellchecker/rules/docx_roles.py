@@ -2,6 +2,7 @@ from __future__ import annotations
 import re
 from typing import Set, List, Tuple
 from spellchecker.rules.skip import should_skip_token, STOPWORDS_NAME_BOUNDARY
+from spellchecker.rules.text import TokenSpan
 from spellchecker.settings import Settings
 
 ROLE_LABELS = [
@@ -53,7 +54,7 @@ def is_role_header_paragraph(text: str) -> bool:
     return False
 
 def protect_name_run_in_paragraph(
-    triples: List[Tuple[str, str, str, str]],
+    triples: List[TokenSpan],
     known_vocab: Set[str],
     english_vocab: Set[str],
     cfg: Settings,
@@ -61,8 +62,8 @@ def protect_name_run_in_paragraph(
     max_take: int = 8,
 ) -> Set[int]:
     protected: Set[int] = set()
-    toks_norm = [t[0] for t in triples]
-    toks_orig = [t[1] for t in triples]
+    toks_norm = [t.tok for t in triples]
+    toks_orig = [t.tok_orig for t in triples]
 
     titlecase_count = 0
     taken = 0
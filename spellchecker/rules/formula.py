@@ -12,7 +12,10 @@ RE_VAR_DEF = re.compile(
 MATH_OP_CHARS = set("=+-*/^<>∑Σ√()[]|·×÷±≈≠≤≥")
 
 def looks_like_formula_line(s: str) -> bool:
-    t = normalize_math_text(s)
+    return looks_like_formula_math(normalize_math_text(s))
+
+def looks_like_formula_math(t: str) -> bool:
+    # t is already normalize_math_text() output
     if not t:
         return False
     if "=" in t:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import re
 from typing import Set, List, Tuple
+from spellchecker.rules.text import TokenSpan
 
 HYPHENS = ("-", "‐", "-")
 
@@ -17,12 +18,12 @@ def fix_hyphenation_block_with_vocab(text: str, valid_join_vocab: Set[str]) -> s
     return pattern.sub(repl, text)
 
 def protect_hyphen_join_spans_docx(
-    triples: List[Tuple[str, str, str, str]],
+    triples: List[TokenSpan],
     valid_join_vocab: Set[str],
 ) -> Set[int]:
     protected: Set[int] = set()
-    toks_norm = [t[0] for t in triples]
-    toks_orig = [t[1] for t in triples]
+    toks_norm = [t.tok for t in triples]
+    toks_orig = [t.tok_orig for t in triples]
 
     for i in range(len(triples) - 1):
         left_norm = toks_norm[i]
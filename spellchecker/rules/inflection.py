@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Set, List
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Set
 from spellchecker.rules.skip import should_skip_token
 from spellchecker.settings import Settings
 
@@ -44,48 +44,128 @@ def _men_peN_stem_candidates(word: str, prefix_type: str) -> List[str]:
         cands.add("p" + rest)
     return [c for c in cands if len(c) >= 3]
 
-def is_probably_valid_inflection(tok: str, known_vocab: Set[str], cfg: Settings) -> bool:
-    if not tok or should_skip_token(tok, cfg):
-        return False
-    if tok in known_vocab:
+def _stem_hit(t: str, known_vocab: Set[str]) -> bool:
+    # t is one of the enclitic/suffix-stripped candidates of a token
+    if t in known_vocab:
         return True
 
-    t0 = _strip_enclitic(tok)
-    suffix_stripped = _strip_suffix_once(t0)
+    for pref in _PREFIXES_SIMPLE:
+        if t.startswith(pref) and len(t) > len(pref) + 2:
+            base = t[len(pref):]
+            if base in known_vocab:
+                return True
+
+    if t.startswith("me") and len(t) > 4:
+        for cand in _men_peN_stem_candidates(t, "me"):
+            if cand in known_vocab:
+                return True
+
+    if t.startswith("pe") and len(t) > 4:
+        for cand in _men_peN_stem_candidates(t, "pe"):
+            if cand in known_vocab:
+                return True
 
-    for t in suffix_stripped:
-        if t in known_vocab:
+    if t.startswith("ke") and t.endswith("an") and len(t) > 6:
+        mid = t[2:-2]
+        if mid in known_vocab:
+            return True
+    if t.startswith("pe") and t.endswith("an") and len(t) > 6:
+        mid = t[2:-2]
+        if mid in known_vocab:
             return True
 
-        for pref in _PREFIXES_SIMPLE:
-            if t.startswith(pref) and len(t) > len(pref) + 2:
-                base = t[len(pref):]
-                if base in known_vocab:
-                    return True
+    return False
 
-        if t.startswith("me") and len(t) > 4:
-            for cand in _men_peN_stem_candidates(t, "me"):
-                if cand in known_vocab:
-                    return True
+def search_inflection(tok: str, known_vocab: Set[str]) -> bool:
+    # the affix search the lexicon is generated from, and the fallback of
+    # is_probably_valid_inflection when no lexicon is passed
+    if tok in known_vocab:
+        return True
+    return any(_stem_hit(t, known_vocab) for t in _strip_suffix_once(_strip_enclitic(tok)))
 
-        if t.startswith("pe") and len(t) > 4:
-            for cand in _men_peN_stem_candidates(t, "pe"):
-                if cand in known_vocab:
-                    return True
+def stem_forms(root: str) -> Iterator[str]:
+    # Every candidate t for which _stem_hit(t, {root}) holds: each branch of
+    # _stem_hit read backwards (t = prefix + root, meN-/peN- with and without
+    # the dropped first letter, ke-an/pe-an). The caller re-checks the guards.
+    yield root
+    for pref in _PREFIXES_SIMPLE:
+        yield pref + root
+    for x in ("me", "pe"):
+        for nasal, dropped in (("ny", "s"), ("ng", "k"), ("n", "t"), ("m", "p")):
+            yield x + nasal + root
+            if root.startswith(dropped):
+                yield x + nasal + root[1:]
+    yield "ke" + root + "an"
+    yield "pe" + root + "an"
 
-        for pref in ("ber", "ter", "per"):
-            if t.startswith(pref) and len(t) > len(pref) + 2:
-                base = t[len(pref):]
-                if base in known_vocab:
-                    return True
+class InflectionLexicon:
+    # Stem-level forms (prefixed, meN-/peN-, ke-an/pe-an) of every root in a
+    # vocabulary. accepts() peels the enclitic and suffixes exactly like
+    # search_inflection and tests the few remaining candidates for
+    # membership, instead of trying every prefix against the vocabulary.
+    __slots__ = ("forms", "extra", "version")
 
-        if t.startswith("ke") and t.endswith("an") and len(t) > 6:
-            mid = t[2:-2]
-            if mid in known_vocab:
-                return True
-        if t.startswith("pe") and t.endswith("an") and len(t) > 6:
-            mid = t[2:-2]
-            if mid in known_vocab:
+    def __init__(self, forms: FrozenSet[str], extra: FrozenSet[str] = frozenset(), version: str = "") -> None:
+        self.forms = forms
+        self.extra = extra
+        self.version = version
+
+    @classmethod
+    def from_roots(cls, roots: Iterable[str], version: str = "") -> "InflectionLexicon":
+        return cls(frozenset(build_stem_forms(roots)), version=version)
+
+    def extended(self, roots: Iterable[str]) -> "InflectionLexicon":
+        # user words on top of a shared base; the base set is not copied
+        extra = build_stem_forms(roots) - self.forms
+        return InflectionLexicon(self.forms, self.extra | extra, self.version)
+
+    def __contains__(self, t: str) -> bool:
+        return t in self.forms or t in self.extra
+
+    def __len__(self) -> int:
+        return len(self.forms) + len(self.extra)
+
+    def accepts(self, tok: str) -> bool:
+        # same candidates as _strip_suffix_once, without building the set
+        forms, extra = self.forms, self.extra
+        t = _strip_enclitic(tok)
+        if t in forms or t in extra:
+            return True
+        n = len(t)
+        if n > 5 and t.endswith("nya"):
+            b = t[:-3]
+            if b in forms or b in extra:
                 return True
+        for suf in ("kan", "i", "an"):
+            if n > len(suf) + 2 and t.endswith(suf):
+                b = t[: -len(suf)]
+                if b in forms or b in extra:
+                    return True
+                if len(b) > 5 and b.endswith("nya"):
+                    b = b[:-3]
+                    if b in forms or b in extra:
+                        return True
+        return False
 
-    return False
+def build_stem_forms(roots: Iterable[str]) -> Set[str]:
+    out: Set[str] = set()
+    for r in roots:
+        one = {r}
+        for t in stem_forms(r):
+            if t not in out and _stem_hit(t, one):
+                out.add(t)
+    return out
+
+def is_probably_valid_inflection(
+    tok: str, known_vocab: Set[str], cfg: Settings, lexicon: Optional[InflectionLexicon] = None,
+) -> bool:
+    # lexicon is the InflectionLexicon of known_vocab, loaded with the
+    # resources and passed down by the caller; without one the affixes are
+    # searched per token (same answer, nothing is built here).
+    if not tok or should_skip_token(tok, cfg):
+        return False
+    if tok in known_vocab:
+        return True
+    if lexicon is None:
+        return search_inflection(tok, known_vocab)
+    return lexicon.accepts(tok)
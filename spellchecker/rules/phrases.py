@@ -0,0 +1,87 @@
+from __future__ import annotations
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from spellchecker.rules.text import WORD_RE, RE_PUNCT, normalize_text, normalize_text_keep_case
+
+# Aho-Corasick over token sequences: every protected phrase becomes the
+# token sequence the tokenizer would produce for it, and one pass over a
+# page/paragraph's tokens reports every token covered by a phrase.
+
+def pdf_phrase_tokens(phrase: str) -> List[str]:
+    # same shape as tokenize_with_context tokens
+    return RE_PUNCT.sub(" ", normalize_text(phrase)).split()
+
+def docx_phrase_tokens(phrase: str) -> List[str]:
+    # same shape as tokenize_docx_paragraph_with_context tokens
+    return [w.lower() for w in WORD_RE.findall(normalize_text_keep_case(phrase))]
+
+class PhraseMatcher:
+    def __init__(self, phrases: Iterable[str], tokenize: Callable[[str], List[str]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # lengths (in tokens) of the phrases ending at each state
+        self._out: List[Tuple[int, ...]] = [()]
+        self.size = 0
+
+        ends: Dict[int, Set[int]] = {}
+        for ph in phrases:
+            toks = tokenize(ph)
+            if not toks:
+                continue
+            s = 0
+            for t in toks:
+                nxt = self._goto[s].get(t)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[s][t] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                s = nxt
+            ends.setdefault(s, set()).add(len(toks))
+            self.size += 1
+
+        q = deque(self._goto[0].values())
+        for s in q:
+            self._out[s] = tuple(ends.get(s, ()))
+        while q:
+            s = q.popleft()
+            for t, nxt in self._goto[s].items():
+                f = self._fail[s]
+                while f and t not in self._goto[f]:
+                    f = self._fail[f]
+                f = self._goto[f].get(t, 0)
+                self._fail[nxt] = f if f != nxt else 0
+                self._out[nxt] = tuple(ends.get(nxt, ())) + self._out[self._fail[nxt]]
+                q.append(nxt)
+
+    def protected_indices(self, toks: List[str]) -> Set[int]:
+        out: Set[int] = set()
+        if not self.size:
+            return out
+        goto, fail, outs = self._goto, self._fail, self._out
+        s = 0
+        for i, t in enumerate(toks):
+            while s and t not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(t, 0)
+            for n in outs[s]:
+                out.update(range(i - n + 1, i + 1))
+        return out
+
+# Compiled once per phrase set (one set per loaded resource version). Keyed
+# by identity; the set is kept alive with its matcher so the id stays valid.
+_MATCHERS: Dict[Tuple[int, str], Tuple[Set[str], PhraseMatcher]] = {}
+_MATCHERS_MAX = 8
+
+def phrase_matcher(phrases: Set[str], kind: str) -> PhraseMatcher:
+    key = (id(phrases), kind)
+    hit = _MATCHERS.get(key)
+    if hit is not None and hit[0] is phrases:
+        return hit[1]
+    m = PhraseMatcher(phrases or (), pdf_phrase_tokens if kind == "pdf" else docx_phrase_tokens)
+    if len(_MATCHERS) >= _MATCHERS_MAX:
+        _MATCHERS.clear()
+    _MATCHERS[key] = (phrases, m)
+    return m
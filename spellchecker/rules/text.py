@@ -1,9 +1,10 @@
 from __future__ import annotations
 import re, unicodedata
-from typing import Iterable, Tuple, List, Set
+from typing import Iterable, Iterator, Tuple, List, Optional, Set, Union
 
 WORD_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ'’]+(?:-[A-Za-zÀ-ÖØ-öø-ÿ'’]+)*|\d+")
 RE_PUNCT = re.compile(r"[^\w\s]+", re.UNICODE)
+_RE_NONSPACE = re.compile(r"\S+")
 RE_URL = re.compile(r"(?i)\b(?:https?://|ftp://|www\.)\S+")
 RE_DOMAIN = re.compile(
     r"(?i)\b(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+"
@@ -17,77 +18,221 @@ _SUBSCRIPT_MAP = str.maketrans({
 })
 
 def protect_urls(text: str) -> str:
+    # both patterns need a dot, except the scheme form of RE_URL
+    if "." not in text and "://" not in text:
+        return text
     text = RE_URL.sub(" __URL__ ", text)
     text = RE_DOMAIN.sub(" __URL__ ", text)
     return text
 
+_RE_WS = re.compile(r"\s+")
+_RE_DEGREE3 = re.compile(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.([A-Za-z]{1,6})\.?\b")
+_RE_DEGREE2 = re.compile(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.?\b")
+_RE_REDUP = re.compile(r"\b([A-Za-z]+)-([A-Za-z]+)\b")
+# The three patterns above as one alternation, tried in the same order.
+_RE_DOTTED_REDUP = re.compile(
+    r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.([A-Za-z]{1,6})\.?\b"
+    r"|\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.?\b"
+    r"|\b([A-Za-z]+)-([A-Za-z]+)\b"
+)
+
+# Character rewrites applied after URL protection, one table per form.
+_LOWER_MAP = str.maketrans({"\u00a0": " ", "\u00ad": None})
+_KEEP_CASE_MAP = str.maketrans({
+    "\u00a0": " ", "\u00ad": None,
+    "\u2019": None, "\u2018": None, "\u02BC": None, "`": None, "'": None,
+})
+
+def _nfkc(s: str) -> str:
+    # ASCII is NFKC-stable and has no subscripts.
+    if s.isascii():
+        return s
+    return unicodedata.normalize("NFKC", s).translate(_SUBSCRIPT_MAP)
+
 def normalize_math_text(s: str) -> str:
     if not s:
         return ""
-    s = unicodedata.normalize("NFKC", s)
-    s = s.translate(_SUBSCRIPT_MAP)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-def normalize_text(s: str) -> str:
-    s = normalize_math_text(s)
-    s = protect_urls(s)
-    s = s.replace("\u00a0", " ")
-    s = s.replace("\u00ad", "")
+    # split() and \s agree on whitespace: same as _RE_WS.sub(" ", s).strip()
+    return " ".join(_nfkc(s).split())
 
+def _dotted_redup_sequential(s: str) -> str:
     # gelar bertitik -> underscore
-    s = re.sub(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.([A-Za-z]{1,6})\.?\b", r"\1_\2_\3", s)
-    s = re.sub(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.?\b", r"\1_\2", s)
-
+    s = _RE_DEGREE3.sub(r"\1_\2_\3", s)
+    s = _RE_DEGREE2.sub(r"\1_\2", s)
     # reduplikasi: masing-masing -> masing_masing
-    s = re.sub(r"\b([A-Za-z]+)-([A-Za-z]+)\b", r"\1_\2", s)
+    return _RE_REDUP.sub(r"\1_\2", s)
+
+def _dotted_redup(s: str) -> str:
+    # One pass of the combined pattern gives the same result as the three
+    # passes of _dotted_redup_sequential, except where a replacement changes
+    # the word boundary a later pass would see: a match right after one that
+    # ate a trailing dot, or a reduplication whose second word starts a
+    # dotted abbreviation (the dotted patterns would have run first there).
+    # Those rare texts take the sequential path.
+    if "." not in s and "-" not in s:
+        return s
+    state = [-1, False]
+
+    def repl(m: "re.Match[str]") -> str:
+        start = m.start()
+        if start == state[0] and s[start - 1] == ".":
+            state[1] = True
+        state[0] = m.end()
+        if m.group(1) is not None:
+            return m.group(1) + "_" + m.group(2) + "_" + m.group(3)
+        if m.group(4) is not None:
+            return m.group(4) + "_" + m.group(5)
+        # "ab-cd.ef": the dotted patterns could have matched from "cd" on
+        end = m.end()
+        if len(m.group(7)) <= 4 and s[end:end + 1] == "." and s[end + 1:end + 2].isalpha():
+            state[1] = True
+        return m.group(6) + "_" + m.group(7)
+
+    out = _RE_DOTTED_REDUP.sub(repl, s)
+    return _dotted_redup_sequential(s) if state[1] else out
+
+def _lower_from_math(s: str) -> str:
+    s = protect_urls(s).translate(_LOWER_MAP)
+    return _dotted_redup(s).lower()
+
+def _keep_case_from_math(s: str) -> str:
+    s = protect_urls(s).translate(_KEEP_CASE_MAP)
+    return _dotted_redup(s)
 
-    return s.lower()
+def normalize_text(s: str) -> str:
+    return _lower_from_math(normalize_math_text(s))
 
 def normalize_text_keep_case(s: str) -> str:
-    s = normalize_math_text(s)
-    s = protect_urls(s)
-    s = s.replace("\u00a0", " ").replace("\u00ad", "")
-    s = s.replace("\u2019", "'").replace("\u2018", "'").replace("\u02BC", "'").replace("`", "'")
-    s = s.replace("'", "")
-
-    s = re.sub(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.([A-Za-z]{1,6})\.?\b", r"\1_\2_\3", s)
-    s = re.sub(r"\b([A-Za-z]{1,4})\.([A-Za-z]{1,6})\.?\b", r"\1_\2", s)
-    s = re.sub(r"\b([A-Za-z]+)-([A-Za-z]+)\b", r"\1_\2", s)
-    return s
-
-def tokenize_with_context(text: str, window: int = 120):
-    raw = normalize_text(text)
+    return _keep_case_from_math(normalize_math_text(s))
+
+class NormalizedText:
+    # One page or paragraph, normalized once. Each form is built on first use
+    # from the previous one (NFKC -> math -> lower / keep_case) and shared by
+    # the formula check, the tokenizer and the capital check.
+    __slots__ = ("text", "_nfkc", "_math", "_lower", "_keep_case")
+
+    def __init__(self, text: str) -> None:
+        self.text = text or ""
+        self._nfkc: Optional[str] = None
+        self._math: Optional[str] = None
+        self._lower: Optional[str] = None
+        self._keep_case: Optional[str] = None
+
+    @property
+    def nfkc(self) -> str:
+        if self._nfkc is None:
+            self._nfkc = _nfkc(self.text)
+        return self._nfkc
+
+    @property
+    def math(self) -> str:
+        # == normalize_math_text(text)
+        if self._math is None:
+            self._math = " ".join(self.nfkc.split())
+        return self._math
+
+    @property
+    def lower(self) -> str:
+        # == normalize_text(text)
+        if self._lower is None:
+            self._lower = _lower_from_math(self.math)
+        return self._lower
+
+    @property
+    def keep_case(self) -> str:
+        # == normalize_text_keep_case(text)
+        if self._keep_case is None:
+            self._keep_case = _keep_case_from_math(self.math)
+        return self._keep_case
+
+    def math_lines(self) -> List[Tuple[str, str]]:
+        # (stripped line, normalize_math_text(line)) for every non-empty line,
+        # cut from the page-wide NFKC text instead of normalizing each line.
+        # NFKC never creates or removes line breaks, so the lines line up.
+        raw_lines = self.text.splitlines()
+        nfkc_lines = self.nfkc.splitlines()
+        if len(nfkc_lines) != len(raw_lines):
+            nfkc_lines = [_nfkc(x) for x in raw_lines]
+        # split() and \s agree on what whitespace is, so the join equals the
+        # _RE_WS collapse + strip of normalize_math_text.
+        out = []
+        for line, n in zip(raw_lines, nfkc_lines):
+            line = line.strip()
+            if line:
+                out.append((line, " ".join(n.split())))
+        return out
+
+class TokenSpan:
+    # One token with offsets into the normalized page/paragraph it came from.
+    # The context windows (snippet: punctuation cleaned, snippet_raw: as
+    # written, both lowercased) are only sliced on first access; most tokens
+    # are settled by a vocab lookup and never need them.
+    __slots__ = ("tok", "tok_orig", "start", "end", "_raw", "_cleaned", "_s0", "_s1", "_snippet", "_snippet_raw")
+
+    def __init__(self, tok: str, tok_orig: str, start: int, end: int, raw: str, cleaned: Optional[str], s0: int, s1: int) -> None:
+        self.tok = tok
+        self.tok_orig = tok_orig
+        self.start = start
+        self.end = end
+        # cleaned is the whole-page cleaned text (PDF); None means the window
+        # is cleaned on its own (DOCX).
+        self._raw = raw
+        self._cleaned = cleaned
+        self._s0 = s0
+        self._s1 = s1
+        self._snippet: Optional[str] = None
+        self._snippet_raw: Optional[str] = None
+
+    @property
+    def snippet(self) -> str:
+        s = self._snippet
+        if s is None:
+            if self._cleaned is not None:
+                s = self._cleaned[self._s0:self._s1].strip()
+            else:
+                s = RE_PUNCT.sub(" ", self._raw[self._s0:self._s1]).lower()
+            self._snippet = s
+        return s
+
+    @property
+    def window(self) -> Tuple[int, int]:
+        # offsets of the context window in the page/paragraph text
+        return self._s0, self._s1
+
+    @property
+    def snippet_raw(self) -> str:
+        s = self._snippet_raw
+        if s is None:
+            s = self._raw[self._s0:self._s1]
+            s = s.strip() if self._cleaned is not None else s.lower()
+            self._snippet_raw = s
+        return s
+
+def tokenize_with_context(text: Union[str, NormalizedText], window: int = 120) -> Iterator[TokenSpan]:
+    # normalize_text() already lowercases, so raw and cleaned are lowercase.
+    # The window offsets come from cleaned and are applied to raw as well.
+    raw = text.lower if isinstance(text, NormalizedText) else normalize_text(text)
     cleaned = RE_PUNCT.sub(" ", raw)
+    n = len(raw)
 
-    for m in re.finditer(r"\S+", cleaned):
-        tok = m.group(0).strip()
-        if not tok:
-            continue
-        start = max(0, m.start() - window)
-        end = min(len(raw), m.end() + window)
-        snippet_raw = raw[start:end].strip().lower()
-        snippet = cleaned[start:end].strip().lower()
-        yield tok.lower(), snippet, snippet_raw
+    for m in _RE_NONSPACE.finditer(cleaned):
+        tok = m.group(0)
+        start = m.start()
+        end = m.end()
+        yield TokenSpan(tok, tok, start, end, raw, cleaned, max(0, start - window), min(n, end + window))
 
-def tokenize_docx_paragraph_with_context(text: str, window: int = 45):
-    raw = normalize_text_keep_case(text)
+def tokenize_docx_paragraph_with_context(text: Union[str, NormalizedText], window: int = 45) -> List[TokenSpan]:
+    raw = text.keep_case if isinstance(text, NormalizedText) else normalize_text_keep_case(text)
+    n = len(raw)
 
     out = []
     for m in WORD_RE.finditer(raw):
         tok_orig = m.group(0)
         if not tok_orig:
             continue
-
-        tok_norm = tok_orig.lower()
-
-        s0 = max(0, m.start() - window)
-        s1 = min(len(raw), m.end() + window)
-
-        snippet_raw = raw[s0:s1]
-        snippet_clean = RE_PUNCT.sub(" ", snippet_raw)
-
-        out.append((tok_norm, tok_orig, snippet_clean.lower(), snippet_raw.lower(), m.start(), m.end()))
+        start = m.start()
+        end = m.end()
+        out.append(TokenSpan(tok_orig.lower(), tok_orig, start, end, raw, None, max(0, start - window), min(n, end + window)))
     return out
 
 def normalize_text_keep_case_call(text: str) -> str:
@@ -0,0 +1,330 @@
+from __future__ import annotations
+import io, os, sys, json, queue, threading, argparse, multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from docx import Document
+
+from spellchecker.settings import Settings
+from spellchecker.types import Finding
+from spellchecker.pipeline import iter_findings
+from spellchecker.reporting.writer import finding_to_json
+from spellchecker.batch import load_local_checker
+from spellchecker.vocab.loaders import load_txt_set, load_version
+
+# Local HTTP front for the pipeline:
+#   GET  /health                      -> {"status", "version", "workers", "idle", "queued"}
+#   POST /check?name=<file.docx|pdf>  -> body is the file, JSON lines back
+#   POST /check/paragraphs            -> {"paragraphs": [...]}, JSON lines back
+# Each response ends with a {"__meta__": ...} line (or {"__error__": ...}).
+
+class PoolBusy(Exception):
+    pass
+
+def _worker_main(conn, resources_dir: str, cfg: Settings, user_vocab: Set[str]) -> None:
+    res, eng = load_local_checker(resources_dir, user_vocab)
+    conn.send(("ready", load_version(resources_dir)))
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        kind, name, payload = job
+        try:
+            if kind == "paragraphs":
+                doc = Document()
+                for text in payload:
+                    doc.add_paragraph(text)
+                payload = io.BytesIO()
+                doc.save(payload)
+
+            events = iter_findings(
+                os.path.basename(name) or "input.docx", cfg, eng,
+                res["known_vocab"], res["english_vocab"], res["known_vocab_for_names"], res["ignore_vocab"],
+                res["domain_terms"], res["protected_phrases"], res["protected_name_tokens"],
+                progress_every=0,
+                data=payload,
+                vocab_index=res["vocab_index"],
+                inflection_lexicon=res["inflection_lexicon"],
+            )
+            while True:
+                try:
+                    ev = next(events)
+                except StopIteration as stop:
+                    meta = dict(stop.value or {})
+                    break
+                if isinstance(ev, Finding):
+                    conn.send(("line", finding_to_json(ev)))
+            meta.pop("trace", None)
+            conn.send(("meta", meta))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+
+class _Worker:
+    def __init__(self, proc, conn) -> None:
+        self.proc = proc
+        self.conn = conn
+
+class WorkerPool:
+    # Fixed set of warm worker processes. A request holds one worker for its
+    # whole stream; at most `max_queue` requests may wait for a free worker.
+    def __init__(
+        self,
+        resources_dir: str,
+        cfg: Settings,
+        user_vocab: Set[str],
+        workers: int = 2,
+        max_queue: int = 8,
+        queue_timeout_s: float = 30.0,
+    ) -> None:
+        self.resources_dir = resources_dir
+        self.cfg = cfg
+        self.user_vocab = set(user_vocab or ())
+        self.size = max(1, int(workers))
+        self.max_queue = int(max_queue)
+        self.queue_timeout_s = float(queue_timeout_s)
+        self.version = ""
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._queued = 0
+        self._lock = threading.Lock()
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        parent, child = multiprocessing.Pipe()
+        proc = multiprocessing.Process(
+            target=_worker_main,
+            args=(child, self.resources_dir, self.cfg, self.user_vocab),
+            daemon=True,
+        )
+        proc.start()
+        kind, version = parent.recv()
+        self.version = version
+        return _Worker(proc, parent)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok" if self.size > 0 else "down",
+            "version": self.version,
+            "workers": self.size,
+            "idle": self._idle.qsize(),
+            "queued": self._queued,
+        }
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            if self._queued >= self.max_queue:
+                raise PoolBusy("queue full")
+            self._queued += 1
+        try:
+            return self._idle.get(timeout=self.queue_timeout_s)
+        except queue.Empty:
+            raise PoolBusy("no free worker")
+        finally:
+            with self._lock:
+                self._queued -= 1
+
+    def run(self, job: Tuple[str, str, Any]) -> Iterator[str]:
+        w = self._acquire()
+        finished = False
+        healthy = True
+        try:
+            w.conn.send(job)
+            while True:
+                kind, payload = w.conn.recv()
+                if kind == "line":
+                    yield payload
+                elif kind == "meta":
+                    finished = True
+                    yield json.dumps({"__meta__": payload}, ensure_ascii=False)
+                    return
+                else:
+                    finished = True
+                    raise RuntimeError(payload)
+        except (EOFError, OSError):
+            finished = True
+            healthy = False
+            raise RuntimeError("worker died")
+        finally:
+            if not finished:
+                # client went away mid-stream: drain so the worker is clean
+                try:
+                    while w.conn.recv()[0] == "line":
+                        pass
+                except (EOFError, OSError):
+                    healthy = False
+            # only a live worker goes back; a dead one is replaced off the
+            # request thread
+            if healthy and w.proc.is_alive():
+                self._idle.put(w)
+            else:
+                self._replace(w)
+
+    def _replace(self, w: _Worker) -> None:
+        w.proc.kill()
+        w.conn.close()
+        threading.Thread(target=self._respawn, daemon=True).start()
+
+    def _respawn(self) -> None:
+        try:
+            fresh = self._spawn()
+        except Exception as e:
+            # the slot is lost rather than filled with a dead worker
+            with self._lock:
+                self.size -= 1
+            print(f"worker respawn failed, pool down to {self.size}: {e!r}", file=sys.stderr)
+            return
+        self._idle.put(fresh)
+
+    def close(self) -> None:
+        for _ in range(self.size):
+            w = self._idle.get()
+            try:
+                w.conn.send(None)
+            except OSError:
+                pass
+            w.proc.join(timeout=5)
+
+class CheckHandler(BaseHTTPRequestHandler):
+    server_version = "StatPubChecker/1"
+
+    def _json(self, code: int, obj: Dict[str, Any]) -> None:
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> Optional[bytes]:
+        n = int(self.headers.get("Content-Length") or 0)
+        if n <= 0:
+            self._json(411, {"error": "Content-Length required"})
+            return None
+        if n > self.server.max_body_bytes:
+            self._json(413, {"error": "body too large"})
+            return None
+        return self.rfile.read(n)
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/health":
+            self._json(200, self.server.pool.health())
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/check":
+            name = (parse_qs(url.query).get("name") or [""])[0] or self.headers.get("X-Filename", "")
+            if not name.lower().endswith((".pdf", ".docx")):
+                self._json(400, {"error": "name must end with .pdf or .docx"})
+                return
+            body = self._read_body()
+            if body is None:
+                return
+            self._stream(("file", name, body))
+        elif url.path == "/check/paragraphs":
+            body = self._read_body()
+            if body is None:
+                return
+            try:
+                data = json.loads(body.decode("utf-8"))
+                paragraphs = [str(x) for x in data["paragraphs"]]
+            except (ValueError, KeyError, TypeError):
+                self._json(400, {"error": "expected {\"paragraphs\": [...]}"})
+                return
+            # the paragraphs become a DOCX, so only a .docx name fits
+            name = str(data.get("name") or "paragraphs.docx")
+            if not name.lower().endswith(".docx"):
+                self._json(400, {"error": "name must end with .docx"})
+                return
+            self._stream(("paragraphs", name, paragraphs))
+        else:
+            self._json(404, {"error": "not found"})
+
+    def _stream(self, job: Tuple[str, str, Any]) -> None:
+        lines = self.server.pool.run(job)
+        try:
+            first = next(lines, None)
+        except PoolBusy as e:
+            self.send_response(503)
+            self.send_header("Retry-After", "5")
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps({"error": str(e)}).encode("utf-8"))
+            return
+        except RuntimeError as e:
+            self._json(500, {"error": str(e)})
+            return
+
+        # HTTP/1.0 style: no Content-Length, the stream ends when we close.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            if first is not None:
+                self.wfile.write(first.encode("utf-8") + b"\n")
+            for line in lines:
+                self.wfile.write(line.encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except RuntimeError as e:
+            try:
+                self.wfile.write(json.dumps({"__error__": str(e)}).encode("utf-8") + b"\n")
+            except OSError:
+                pass
+        except OSError:
+            # client went away (broken pipe, reset, aborted, ...)
+            pass
+        finally:
+            # no-op after a full stream; mid-stream it drains and returns the worker
+            lines.close()
+
+class CheckServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr: Tuple[str, int], pool: WorkerPool, max_body_bytes: int) -> None:
+        super().__init__(addr, CheckHandler)
+        self.pool = pool
+        self.max_body_bytes = max_body_bytes
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m spellchecker.service", description="Layanan HTTP lokal pemeriksaan DOCX/PDF.")
+    ap.add_argument("--resources", required=True, help="folder kamus lokal (struktur sama dengan bucket storage)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--max-queue", type=int, default=8, help="maksimum request yang menunggu worker")
+    ap.add_argument("--queue-timeout", type=float, default=30.0, help="detik menunggu worker sebelum 503")
+    ap.add_argument("--max-body-mb", type=float, default=50.0)
+    ap.add_argument("--user-vocab", default=None, help="file txt kata tambahan")
+    ap.add_argument("--topk", type=int, default=3)
+    ap.add_argument("--max-findings", type=int, default=2000)
+    ap.add_argument("--top1-conf", type=float, default=0.72)
+    args = ap.parse_args(argv)
+
+    cfg = Settings(
+        topk=args.topk,
+        max_findings_per_file=args.max_findings,
+        show_only_top1_if_conf_ge=args.top1_conf,
+        collect_stats=False,
+    )
+    pool = WorkerPool(
+        args.resources, cfg,
+        user_vocab=load_txt_set(args.user_vocab) if args.user_vocab else set(),
+        workers=args.workers,
+        max_queue=args.max_queue,
+        queue_timeout_s=args.queue_timeout,
+    )
+    server = CheckServer((args.host, args.port), pool, int(args.max_body_mb * 1024 * 1024))
+    print(f"listening on http://{args.host}:{args.port} ({pool.size} worker, versi {pool.version})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -33,7 +33,17 @@ class Settings:
     # Acronym candidate threshold
     abbr_cand_min_count: int = 3
 
+    # Stemmer for the affix check: "sastrawi" or "lexicon" (morph/stemmer.py)
+    stemmer: str = "sastrawi"
+
     # Special status
     status_affix_typo: str = "affix_typo"
 
+    # Per-stage counters/timings in run meta
+    collect_stats: bool = True
+
+    # Filter cascade order (JSON from profile_rule_order) and profiling mode
+    rule_order_path: Optional[str] = None
+    profile_rules: bool = False
+
     debug: bool = False
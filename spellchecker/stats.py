@@ -0,0 +1,140 @@
+from __future__ import annotations
+from time import perf_counter
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class StageStats:
+    __slots__ = ("entered", "rejected", "time_s")
+
+    def __init__(self) -> None:
+        self.entered = 0
+        self.rejected = 0
+        self.time_s = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "entered": self.entered,
+            "rejected": self.rejected,
+            "time_ms": round(self.time_s * 1000.0, 3),
+        }
+
+class RunStats:
+    # Counters are plain ints/floats updated inline by the pipeline, so the
+    # cost per check is one perf_counter() call and a dict lookup.
+    enabled = True
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageStats] = {}
+        self.rules: Dict[str, Dict[str, StageStats]] = {}
+        self.extract_unit = ""
+        self.extract_times: List[Tuple[int, float]] = []
+
+    def clock(self) -> float:
+        return perf_counter()
+
+    def stage(self, name: str) -> StageStats:
+        s = self.stages.get(name)
+        if s is None:
+            s = self.stages[name] = StageStats()
+        return s
+
+    def record(self, name: str, t0: float, rejected: Any) -> None:
+        s = self.stages.get(name)
+        if s is None:
+            s = self.stages[name] = StageStats()
+        s.entered += 1
+        s.time_s += perf_counter() - t0
+        if rejected:
+            s.rejected += 1
+
+    def record_rule(self, segment: str, rule: str, stage: str, t0: float, rejected: Any) -> None:
+        dt = perf_counter() - t0
+        seg = self.rules.get(segment)
+        if seg is None:
+            seg = self.rules[segment] = {}
+        r = seg.get(rule)
+        if r is None:
+            r = seg[rule] = StageStats()
+        s = self.stages.get(stage)
+        if s is None:
+            s = self.stages[stage] = StageStats()
+        r.entered += 1
+        s.entered += 1
+        r.time_s += dt
+        s.time_s += dt
+        if rejected:
+            r.rejected += 1
+            s.rejected += 1
+
+    def add_time(self, name: str, t0: float) -> None:
+        self.stage(name).time_s += perf_counter() - t0
+
+    def timed_iter(
+        self, items: Iterable[T], unit: str, key: Optional[Callable[[T], Any]] = None, start: int = 1,
+    ) -> Iterator[T]:
+        # Times the extraction of each item. key(item) labels it (e.g. the
+        # PDF page number, as pages may be skipped); without key, a counter.
+        self.extract_unit = unit
+        it = iter(items)
+        idx = start
+        while True:
+            t0 = perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            self.extract_times.append((key(item) if key is not None else idx, perf_counter() - t0))
+            idx += 1
+            yield item
+
+    def add_extract_time(self, idx: int, t0: float) -> None:
+        self.extract_times.append((idx, perf_counter() - t0))
+
+    def to_dict(self, per_unit_limit: int = 2000) -> Dict[str, Any]:
+        times = self.extract_times
+        total = sum(t for _, t in times)
+        slowest = sorted(times, key=lambda x: x[1], reverse=True)[:10]
+        extract: Dict[str, Any] = {
+            "unit": self.extract_unit,
+            "count": len(times),
+            "total_ms": round(total * 1000.0, 3),
+            "max_ms": round(slowest[0][1] * 1000.0, 3) if slowest else 0.0,
+            "slowest": [[i, round(t * 1000.0, 3)] for i, t in slowest],
+        }
+        if len(times) <= per_unit_limit:
+            extract["per_unit_ms"] = [[i, round(t * 1000.0, 3)] for i, t in times]
+        return {
+            "stages": {name: s.to_dict() for name, s in self.stages.items()},
+            "rules": {seg: {name: r.to_dict() for name, r in rules.items()} for seg, rules in self.rules.items()},
+            "extract": extract,
+        }
+
+class NullStats(RunStats):
+    enabled = False
+
+    def clock(self) -> float:
+        return 0.0
+
+    def record(self, name: str, t0: float, rejected: Any) -> None:
+        return None
+
+    def record_rule(self, segment: str, rule: str, stage: str, t0: float, rejected: Any) -> None:
+        return None
+
+    def add_time(self, name: str, t0: float) -> None:
+        return None
+
+    def timed_iter(
+        self, items: Iterable[T], unit: str, key: Optional[Callable[[T], Any]] = None, start: int = 1,
+    ) -> Iterator[T]:
+        return iter(items)
+
+    def add_extract_time(self, idx: int, t0: float) -> None:
+        return None
+
+    def to_dict(self, per_unit_limit: int = 2000) -> Dict[str, Any]:
+        return {}
+
+def make_stats(enabled: bool) -> RunStats:
+    return RunStats() if enabled else NullStats()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import time, random, argparse
+from typing import Any, Dict, List, Optional, Set
+
+from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+
+from spellchecker.morph.affix import maybe_affixed_id
+from spellchecker.morph.stemmer import LexiconStemmer
+from spellchecker.vocab.loaders import load_resources_from_dir
+
+# Sastrawi against LexiconStemmer on the KBBI word list and affixed forms of
+# it, on the tokens the pipeline actually stems (maybe_affixed_id). Reports
+# words/s for a cold stemmer and two agreement rates: same stem, and same
+# pipeline decision (stem != word and stem in known_vocab).
+
+def attach_prefix(p: str, root: str) -> str:
+    # meN-/peN-/ber- with the allomorph standard Indonesian picks for root
+    c = root[0]
+    if p in ("me", "pe"):
+        if c in "aeioughk":
+            return p + "ng" + (root[1:] if c == "k" else root)
+        if c == "s":
+            return p + "ny" + root[1:]
+        if c in "bfvp":
+            return p + "m" + (root[1:] if c == "p" else root)
+        if c in "dcjzt":
+            return p + "n" + (root[1:] if c == "t" else root)
+        return p + root
+    if p == "ber" and c == "r":
+        return "be" + root
+    return p + root
+
+def affixed_words(roots: Set[str], per_root: int, seed: int = 0) -> Set[str]:
+    # at most one prefix and one suffix per root, the shape of real text;
+    # stacked random affixes take Sastrawi ~0.5 s a word
+    r = random.Random(seed)
+    prefixes = ["", "me", "pe", "ber", "ter", "di", "ke", "se"]
+    suffixes = ["", "", "kan", "an", "i", "nya", "lah", "kannya"]
+    out: Set[str] = set()
+    for w in sorted(roots):
+        for _ in range(per_root):
+            p = r.choice(prefixes)
+            out.add((attach_prefix(p, w) if p else w) + r.choice(suffixes))
+    return out
+
+def _run(stemmer: Any, words: List[str]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    out = [stemmer.stem(w) for w in words]
+    s = time.perf_counter() - t0
+    return {"stems": out, "ms": round(s * 1000.0, 2), "words_per_s": int(len(words) / s) if s else 0}
+
+def compare(words: List[str], known_vocab: Set[str]) -> Dict[str, Any]:
+    sastrawi = _run(StemmerFactory().create_stemmer(), words)
+    lexicon = _run(LexiconStemmer(known_vocab), words)
+
+    def decide(w: str, s: str) -> bool:
+        return bool(s) and s != w and s in known_vocab
+
+    same_stem = same_decision = 0
+    diffs = []
+    for w, a, b in zip(words, sastrawi["stems"], lexicon["stems"]):
+        same_stem += a == b
+        if decide(w, a) == decide(w, b):
+            same_decision += 1
+        elif len(diffs) < 20:
+            diffs.append((w, a, b))
+    n = len(words) or 1
+    return {
+        "words": len(words),
+        "sastrawi_ms": sastrawi["ms"],
+        "sastrawi_words_per_s": sastrawi["words_per_s"],
+        "lexicon_ms": lexicon["ms"],
+        "lexicon_words_per_s": lexicon["words_per_s"],
+        "same_stem": round(same_stem / n, 4),
+        "same_decision": round(same_decision / n, 4),
+        "diffs": diffs,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m spellchecker.stemmer_bench", description="Bandingkan stemmer Sastrawi dengan stemmer leksikon.")
+    ap.add_argument("--resources", required=True, help="folder kamus lokal (struktur sama dengan bucket storage)")
+    ap.add_argument("--per-root", type=int, default=2, help="bentuk berimbuhan acak per kata KBBI")
+    ap.add_argument("--limit", type=int, default=3000, help="ambil sejumlah kata secara acak (0 = semua)")
+    args = ap.parse_args(argv)
+
+    res = load_resources_from_dir(args.resources)
+    words = sorted(w for w in affixed_words(res["kbbi"], args.per_root) | res["kbbi"] if maybe_affixed_id(w))
+    if args.limit and len(words) > args.limit:
+        words = sorted(random.Random(0).sample(words, args.limit))
+
+    out = compare(words, res["known_vocab"])
+    for w, a, b in out["diffs"]:
+        print(f"BEDA {w}: sastrawi={a} leksikon={b}")
+    print(
+        f"{out['words']} kata: sastrawi {out['sastrawi_ms']} ms ({out['sastrawi_words_per_s']}/s), "
+        f"leksikon {out['lexicon_ms']} ms ({out['lexicon_words_per_s']}/s); "
+        f"stem sama {out['same_stem']:.1%}, keputusan sama {out['same_decision']:.1%}"
+    )
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
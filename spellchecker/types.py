@@ -4,9 +4,22 @@ from typing import List, Dict
 
 @dataclass
 class Finding:
+    # One instance per finding can add up to tens of thousands per run.
+    __slots__ = ("file", "page", "token", "snippet", "status", "suggestions")
+
     file: str
     page: str
     token: str
     snippet: str
     status: str
     suggestions: List[Dict]
+
+@dataclass
+class Progress:
+    file: str
+    unit: str
+    index: int
+    total: int
+    tokens: int
+    findings: int
+    elapsed_s: float
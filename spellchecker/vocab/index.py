@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+# One dict lookup per token instead of one `in` per vocabulary set: every
+# word maps to a bitmask of the sets it belongs to. Built once per resource
+# version (loaders put it in resources["vocab_index"]); user words are an
+# overlay on top that never copies the base. With a VocabStore (store.py)
+# the resource words are looked up there and the dict only holds what is
+# added later (the engine vocabulary).
+
+KNOWN = 1            # known_vocab
+ENGLISH = 2          # english_vocab
+NAMES = 4            # known_vocab_for_names
+IGNORE = 8           # ignore_vocab
+DOMAIN = 16          # domain_terms
+PROTECTED_NAME = 32  # protected_name_tokens
+ABBR = 64            # singkatan
+SUGGEST = 128        # the SuggestEngine's own vocabulary
+# source lists, so a VocabStore can stand in for every set in resources
+KBBI = 256
+KAMUS_ID = 512
+KAMUS_EN = 1024
+DICTIONARY_EN = 2048
+
+RESOURCE_BITS: Tuple[Tuple[str, int], ...] = (
+    ("known_vocab", KNOWN),
+    ("english_vocab", ENGLISH),
+    ("known_vocab_for_names", NAMES),
+    ("ignore_vocab", IGNORE),
+    ("domain_terms", DOMAIN),
+    ("protected_name_tokens", PROTECTED_NAME),
+    ("singkatan", ABBR),
+    ("kbbi", KBBI),
+    ("kamus_id", KAMUS_ID),
+    ("kamus_en", KAMUS_EN),
+    ("dictionary_en", DICTIONARY_EN),
+)
+RESOURCE_MASK = sum(bit for _, bit in RESOURCE_BITS)
+
+class VocabIndex:
+    __slots__ = ("_masks", "_extra", "_store", "bits")
+
+    def __init__(
+        self,
+        masks: Optional[Dict[str, int]] = None,
+        extra: Optional[Dict[str, int]] = None,
+        store: Any = None,
+        bits: int = 0,
+    ) -> None:
+        self._masks: Dict[str, int] = masks if masks is not None else {}
+        self._extra: Dict[str, int] = extra or {}
+        self._store = store
+        # the bits whose whole word list is in the index
+        self.bits = bits
+
+    @classmethod
+    def from_resources(cls, resources: Dict[str, Any]) -> "VocabIndex":
+        idx = cls()
+        for key, bit in RESOURCE_BITS:
+            idx.add(bit, resources.get(key) or ())
+        return idx
+
+    def add(self, bit: int, words: Iterable[str]) -> None:
+        # only while building; a shared index is read-only afterwards
+        m = self._masks
+        for w in words:
+            m[w] = m.get(w, 0) | bit
+        self.bits |= bit
+
+    def extended(self, words: Iterable[str], bit: int = KNOWN) -> "VocabIndex":
+        # user words on top of the shared base (run_pipeline_on_files)
+        extra = dict(self._extra)
+        for w in words:
+            extra[w] = extra.get(w, 0) | bit
+        return VocabIndex(self._masks, extra, self._store, self.bits)
+
+    def classify(self, tok: str) -> int:
+        m = self._masks.get(tok, 0)
+        if self._store is not None:
+            m |= self._store.classify(tok)
+        if self._extra:
+            m |= self._extra.get(tok, 0)
+        return m
+
+# For callers that pass only the sets (iter_findings without vocab_index):
+# built once per combination of sets, keyed by identity like phrase_matcher.
+_INDEXES: Dict[Tuple[int, ...], Tuple[Tuple[Set[str], ...], VocabIndex]] = {}
+_INDEXES_MAX = 8
+
+def vocab_index_for(
+    known_vocab: Set[str],
+    english_vocab: Set[str],
+    known_vocab_for_names: Set[str],
+    ignore_vocab: Set[str],
+    domain_terms: Set[str],
+    protected_name_tokens: Set[str],
+) -> VocabIndex:
+    sets = (known_vocab, english_vocab, known_vocab_for_names, ignore_vocab, domain_terms, protected_name_tokens)
+    key = tuple(id(s) for s in sets)
+    hit = _INDEXES.get(key)
+    if hit is not None and all(a is b for a, b in zip(hit[0], sets)):
+        return hit[1]
+    idx = VocabIndex.from_resources(dict(zip((k for k, _ in RESOURCE_BITS), sets)))
+    if len(_INDEXES) >= _INDEXES_MAX:
+        _INDEXES.clear()
+    _INDEXES[key] = (sets, idx)
+    return idx
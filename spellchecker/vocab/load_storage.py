@@ -3,12 +3,15 @@ from __future__ import annotations
 import io
 import csv
 import json
-from typing import Dict, Set
+from typing import Any, Dict, Set
 
 import streamlit as st
 
 from spellchecker.vocab.read_storage import download_private_bytes
 from spellchecker.pipeline import build_vocabs
+from spellchecker.vocab.index import VocabIndex
+from spellchecker.vocab.store import STORE_PATH, VocabStore, store_resources
+from spellchecker.morph.lexicon import LEXICON_PATH, lexicon_from_bytes
 
 def _read_txt_set_from_bytes(b: bytes, encoding: str = "utf-8") -> Set[str]:
     txt = b.decode(encoding, errors="replace")
@@ -88,12 +91,16 @@ def load_storage_version(bucket: str, version_path: str = "meta/version.txt") ->
     except Exception:
         return "no-version"
         
-@st.cache_data(show_spinner="Memuat kamus dari Data Storage…")
+# cache_resource, not cache_data: the result holds the inflection lexicon,
+# the vocab index and (store mode) mmap'd views, which cache_data would
+# pickle and copy on every rerun. One instance per version is shared by all
+# sessions, so it is read-only; user words are layered on top per run.
+@st.cache_resource(show_spinner="Memuat kamus dari Data Storage…")
 def load_resources_from_storage_versioned(
     *,
     bucket: str,
     version: str,
-) -> Dict[str, Set[str]]:
+) -> Dict[str, Any]:
     supabase_url, service_key = _sb()
 
     def get(path: str) -> bytes:
@@ -104,6 +111,23 @@ def load_resources_from_storage_versioned(
             path=path,
         )
 
+    # ===== STORE =====
+    # one front-coded artifact instead of the word lists, when built for
+    # this version (python -m spellchecker.vocab.store)
+    try:
+        store = VocabStore.from_bytes(get(STORE_PATH))
+    except Exception:
+        store = None
+    if store is not None and store.version == version:
+        res = store_resources(store)
+        res["protected_phrases"] = _read_txt_set_from_bytes(get("dict/protected_phrase.txt"))
+        try:
+            lexicon_bytes = get(LEXICON_PATH)
+        except Exception:
+            lexicon_bytes = None
+        res["inflection_lexicon"] = lexicon_from_bytes(lexicon_bytes, res["known_vocab"], version)
+        return res
+
     # ===== DICT =====
     kbbi = _read_kbbi_csv_from_bytes(get("dict/kbbi.csv"))
     kamus_id = _read_txt_set_from_bytes(get("dict/kamus_indonesia.txt"))
@@ -137,7 +161,14 @@ def load_resources_from_storage_versioned(
         ignore_vocab=ignore_vocab,
     )
 
-    return dict(
+    # ===== MODELS =====
+    try:
+        lexicon_bytes = get(LEXICON_PATH)
+    except Exception:
+        lexicon_bytes = None
+    inflection_lexicon = lexicon_from_bytes(lexicon_bytes, known_vocab, version)
+
+    res = dict(
         kbbi=kbbi,
         kamus_id=kamus_id,
         domain_terms=domain_terms,
@@ -147,8 +178,11 @@ def load_resources_from_storage_versioned(
         ignore_vocab=ignore_vocab,
         protected_phrases=protected_phrases,
         protected_name_tokens=protected_name_tokens,
+        inflection_lexicon=inflection_lexicon,
 
         kamus_en=kamus_en,
         singkatan=singkatan,
         dictionary_en=dictionary_en,
     )
+    res["vocab_index"] = VocabIndex.from_resources(res)
+    return res
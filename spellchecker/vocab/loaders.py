@@ -2,6 +2,11 @@ from __future__ import annotations
 import os, json, csv as _csv
 from typing import Set, Dict
 
+from spellchecker.pipeline import build_vocabs
+from spellchecker.vocab.index import VocabIndex
+from spellchecker.vocab.store import load_store, store_resources
+from spellchecker.morph.lexicon import load_lexicon
+
 def load_txt_set(path: str) -> Set[str]:
     if not path or not os.path.exists(path):
         return set()
@@ -53,3 +58,89 @@ def load_unigram_freq(path: str) -> Dict[str, int]:
                 out[k] = v
         return out
     return {}
+
+def load_version(root: str, version_path: str = "meta/version.txt") -> str:
+    path = os.path.join(root, version_path)
+    if not os.path.exists(path):
+        return "local"
+    with open(path, encoding="utf-8") as f:
+        return f.read().strip() or "local"
+
+def load_resources_from_dir(root: str, use_store: bool = True) -> Dict[str, Set[str]]:
+    # Same layout and result as load_resources_from_storage_versioned, read
+    # from a local copy of the storage bucket.
+    def p(rel: str) -> str:
+        return os.path.join(root, rel)
+
+    version = load_version(root)
+    store = load_store(root, version) if use_store else None
+    if store is not None:
+        # the word lists as read-only views over one mmap'd store
+        res = store_resources(store)
+        res["protected_phrases"] = load_txt_set(p("dict/protected_phrase.txt"))
+        res["inflection_lexicon"] = load_lexicon(root, res["known_vocab"], version)
+        return res
+
+    kbbi = load_kbbi_words(p("dict/kbbi.csv"))
+    kamus_id = load_txt_set(p("dict/kamus_indonesia.txt"))
+    dictionary_en = load_txt_set(p("dict/dictionary_en.txt"))
+    kamus_en = load_txt_set(p("dict/kamus_inggris.txt"))
+    singkatan = load_txt_set(p("dict/singkatan.txt"))
+    domain_terms = load_txt_set(p("dict/domain_terms.txt"))
+
+    english_vocab = dictionary_en | kamus_en | singkatan
+
+    ignore_vocab = load_txt_set(p("wl/nama_tempat.txt")) | load_txt_set(p("wl/sidoarjo_terms.txt")) | load_txt_set(p("wl/satuan_unit.txt"))
+
+    protected_phrases = load_txt_set(p("dict/protected_phrase.txt"))
+
+    protected_name_tokens: Set[str] = set()
+    for line in load_txt_set(p("wl/protected_names.txt")):
+        for w in line.split():
+            protected_name_tokens.add(w.lower())
+
+    known_vocab, english_vocab2, known_vocab_for_names = build_vocabs(
+        kbbi=kbbi,
+        kamus_id=kamus_id,
+        domain_terms=domain_terms,
+        kamus_en=english_vocab,
+        singkatan=singkatan,
+        ignore_vocab=ignore_vocab,
+    )
+    inflection_lexicon = load_lexicon(root, known_vocab, version)
+
+    res = dict(
+        kbbi=kbbi,
+        kamus_id=kamus_id,
+        domain_terms=domain_terms,
+        known_vocab=known_vocab,
+        english_vocab=english_vocab2,
+        known_vocab_for_names=known_vocab_for_names,
+        ignore_vocab=ignore_vocab,
+        protected_phrases=protected_phrases,
+        protected_name_tokens=protected_name_tokens,
+        inflection_lexicon=inflection_lexicon,
+
+        kamus_en=kamus_en,
+        singkatan=singkatan,
+        dictionary_en=dictionary_en,
+    )
+    res["vocab_index"] = VocabIndex.from_resources(res)
+    return res
+
+def load_suggest_models_from_dir(root: str) -> Dict:
+    def p(rel: str) -> str:
+        return os.path.join(root, rel)
+
+    def load_json(path: str):
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    return {
+        "unigram": load_unigram_freq(p("models/unigram_freq.json")),
+        "confusions": load_json(p("models/confusion.json")) or {},
+        "split_join": load_json(p("models/split_join_rules.json")) or {},
+        "index_pkl": p("models/symspell_id.pkl"),
+    }
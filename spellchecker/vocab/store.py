@@ -0,0 +1,384 @@
+from __future__ import annotations
+import os, sys, mmap, time, zlib, pickle, struct, argparse
+from array import array
+from collections.abc import Set as AbstractSet
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from spellchecker.vocab.index import VocabIndex, RESOURCE_BITS, RESOURCE_MASK, SUGGEST
+
+# Every resource word stored once: sorted UTF-8, front-coded in blocks of
+# BLOCK words (first word whole, the rest as shared-prefix length + tail),
+# one u16 membership mask per word (vocab/index.py bits) and an
+# open-addressing hash table of word ids with a second crc as fingerprint.
+# The file is read through mmap, so worker processes share its pages, and
+# the resource sets become StoreView objects over it. When the resources
+# folder has the SymSpell index, the engine vocabulary goes in too (SUGGEST
+# bit), so nothing unpickles the index just for membership.
+#
+#   python -m spellchecker.vocab.store --resources DIR            # build
+#   python -m spellchecker.vocab.store --resources DIR --report   # memory
+#
+# Layout (little-endian, sections 4-byte aligned):
+#   header  MAGIC, format, BLOCK, words, slots, section offsets, version
+#   blocks  u32 data offset per block
+#   masks   u16 per word
+#   slots   u32 word id + 1 per slot (0 = empty)
+#   fps     u32 fingerprint per slot
+#   data    front-coded words, lengths as varints
+
+STORE_PATH = "models/vocab_store.bin"
+STORE_FORMAT = 1
+MAGIC = b"SPVS"
+BLOCK = 16
+_HEADER = struct.Struct("<4sHHIIIIIIII")
+_FP_SEED = 0x9E3779B9
+_MEMO_MAX = 50000
+
+def _varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _read_varint(data, pos: int) -> Tuple[int, int]:
+    b = data[pos]
+    if b < 0x80:
+        return b, pos + 1
+    n = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+def _pad4(out: bytearray) -> None:
+    out.extend(b"\0" * (-len(out) % 4))
+
+def _le(a: array) -> bytes:
+    if sys.byteorder != "little":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+def build_store(masks: Dict[str, int], version: str = "") -> bytes:
+    items = sorted((w.encode("utf-8", "surrogatepass"), m) for w, m in masks.items() if w)
+    n = len(items)
+    cap = n + n // 3 + 1  # load factor 0.75
+
+    data = bytearray()
+    blocks = array("I")
+    prev = b""
+    for i, (wb, _) in enumerate(items):
+        if i % BLOCK == 0:
+            blocks.append(len(data))
+            _varint(data, len(wb))
+            data += wb
+        else:
+            lcp = 0
+            lim = min(len(prev), len(wb))
+            while lcp < lim and prev[lcp] == wb[lcp]:
+                lcp += 1
+            _varint(data, lcp)
+            _varint(data, len(wb) - lcp)
+            data += wb[lcp:]
+        prev = wb
+
+    slots = array("I", bytes(4 * cap))
+    fps = array("I", bytes(4 * cap))
+    for i, (wb, _) in enumerate(items):
+        j = zlib.crc32(wb) % cap
+        while slots[j]:
+            j = (j + 1) % cap
+        slots[j] = i + 1
+        fps[j] = zlib.crc32(wb, _FP_SEED)
+
+    vb = version.encode("utf-8")
+    out = bytearray(_HEADER.size + len(vb))
+    _pad4(out)
+    off_blocks = len(out)
+    out += _le(blocks)
+    off_masks = len(out)
+    out += _le(array("H", (m & 0xFFFF for _, m in items)))
+    _pad4(out)
+    off_slots = len(out)
+    out += _le(slots)
+    off_fps = len(out)
+    out += _le(fps)
+    off_data = len(out)
+    out += data
+    _HEADER.pack_into(out, 0, MAGIC, STORE_FORMAT, BLOCK, n, cap, off_blocks, off_masks, off_slots, off_fps, off_data, len(vb))
+    out[_HEADER.size:_HEADER.size + len(vb)] = vb
+    return bytes(out)
+
+def store_masks(resources: Dict[str, Any], engine_words: Iterable[str] = ()) -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for key, bit in RESOURCE_BITS:
+        for w in resources.get(key) or ():
+            masks[w] = masks.get(w, 0) | bit
+    for w in engine_words:
+        masks[w] = masks.get(w, 0) | SUGGEST
+    return masks
+
+class VocabStore:
+    __slots__ = ("_buf", "_mm", "_n", "_cap", "_blocks", "_masks", "_slots", "_fps", "_data", "_memo", "version", "bits")
+
+    def __init__(self, buf, mm: Optional[mmap.mmap] = None) -> None:
+        head = _HEADER.unpack_from(buf, 0)
+        magic, fmt, block, n, cap, off_blocks, off_masks, off_slots, off_fps, off_data, vlen = head
+        if magic != MAGIC or fmt != STORE_FORMAT or block != BLOCK:
+            raise ValueError("not a vocab store of this format")
+        view = memoryview(buf)
+        self._buf = buf
+        self._mm = mm
+        self._n = n
+        self._cap = cap
+        n_blocks = (n + BLOCK - 1) // BLOCK
+        if sys.byteorder == "little":
+            self._blocks = view[off_blocks:off_blocks + 4 * n_blocks].cast("I")
+            self._masks = view[off_masks:off_masks + 2 * n].cast("H")
+            self._slots = view[off_slots:off_slots + 4 * cap].cast("I")
+            self._fps = view[off_fps:off_fps + 4 * cap].cast("I")
+        else:
+            def arr(code: str, a: int, b: int) -> array:
+                x = array(code, bytes(view[a:b]))
+                x.byteswap()
+                return x
+            self._blocks = arr("I", off_blocks, off_blocks + 4 * n_blocks)
+            self._masks = arr("H", off_masks, off_masks + 2 * n)
+            self._slots = arr("I", off_slots, off_slots + 4 * cap)
+            self._fps = arr("I", off_fps, off_fps + 4 * cap)
+        self._data = view[off_data:]
+        self._memo: Dict[str, int] = {}
+        self.version = bytes(view[_HEADER.size:_HEADER.size + vlen]).decode("utf-8")
+        # every bit some word carries, e.g. SUGGEST when built with it
+        self.bits = 0
+        for m in set(self._masks):
+            self.bits |= m
+
+    @classmethod
+    def open(cls, path: str) -> "VocabStore":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm, mm)
+
+    @classmethod
+    def from_bytes(cls, b: bytes) -> "VocabStore":
+        return cls(b)
+
+    def __reduce__(self):
+        # pickled (process pools, st.cache_data): ship the bytes, not the mapping
+        return (VocabStore.from_bytes, (bytes(self._buf),))
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buf)
+
+    def _word_bytes(self, i: int) -> bytes:
+        data = self._data
+        blk, k = divmod(i, BLOCK)
+        n, pos = _read_varint(data, self._blocks[blk])
+        wb = bytes(data[pos:pos + n])
+        pos += n
+        for _ in range(k):
+            lcp, pos = _read_varint(data, pos)
+            n, pos = _read_varint(data, pos)
+            wb = wb[:lcp] + bytes(data[pos:pos + n])
+            pos += n
+        return wb
+
+    def _lookup(self, w: str) -> int:
+        try:
+            wb = w.encode("utf-8", "surrogatepass")
+        except (AttributeError, UnicodeError):
+            return 0
+        cap = self._cap
+        j = zlib.crc32(wb) % cap
+        fp = zlib.crc32(wb, _FP_SEED)
+        slots, fps = self._slots, self._fps
+        while True:
+            v = slots[j]
+            if not v:
+                return 0
+            if fps[j] == fp and self._word_bytes(v - 1) == wb:
+                return self._masks[v - 1]
+            j = (j + 1) % cap
+
+    def classify(self, w: str) -> int:
+        memo = self._memo
+        m = memo.get(w)
+        if m is None:
+            m = self._lookup(w)
+            if len(memo) >= _MEMO_MAX:
+                memo.clear()
+            memo[w] = m
+        return m
+
+    def iter_words(self, bits: int = -1) -> Iterator[str]:
+        data, masks = self._data, self._masks
+        pos = 0
+        wb = b""
+        for i in range(self._n):
+            if i % BLOCK == 0:
+                n, pos = _read_varint(data, pos)
+                wb = bytes(data[pos:pos + n])
+            else:
+                lcp, pos = _read_varint(data, pos)
+                n, pos = _read_varint(data, pos)
+                wb = wb[:lcp] + bytes(data[pos:pos + n])
+            pos += n
+            if masks[i] & bits:
+                yield wb.decode("utf-8", "surrogatepass")
+
+    def view(self, bits: int) -> "StoreView":
+        return StoreView(self, bits)
+
+class StoreView(AbstractSet):
+    # Read-only set of the store words carrying any of `bits`.
+    __slots__ = ("store", "bits", "_len")
+
+    def __init__(self, store: VocabStore, bits: int) -> None:
+        self.store = store
+        self.bits = bits
+        self._len = -1
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[str]) -> Set[str]:
+        return set(it)
+
+    def __contains__(self, w: object) -> bool:
+        return isinstance(w, str) and self.store.classify(w) & self.bits != 0
+
+    def __iter__(self) -> Iterator[str]:
+        return self.store.iter_words(self.bits)
+
+    def __len__(self) -> int:
+        if self._len < 0:
+            self._len = sum(1 for m in self.store._masks if m & self.bits)
+        return self._len
+
+    __hash__ = None
+
+class LayeredVocab(AbstractSet):
+    # base ∪ extra without copying base (known_vocab plus user words).
+    __slots__ = ("base", "extra")
+
+    def __init__(self, base: AbstractSet, extra: Iterable[str] = ()) -> None:
+        self.base = base
+        self.extra = frozenset(w for w in extra if w not in base)
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[str]) -> Set[str]:
+        return set(it)
+
+    def __contains__(self, w: object) -> bool:
+        return w in self.base or w in self.extra
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.base
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.extra)
+
+    __hash__ = None
+
+def store_resources(store: VocabStore) -> Dict[str, Any]:
+    # the set-valued resources as views over one store
+    out: Dict[str, Any] = {key: store.view(bit) for key, bit in RESOURCE_BITS}
+    out["vocab_index"] = VocabIndex(store=store, bits=RESOURCE_MASK | (store.bits & SUGGEST))
+    return out
+
+def load_store(root: str, version: str) -> Optional[VocabStore]:
+    # the store only stands in for the text lists it was built from
+    path = os.path.join(root, STORE_PATH)
+    if not os.path.exists(path):
+        return None
+    try:
+        store = VocabStore.open(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    return store if store.version == version else None
+
+def _deep_sizeof(objs: Iterable[Any], seen: Set[int]) -> int:
+    total = 0
+    for o in objs:
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, (set, frozenset)):
+            total += _deep_sizeof(o, seen)
+        elif isinstance(o, dict):
+            total += _deep_sizeof(o.keys(), seen) + _deep_sizeof(o.values(), seen)
+    return total
+
+def memory_report(res: Dict[str, Any], store: VocabStore) -> List[Tuple[str, int]]:
+    # Python heap bytes of the resource sets (strings counted once, as the
+    # unions share them) against the store file and its view objects
+    seen: Set[int] = set()
+    rows = [(key, _deep_sizeof([res[key]], seen)) for key, _ in RESOURCE_BITS if key in res]
+    rows.append(("total set", sum(n for _, n in rows)))
+    if isinstance(res.get("vocab_index"), VocabIndex):
+        rows.append(("vocab_index (dict)", _deep_sizeof([res["vocab_index"]._masks], set())))
+    views = store_resources(store)
+    rows.append(("store (mmap)", store.nbytes))
+    rows.append(("store views", sum(sys.getsizeof(v) for v in views.values())))
+    return rows
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from spellchecker.vocab.loaders import load_resources_from_dir, load_version
+    from spellchecker.engine.suggest_wrapper import engine_vocab
+
+    ap = argparse.ArgumentParser(prog="python -m spellchecker.vocab.store", description="Bangun penyimpanan kosakata ringkas (front-coded, mmap).")
+    ap.add_argument("--resources", required=True, help="folder kamus lokal (struktur sama dengan bucket storage)")
+    ap.add_argument("--out", default=None, help=f"file keluaran (default: <resources>/{STORE_PATH})")
+    ap.add_argument("--report", action="store_true", help="bandingkan memori dan kecepatan lookup dengan set Python")
+    args = ap.parse_args(argv)
+
+    res = load_resources_from_dir(args.resources, use_store=False)
+    version = load_version(args.resources)
+    try:
+        engine_words = engine_vocab({"index_pkl": os.path.join(args.resources, "models/symspell_id.pkl")})
+    except (OSError, KeyError, pickle.UnpicklingError):
+        engine_words = set()
+    data = build_store(store_masks(res, engine_words), version)
+    store = VocabStore.from_bytes(data)
+    print(f"{len(store)} kata ({len(engine_words)} kosakata SuggestEngine), {len(data) / 1024:.0f} KiB, versi {version}")
+
+    if args.report:
+        for name, n in memory_report(res, store):
+            print(f"{name:>24}: {n / 1024:10.0f} KiB")
+        words = sorted(res["known_vocab"])[::7] + [w + "x" for w in sorted(res["known_vocab"])[::7]]
+        bad = sum(1 for key, bit in RESOURCE_BITS for w in words[:2000] if (w in res[key]) != (store.classify(w) & bit != 0))
+        t0 = time.perf_counter()
+        for w in words:
+            w in res["known_vocab"]
+        t1 = time.perf_counter()
+        cold = VocabStore.from_bytes(data)
+        for w in words:
+            cold.classify(w)
+        t2 = time.perf_counter()
+        for w in words:
+            cold.classify(w)
+        t3 = time.perf_counter()
+        per = 1e6 / max(1, len(words))
+        print(
+            f"lookup per kata: set {(t1 - t0) * per:.2f} us, store {(t2 - t1) * per:.2f} us "
+            f"(memo {(t3 - t2) * per:.2f} us); {bad} perbedaan keanggotaan"
+        )
+        return 0 if not bad else 1
+
+    path = args.out or os.path.join(args.resources, STORE_PATH)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    print(f"ditulis ke {path}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -186,6 +186,11 @@ def rank_candidates(term: str, cands: Set[str], unigram: Dict[str, int],
 # Main Suggest Engine
 # =========================
 class SuggestEngine:
+    # Optional shared membership lookup (tok -> bitmask) and the bits that
+    # mean "known to the engine"; set by the caller, see build_engine.
+    classify = None
+    known_bits = 0
+
     def __init__(
         self,
         index_pkl: str = INDEX_PKL,
@@ -208,8 +213,9 @@ class SuggestEngine:
         self.vocab = payload["vocab"]
         self.meta = payload.get("__meta__", {})
 
-        self.en_vocab = set(english_vocab or set())
-        self.abbr_vocab = set(singkatan or set())
+        # kept as given (sets or read-only store views), only `in` is used
+        self.en_vocab = english_vocab if english_vocab is not None else set()
+        self.abbr_vocab = singkatan if singkatan is not None else set()
 
     def _load_index(self, path: str) -> Dict[str, Any]:
         if not os.path.exists(path):
@@ -228,7 +234,11 @@ class SuggestEngine:
         if not tok:
             return {"token": raw, "normalized": tok, "status": "empty", "suggestions": []}
 
-        if tok in self.vocab or tok in self.en_vocab or tok in self.abbr_vocab:
+        if self.classify is not None:
+            known = self.classify(tok) & self.known_bits
+        else:
+            known = tok in self.vocab or tok in self.en_vocab or tok in self.abbr_vocab
+        if known:
             return {"token": raw, "normalized": tok, "status": "ok", "suggestions": []}
 
         if tok in self.confusions:
@@ -264,6 +274,11 @@ class SuggestEngine:
         status = "no_candidates" if not ranked else "symspell"
         return {"token": raw, "normalized": tok, "status": status, "suggestions": ranked}
 
+    def suggest_batch(self, tokens: List[str], topk: int = TOPK, max_edit: int = MAX_EDIT) -> List[Dict[str, Any]]:
+        # Batch interface for suggest_many; one SymSpell lookup per token, no
+        # candidate generation is shared between them.
+        return [self.suggest(t, topk=topk, max_edit=max_edit) for t in tokens]
+
 
 
 